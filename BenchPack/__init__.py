@@ -0,0 +1,4 @@
+__all__ = ['BenchSite', 'FakeDriver']
+
+from BenchPack.site import BenchSite
+from BenchPack.fakeDriver import FakeDriver
@@ -0,0 +1,201 @@
+"""WebDriver benchmarks against the local BenchSite, no network required.
+
+usage: python -m BenchPack.bench --backend fake --backend chrome -n 50 --json bench.json
+
+backend fake - FakeDriver (WebDriver overhead only), chrome - real headless Chrome;
+reported per scenario: pages/s, p50/p99 get_page latency, failures, driver start time and RSS.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from time import monotonic
+
+from colorama import Fore, Style
+from selenium.webdriver.common.by import By
+
+from BenchPack.fakeDriver import FakeDriver
+from BenchPack.site import BenchSite
+from MetricsPack import Metrics, set_console
+from MetricsPack.metrics import console_enabled
+from WebDriverPack.procinfo import rss, tree_rss
+from WebDriverPack.timing import ThroughputTiming, TimingPolicy
+
+BACKENDS = ('fake', 'chrome')
+
+
+def _static(site, i):
+    return dict(url=site.url(f'/static?n={i}'), element=(By.ID, 'content'))
+
+
+def _delayed(site, i):
+    return dict(url=site.url(f'/delayed?ms=200&n={i}'), element=(By.ID, 'late'))
+
+
+def _toggle(site, i):
+    return dict(url=site.url(f'/toggle?ms=200&n={i}'), el_has_css_class=((By.ID, 'box'), 'ready'))
+
+
+def _form(site, i):
+    return dict(url=site.url(f'/form?n={i}'),
+                form_data=[[(By.ID, 'name'), f'bench{i}'], [(By.ID, 'email'), f'bench{i}@example.com']],
+                submit_button=(By.ID, 'submit'), submit_check_element=[(By.ID, 'result'), f'Thanks, bench{i}'])
+
+
+def _form_script(site, i):
+    return dict(_form(site, i), fill_mode='script')
+
+
+def _redirect(site, i):
+    return dict(url=site.url(f'/redirect?n=3&to=/static%3Fn%3D{i}'), element=(By.ID, 'content'))
+
+
+# scenario name -> callable(site, iteration) -> get_page() kwargs
+SCENARIOS = {
+    'static': _static,
+    'delayed': _delayed,
+    'toggle': _toggle,
+    'form': _form,
+    'form_script': _form_script,
+    'redirect': _redirect,
+}
+
+
+def percentile(values: list, q: float):
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def _driver_rss(web_driver):
+    """Memory of the browser side: chromedriver with its Chrome processes, 0 for the fake driver."""
+    service = getattr(web_driver.driver, 'service', None)
+    process = getattr(service, 'process', None)
+    return tree_rss(process.pid) if process is not None else 0
+
+
+def _new_web_driver(backend: str, timing, metrics: Metrics, latency: float, wait_engine: str = 'poll'):
+    # imported here: WebDriver loads the Parser lists on first use
+    from WebDriverPack.webDriver import WebDriver
+
+    kwargs = dict(marker=f'bench {backend}', user_agent=False, delay_time=0, headless=True, max_retry=2,
+                  timing=timing, metrics=metrics, wait_engine=wait_engine)
+    if backend == 'fake':
+        kwargs['driver_factory'] = lambda options: FakeDriver(options, latency=latency)
+    start = monotonic()
+    web_driver = WebDriver(**kwargs)
+    return web_driver, monotonic() - start
+
+
+def run_scenario(web_driver, site: BenchSite, name: str, iterations: int, warmup: int = 1):
+    """Run one scenario `iterations` times on a started WebDriver, return its report row."""
+    make_spec = SCENARIOS[name]
+    for i in range(warmup):
+        web_driver.get_page(**make_spec(site, -1 - i))
+    latencies, failures = [], 0
+    phases = defaultdict(float)
+
+    def collect(event):
+        if 'duration' in event and event['event'] != 'get_page':
+            phases[event['event']] += event['duration']
+
+    web_driver.metrics.add_sink(collect)
+    start = monotonic()
+    try:
+        for i in range(iterations):
+            page_start = monotonic()
+            ok = web_driver.get_page(**make_spec(site, i))
+            latencies.append(monotonic() - page_start)
+            failures += not ok
+    finally:
+        elapsed = monotonic() - start
+        web_driver.metrics.remove_sink(collect)
+    return {
+        'scenario': name,
+        'iterations': iterations,
+        'failures': failures,
+        'elapsed': elapsed,
+        'pages_per_sec': iterations / elapsed if elapsed else 0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'phases_ms': {phase: total * 1000 / iterations for phase, total in sorted(phases.items())},
+    }
+
+
+def run_benchmark(backend: str = 'fake', scenarios: list = None, iterations: int = 20, timing=None,
+                  latency: float = 0, wait_engine: str = 'poll'):
+    """Start the local site and one WebDriver of the backend, run the scenarios, return the report."""
+    if backend not in BACKENDS:
+        raise ValueError(f'run_benchmark: backend must be one of {BACKENDS}')
+    scenarios = scenarios or list(SCENARIOS)
+    timing = timing or ThroughputTiming()
+    metrics = Metrics()
+    with BenchSite() as site:
+        web_driver, start_time = _new_web_driver(backend, timing, metrics, latency, wait_engine)
+        try:
+            rows = [run_scenario(web_driver, site, name, iterations) for name in scenarios]
+            driver_rss = _driver_rss(web_driver)
+        finally:
+            web_driver.quit()
+    return {
+        'backend': backend,
+        'timing': type(timing).__name__,
+        'wait_engine': wait_engine,
+        'driver_start_sec': start_time,
+        'driver_rss_bytes': driver_rss,
+        'self_rss_bytes': rss(os.getpid()),
+        'scenarios': rows,
+    }
+
+
+def print_report(report: dict, stream=None):
+    stream = stream or sys.stderr
+    print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" backend {report['backend']} "
+          f"({report['timing']}, {report['wait_engine']} waits): "
+          f"driver start {report['driver_start_sec']:.2f} s, "
+          f"driver RSS {report['driver_rss_bytes'] / 2 ** 20:.1f} MB, "
+          f"self RSS {report['self_rss_bytes'] / 2 ** 20:.1f} MB", file=stream)
+    for row in report['scenarios']:
+        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f"   {row['scenario']:<11} {row['iterations']} pages, "
+              f"p50 {row['p50_ms']:.1f} ms, p99 {row['p99_ms']:.1f} ms, " +
+              Fore.CYAN + f"{row['pages_per_sec']:.2f} pages/s"
+              + (Fore.MAGENTA + f" {row['failures']} failed" if row['failures'] else ''), file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m BenchPack.bench', description=__doc__.split('\n')[0])
+    parser.add_argument('--backend', action='append', choices=BACKENDS, help='repeatable, fake by default')
+    parser.add_argument('-s', '--scenario', action='append', choices=list(SCENARIOS),
+                        help='repeatable, all by default')
+    parser.add_argument('-n', '--iterations', type=int, default=20, help='pages per scenario')
+    parser.add_argument('--human-timing', action='store_true',
+                        help='TimingPolicy() pauses instead of ThroughputTiming()')
+    parser.add_argument('--wait-engine', choices=('poll', 'observer'), default='poll',
+                        help='WebDriver wait_engine: polled expected conditions or in-page observer')
+    parser.add_argument('--latency', type=float, default=0, help='fake backend: extra seconds per navigation')
+    parser.add_argument('--json', help='write the reports to this file')
+    parser.add_argument('-v', '--verbose', action='store_true', help='keep the WebDriver console output')
+    args = parser.parse_args(argv)
+
+    console = console_enabled()
+    set_console(args.verbose)
+    try:
+        reports = []
+        for backend in args.backend or ['fake']:
+            timing = TimingPolicy() if args.human_timing else ThroughputTiming()
+            report = run_benchmark(backend, args.scenario, args.iterations, timing, args.latency, args.wait_engine)
+            print_report(report)
+            reports.append(report)
+    finally:
+        set_console(console)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
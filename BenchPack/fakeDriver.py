@@ -0,0 +1,534 @@
+"""In-memory stand-in for a selenium Chrome driver, used by the benchmarks to measure WebDriver overhead
+without a browser: pages are fetched with urllib and parsed by ParserPack.staticDom, there is no JS engine.
+
+The BenchSite data-bench-* attributes are emulated relative to the page load time:
+<template data-bench-delay-ms="M"> - its content is inserted after the template M ms after load;
+data-bench-class="C" data-bench-class-ms="M" - the element gets the css class C M ms after load.
+"""
+import http.cookiejar
+import urllib.error
+import urllib.request
+import uuid
+from time import monotonic, sleep
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from selenium.common.exceptions import NoSuchElementException, NoSuchFrameException, NoSuchWindowException, \
+    StaleElementReferenceException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+
+from ParserPack.extraction import EXTRACT_SCRIPT, extract_static
+from ParserPack.staticDom import Node, parse
+from WebDriverPack.formFill import FILL_SCRIPT
+from WebDriverPack.tabs import TAB_STATE_SCRIPT
+from WebDriverPack.waits import ALL, WAIT_SCRIPT
+
+_W3C_ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+_ENTER_KEYS = (Keys.RETURN, Keys.ENTER)
+# selenium Keys are code points of the unicode private use area
+_SPECIAL_KEYS_START, _SPECIAL_KEYS_END = '\ue000', '\ue05d'
+_POLL_INTERVAL = .01
+# per window state, swapped in and out of the driver attributes on window switches
+_WINDOW_STATE = ('_url', '_document', '_loaded_at', '_timers', '_elements', '_focused', '_frame', '_pointer')
+
+
+class FakeElement(WebElement):
+    """WebElement over a staticDom Node, a real WebElement subclass so ActionChains accepts it."""
+
+    def __init__(self, driver, node: Node, id_: str):
+        super(FakeElement, self).__init__(driver, id_)
+        self._node = node
+
+    def _check(self):
+        if not self._parent._is_attached(self._node):
+            raise StaleElementReferenceException('stale element reference: element is not attached to the page')
+        return self._node
+
+    def _execute(self, command, params=None):
+        raise WebDriverException(f'FakeElement: command {command} is not supported')
+
+    @property
+    def node(self):
+        return self._check()
+
+    @property
+    def tag_name(self):
+        return self._check().tag
+
+    @property
+    def text(self):
+        self._parent._apply_timers()
+        return self._check().text
+
+    def get_attribute(self, name):
+        self._parent._apply_timers()
+        node = self._check()
+        if name in ('innerHTML', 'outerHTML'):
+            return node.inner_html if name == 'innerHTML' else node.outer_html
+        if name in ('textContent', 'innerText'):
+            return node.text
+        if name == 'className':
+            name = 'class'
+        return node.attrs.get(name)
+
+    get_dom_attribute = get_attribute
+    get_property = get_attribute
+
+    def is_displayed(self):
+        node = self._check()
+        return node.tag not in ('script', 'style', 'template') and node.attrs.get('type') != 'hidden' \
+            and 'display: none' not in node.attrs.get('style', '')
+
+    def is_enabled(self):
+        return 'disabled' not in self._check().attrs
+
+    def is_selected(self):
+        return 'checked' in self._check().attrs or 'selected' in self._check().attrs
+
+    @property
+    def size(self):
+        return {'width': 100, 'height': 20}
+
+    @property
+    def location(self):
+        return {'x': 0, 'y': 0}
+
+    @property
+    def rect(self):
+        return {'x': 0, 'y': 0, 'width': 100, 'height': 20}
+
+    def clear(self):
+        self._check().attrs['value'] = ''
+
+    def send_keys(self, *value):
+        self._parent._focus(self._check())
+        self._parent._type(''.join(str(part) for part in value))
+
+    def click(self):
+        self._parent._click(self._check())
+
+    def submit(self):
+        self._parent._submit(self._check())
+
+    def find_element(self, by=By.ID, value=None):
+        return self._parent._find(self._check(), by, value, single=True)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._parent._find(self._check(), by, value, single=False)
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def default_content(self):
+        self._driver._frame = None
+
+    def parent_frame(self):
+        self._driver._frame = None
+
+    def frame(self, frame_reference):
+        # frames are not loaded, the fake only keeps the main document
+        if isinstance(frame_reference, FakeElement) and frame_reference.tag_name in ('iframe', 'frame'):
+            self._driver._frame = frame_reference.node
+            return
+        raise NoSuchFrameException(f'FakeDriver: no such frame {frame_reference!r}')
+
+    def window(self, window_name):
+        self._driver._switch_window(window_name)
+
+    def new_window(self, type_hint=None):
+        self._driver._new_window()
+
+    @property
+    def active_element(self):
+        return self._driver._element(self._driver._focused or self._driver._body())
+
+
+class FakeDriver:
+    """Selenium driver look-alike: get / refresh / find_element(s) with implicit wait / execute_script
+    (document.readyState, location.href navigation, bulk extraction and form fill only) / execute_async_script
+    (waits.WAIT_SCRIPT only) / windows (tabs) / W3C actions (pointer move + click, key typing, pauses) / cookies.
+
+    Can be passed as WebDriver(driver_factory=FakeDriver): it accepts and ignores ChromeOptions."""
+    w3c = True
+
+    def __init__(self, options=None, latency: float = 0):
+        """latency - extra seconds added to every navigation, to emulate a slow site."""
+        self.session_id = uuid.uuid4().hex
+        self.capabilities = {'browserName': 'fake', 'browserVersion': '0'}
+        self.service = None
+        self._options = options
+        self._latency = latency
+        self._cookies = http.cookiejar.CookieJar()
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self._cookies))
+        self._implicit_wait = 0
+        for name, value in self._blank_window().items():
+            setattr(self, name, value)
+        self._handle = self.session_id
+        self._windows = {self._handle: None}  # handle -> state, None for the current window
+        self._quit = False
+        self.switch_to = _SwitchTo(self)
+
+    # windows
+
+    @staticmethod
+    def _blank_window():
+        return {'_url': 'data:,', '_document': parse('<html><head></head><body></body></html>'),
+                '_loaded_at': monotonic(), '_timers': [], '_elements': {}, '_focused': None, '_frame': None,
+                '_pointer': None}
+
+    def _switch_window(self, handle: str):
+        self._check_session()
+        if handle not in self._windows:
+            raise NoSuchWindowException(f'FakeDriver: no such window {handle!r}')
+        if handle == self._handle:
+            return
+        if self._handle is not None:
+            self._windows[self._handle] = {name: getattr(self, name) for name in _WINDOW_STATE}
+        for name, value in self._windows[handle].items():
+            setattr(self, name, value)
+        self._windows[handle] = None
+        self._handle = handle
+
+    def _new_window(self):
+        handle = uuid.uuid4().hex
+        self._windows[handle] = self._blank_window()
+        self._switch_window(handle)
+        return handle
+
+    def close(self):
+        """Close the current window, the last one ends the session."""
+        self._check_session()
+        self._windows.pop(self._handle, None)
+        self._handle = None
+        if not self._windows:
+            self.quit()
+
+    # navigation
+
+    def _check_session(self):
+        if self._quit:
+            raise WebDriverException('FakeDriver: invalid session id')
+
+    def _load(self, request):
+        self._check_session()
+        if self._latency:
+            sleep(self._latency)
+        try:
+            response = self._opener.open(request)
+        except urllib.error.HTTPError as e:
+            # a browser shows error pages as any other document
+            response = e
+        with response:
+            url = response.geturl()
+            body = response.read().decode(response.headers.get_content_charset() or 'utf-8', 'replace')
+        self._set_document(url, body)
+
+    def _set_document(self, url: str, body: str):
+        self._url = url
+        self._document = parse(body)
+        self._loaded_at = monotonic()
+        self._elements = {}
+        self._focused = None
+        self._frame = None
+        self._pointer = None
+        self._timers = []
+        for node in self._document.iter():
+            if node.tag == 'template':
+                # template content is not part of the document until it is inserted
+                node.content, node.children = node.children, []
+                if 'data-bench-delay-ms' in node.attrs:
+                    self._timers.append((int(node.attrs['data-bench-delay-ms']), node, 'insert'))
+            if 'data-bench-class-ms' in node.attrs:
+                self._timers.append((int(node.attrs['data-bench-class-ms']), node, 'class'))
+        self._timers.sort(key=lambda timer: timer[0])
+
+    def _apply_timers(self):
+        elapsed_ms = (monotonic() - self._loaded_at) * 1000
+        while self._timers and self._timers[0][0] <= elapsed_ms:
+            _, node, kind = self._timers.pop(0)
+            if kind == 'insert':
+                parent = node.parent
+                position = parent.children.index(node) + 1
+                for child in node.content:
+                    if isinstance(child, Node):
+                        child.parent = parent
+                parent.children[position:position] = list(node.content)
+            elif node.attrs.get('data-bench-class') not in node.classes:
+                node.attrs['class'] = ' '.join(node.classes + [node.attrs['data-bench-class']])
+
+    def get(self, url: str):
+        self._load(url)
+
+    def refresh(self):
+        if self._url != 'data:,':
+            self._load(self._url)
+
+    def back(self):
+        pass
+
+    def forward(self):
+        pass
+
+    @property
+    def current_url(self):
+        self._check_session()
+        return self._url
+
+    @property
+    def title(self):
+        node = self._document.find(By.TAG_NAME, 'title')
+        return node.text if node else ''
+
+    @property
+    def page_source(self):
+        self._check_session()
+        self._apply_timers()
+        return self._document.outer_html
+
+    # session
+
+    @property
+    def window_handles(self):
+        self._check_session()
+        return list(self._windows)
+
+    @property
+    def current_window_handle(self):
+        self._check_session()
+        if self._handle is None:
+            raise NoSuchWindowException('FakeDriver: the current window is closed')
+        return self._handle
+
+    def implicitly_wait(self, time_to_wait: float):
+        self._implicit_wait = time_to_wait
+
+    def set_page_load_timeout(self, time_to_wait: float):
+        pass
+
+    def set_script_timeout(self, time_to_wait: float):
+        pass
+
+    def get_cookies(self):
+        return [{'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path}
+                for cookie in self._cookies]
+
+    def add_cookie(self, cookie_dict: dict):
+        """Add a cookie for the domain of the current page, as selenium does."""
+        self._check_session()
+        host = urlsplit(self._url).hostname
+        if not host:
+            raise WebDriverException('FakeDriver: cookies can be added on a loaded page only')
+        domain = cookie_dict.get('domain') or host
+        if domain.lstrip('.') != host and not host.endswith('.' + domain.lstrip('.')):
+            raise WebDriverException(f'FakeDriver: invalid cookie domain {domain!r} for {host!r}')
+        self._cookies.set_cookie(http.cookiejar.Cookie(
+            0, cookie_dict['name'], cookie_dict['value'], None, False, domain, domain.startswith('.'),
+            domain.startswith('.'), cookie_dict.get('path', '/'), True, cookie_dict.get('secure', False),
+            cookie_dict.get('expiry'), 'expiry' not in cookie_dict, None, None, {}))
+
+    def delete_all_cookies(self):
+        self._cookies.clear()
+
+    def quit(self):
+        self._quit = True
+
+    def execute_script(self, script: str, *args):
+        self._check_session()
+        if script == TAB_STATE_SCRIPT:
+            self._apply_timers()
+            return {'url': self._url, 'ready': 'complete', 'states': [self._condition(c) for c in args[0]]}
+        if 'location.href' in script and args:
+            # script navigation (LoadProfile 'none' / 'eager' emulation): the fake loads synchronously
+            self._load(urljoin(self._url, args[0]))
+            return None
+        if script == EXTRACT_SCRIPT:
+            self._apply_timers()
+            root = args[1].node if len(args) > 1 and args[1] is not None else self._document
+            return extract_static(root, args[0], self._url)
+        if script == FILL_SCRIPT:
+            return self._fill(args[0])
+        if 'document.readyState' in script:
+            return 'complete'
+        if 'return document.title' in script:
+            return self.title
+        raise WebDriverException('FakeDriver: only document.readyState scripts are supported')
+
+    def execute_async_script(self, script: str, *args):
+        self._check_session()
+        if script == WAIT_SCRIPT:
+            return self._wait(*args[:3])
+        raise WebDriverException('FakeDriver: only the wait script is supported asynchronously')
+
+    def _condition(self, condition: dict):
+        if condition['type'] == 'url_changes':
+            return self._url != condition['url']
+        if condition['type'] == 'url_contains':
+            return condition['text'] in self._url
+        try:
+            node = self._document.find(condition['by'], condition['value'])
+        except ValueError:
+            return False
+        if node is None:
+            return False
+        if condition['type'] == 'has_class':
+            return condition['text'] in node.attrs.get('class', '')
+        if condition['type'] == 'text_contains':
+            return condition['text'] in node.text
+        return True
+
+    def _wait(self, conditions: list, mode: str, timeout_ms: int):
+        # the fake DOM only changes on its timers: sleep until the next one, like an observer callback
+        deadline = monotonic() + timeout_ms / 1000
+        while True:
+            self._apply_timers()
+            states = [self._condition(condition) for condition in conditions]
+            if (all if mode == ALL else any)(states) or monotonic() >= deadline:
+                return states
+            wake = self._loaded_at + self._timers[0][0] / 1000 if self._timers else deadline
+            sleep(max(0, min(wake, deadline) - monotonic()))
+
+    # elements
+
+    def _is_attached(self, node: Node):
+        while node.parent is not None:
+            node = node.parent
+        return node is self._document
+
+    def _body(self):
+        return self._document.find(By.TAG_NAME, 'body') or self._document
+
+    def _element(self, node: Node):
+        element = self._elements.get(id(node))
+        if element is None:
+            element = self._elements[id(node)] = FakeElement(self, node, uuid.uuid4().hex)
+        return element
+
+    def _find(self, root: Node, by: str, value: str, single: bool):
+        self._check_session()
+        deadline = monotonic() + self._implicit_wait
+        while True:
+            self._apply_timers()
+            nodes = root.find_all(by, value)
+            if nodes or monotonic() >= deadline:
+                break
+            sleep(_POLL_INTERVAL)
+        if single:
+            if not nodes:
+                raise NoSuchElementException(f'no such element: Unable to locate element: {by}={value}')
+            return self._element(nodes[0])
+        return [self._element(node) for node in nodes]
+
+    def find_element(self, by=By.ID, value=None):
+        return self._find(self._document, by, value, single=True)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._find(self._document, by, value, single=False)
+
+    def find_element_by_id(self, id_):
+        return self.find_element(By.ID, id_)
+
+    def find_element_by_class_name(self, name):
+        return self.find_element(By.CLASS_NAME, name)
+
+    def find_element_by_tag_name(self, name):
+        return self.find_element(By.TAG_NAME, name)
+
+    def find_elements_by_tag_name(self, name):
+        return self.find_elements(By.TAG_NAME, name)
+
+    # input
+
+    def _focus(self, node: Node):
+        self._focused = node
+
+    def _type(self, text: str):
+        node = self._focused
+        for char in text:
+            if char in _ENTER_KEYS:
+                if node is not None and node.tag == 'input':
+                    self._submit(node)
+                    node = self._focused
+            elif node is not None and node.tag in ('input', 'textarea') and \
+                    not _SPECIAL_KEYS_START <= char <= _SPECIAL_KEYS_END:
+                node.attrs['value'] = node.attrs.get('value', '') + char
+
+    def _fill(self, fields: list):
+        missing = []
+        for index, field in enumerate(fields):
+            nodes = self._document.find_all(field['by'], field['value'])
+            if not nodes:
+                missing.append(index)
+            elif nodes[0].attrs.get('type') in ('checkbox', 'radio'):
+                if field['text'].lower() in ('', '0', 'false', 'off'):
+                    nodes[0].attrs.pop('checked', None)
+                else:
+                    nodes[0].attrs['checked'] = ''
+            else:
+                nodes[0].attrs['value'] = field['text']
+        return missing
+
+    def _click(self, node: Node):
+        self._focus(node)
+        button = node
+        while button is not None and button.tag not in ('button', 'input', 'a'):
+            button = button.parent
+        if button is None:
+            return
+        if button.tag == 'a' and 'href' in button.attrs:
+            self._load(urljoin(self._url, button.attrs['href']))
+        elif button.tag == 'button' and button.attrs.get('type', 'submit') == 'submit' or \
+                button.tag == 'input' and button.attrs.get('type') == 'submit':
+            self._submit(button)
+
+    def _submit(self, node: Node):
+        form = node
+        while form is not None and form.tag != 'form':
+            form = form.parent
+        if form is None:
+            return
+        data = [(field.attrs['name'], field.attrs.get('value', '')) for field in form.iter()
+                if field.tag in ('input', 'textarea', 'select') and 'name' in field.attrs]
+        action = urljoin(self._url, form.attrs.get('action', ''))
+        if form.attrs.get('method', 'get').lower() == 'post':
+            self._load(urllib.request.Request(action, data=urlencode(data).encode('utf-8'), method='POST'))
+        else:
+            self._load(action.split('?')[0] + '?' + urlencode(data))
+
+    def _perform_actions(self, actions: list):
+        # W3C actions: the n-th action of every input source belongs to the same tick
+        ticks = max(len(source['actions']) for source in actions) if actions else 0
+        for tick in range(ticks):
+            duration = 0
+            for source in actions:
+                if tick >= len(source['actions']):
+                    continue
+                action = source['actions'][tick]
+                kind = action['type']
+                if kind == 'pause':
+                    duration = max(duration, action.get('duration', 0) / 1000)
+                elif kind == 'pointerMove':
+                    origin = action.get('origin')
+                    if isinstance(origin, dict):
+                        origin = origin.get(_W3C_ELEMENT_KEY)
+                    if isinstance(origin, str) and origin not in ('viewport', 'pointer'):
+                        self._pointer = next((element.node for element in self._elements.values()
+                                              if element.id == origin), None)
+                elif kind == 'pointerUp' and self._pointer is not None:
+                    self._click(self._pointer)
+                elif kind == 'keyDown':
+                    self._type(action['value'])
+            if duration:
+                sleep(duration)
+
+    def execute(self, driver_command: str, params: dict = None):
+        self._check_session()
+        if driver_command == Command.W3C_ACTIONS:
+            self._perform_actions(params['actions'])
+            return {'value': None}
+        if driver_command == Command.W3C_CLEAR_ACTIONS:
+            return {'value': None}
+        raise WebDriverException(f'FakeDriver: command {driver_command} is not supported')
@@ -0,0 +1,144 @@
+"""Local stand-in site for benchmarks, served by an in-process HTTP server.
+
+/static?n=N             - plain page with #content
+/delayed?ms=M           - #late is inserted M ms after load
+/toggle?ms=M            - #box gets the 'ready' css class M ms after load
+/form                   - #name / #email form, #submit posts to /submit;
+                          with a valid session cookie #result 'Thanks, <name>' instead of the form
+/submit (POST)          - 303 to /done?name=..., sets the session cookie (BenchSite.sessions)
+/done?name=...          - #result 'Thanks, <name>'
+/redirect?n=K&to=/path  - K chained 302 redirects, then the target page
+/listing                - #listing rows with relative links and images
+
+Delays and class changes are done by inline scripts in a browser; the same pages carry
+data-bench-* attributes so FakeDriver can emulate them without a JS engine.
+"""
+import html
+import threading
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+
+def _page(title: str, body: str):
+    return f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head>' \
+           f'<body><div id="wrapper">{body}</div></body></html>'
+
+
+def _int(query: dict, name: str, default: int):
+    try:
+        return int(query.get(name, [default])[0])
+    except ValueError:
+        return default
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str = '', headers: dict = None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _session_name(self):
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        token = cookie['bench_session'].value if 'bench_session' in cookie else None
+        return self.server.sessions.get(token)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        route = parts.path
+        if route == '/static':
+            n = _int(query, 'n', 0)
+            items = ''.join(f'<li class="item">item {i}</li>' for i in range(20))
+            self._send(200, _page(f'static {n}', f'<div id="content"><h1>page {n}</h1><ul>{items}</ul></div>'))
+        elif route == '/delayed':
+            ms = _int(query, 'ms', 300)
+            body = f'<template id="late-template" data-bench-delay-ms="{ms}"><div id="late">ready</div></template>' \
+                   f'<script>setTimeout(function () {{ var t = document.getElementById("late-template"); ' \
+                   f't.parentNode.appendChild(t.content.cloneNode(true)); }}, {ms});</script>'
+            self._send(200, _page('delayed', body))
+        elif route == '/toggle':
+            ms = _int(query, 'ms', 300)
+            body = f'<div id="box" class="loading" data-bench-class="ready" data-bench-class-ms="{ms}">box</div>' \
+                   f'<script>setTimeout(function () {{ document.getElementById("box").classList.add("ready"); ' \
+                   f'}}, {ms});</script>'
+            self._send(200, _page('toggle', body))
+        elif route == '/form' and self._session_name() is not None:
+            name = html.escape(self._session_name())
+            self._send(200, _page('form', f'<div id="result">Thanks, {name}</div>'))
+        elif route == '/form':
+            body = '<form id="form" method="post" action="/submit">' \
+                   '<input id="name" name="name" type="text"><input id="email" name="email" type="text">' \
+                   '<button id="submit" type="submit">Send</button></form>'
+            self._send(200, _page('form', body))
+        elif route == '/listing':
+            rows = ''.join(f'<li class="row"><a class="link" href="/static?n={i}">Item {i}</a>'
+                           f'<img class="thumb" src="img/{i}.png" alt="item {i}"></li>' for i in range(3))
+            self._send(200, _page('listing', f'<ul id="listing">{rows}</ul><a id="top" href="#wrapper">top</a>'))
+        elif route == '/done':
+            name = html.escape(query.get('name', [''])[0])
+            self._send(200, _page('done', f'<div id="result">Thanks, {name}</div>'))
+        elif route == '/redirect':
+            n = _int(query, 'n', 1)
+            target = query.get('to', ['/static'])[0]
+            location = f'/redirect?{urlencode({"n": n - 1, "to": target})}' if n > 1 else target
+            self._send(302, '', {'Location': location})
+        else:
+            self._send(404, _page('not found', 'not found'))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        if urlsplit(self.path).path == '/submit':
+            name = form.get('name', [''])[0]
+            token = uuid.uuid4().hex
+            self.server.sessions[token] = name
+            self._send(303, '', {'Location': '/done?' + urlencode({'name': name}),
+                                 'Set-Cookie': f'bench_session={token}; Path=/; HttpOnly'})
+        else:
+            self._send(404, _page('not found', 'not found'))
+
+
+class BenchSite:
+    """with BenchSite() as site: site.url('/static') ..."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.sessions = {}  # session cookie -> submitted name
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='BenchSite', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def sessions(self):
+        """Valid session cookies, clear() to make the saved sessions stale."""
+        return self._server.sessions
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path: str):
+        return self.base_url + path
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,3 @@
+__all__ = ['HttpParser', 'HttpPage']
+
+from HttpParserPack.httpParser import HttpParser, HttpPage
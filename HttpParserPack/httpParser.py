@@ -0,0 +1,240 @@
+import threading
+from collections import OrderedDict, namedtuple
+from email.utils import parsedate_to_datetime
+from random import choice
+from time import monotonic, sleep, time
+from urllib.parse import urljoin
+
+import urllib3
+from colorama import Fore, Style
+from user_agent import generate_user_agent
+
+from MetricsPack import Metrics, echo, metrics as default_metrics
+from ParserPack import Parser
+from ParserPack.extraction import extract_static, normalize_fields
+from ParserPack.staticDom import parse
+
+# result of HttpParser.fetch(): final url after redirects, decoded body, attempts made
+HttpPage = namedtuple('HttpPage', 'url status headers text elapsed attempts proxy')
+
+# statuses worth another attempt through another proxy
+_RETRY_STATUSES = frozenset((407, 408, 429, 500, 502, 503, 504))
+_DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+
+def retry_after(headers: dict):
+    """Seconds of a Retry-After header (delay seconds or an HTTP date), None if missing or invalid."""
+    value = (headers.get('Retry-After') or '').strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0., parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def static_match(document, element: tuple = None, el_has_css_class: tuple = None):
+    """Is the get_page() expectation met by a static document: the element is present / has the class.
+    Locators staticDom does not support count as not met."""
+    try:
+        if element:
+            return document.find(*element) is not None
+        if el_has_css_class:
+            node = document.find(*el_has_css_class[0])
+            return node is not None and el_has_css_class[1] in node.classes
+    except ValueError:
+        return False
+    return True
+
+
+class HttpParser(Parser):
+    """Plain HTTP fetching with the Parser proxy and user-agent lists, no browser, no JavaScript.
+
+    Connections are kept alive in urllib3 pools, one pool manager per proxy (the last max_proxy_pools
+    proxies used). The instance is thread-safe: concurrent fetch() calls share the pools.
+    """
+
+    def __init__(self, marker: str = None, user_agent: bool = True, proxy: bool = False, max_retry: int = 3,
+                 timeout: float = 10, pool_size: int = 16, max_proxy_pools: int = 32, headers: dict = None,
+                 metrics: Metrics = None, backoff: float = .5, max_backoff: float = 10):
+        """pool_size: keep-alive connections per host and proxy;
+        headers: extra request headers sent with every request;
+        backoff, max_backoff: pause before the n-th retry of a refused (429 / 5xx) or failed request,
+        backoff * 2 ** (n - 1) seconds or the Retry-After of the response, capped by max_backoff;
+        a failed connection through a proxy is retried at once through another one."""
+        super(HttpParser, self).__init__()
+        self.set_marker(marker)
+        self._proxy = proxy
+        self._max_retry = max_retry
+        self._timeout = urllib3.Timeout(connect=min(timeout, 5), read=timeout)
+        self._pool_size = pool_size
+        self._max_proxy_pools = max_proxy_pools
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._metrics = metrics or default_metrics
+        self._headers = dict(_DEFAULT_HEADERS, **(headers or {}))
+        if user_agent:
+            u_agent = choice(self._user_agents_list) if len(self._user_agents_list) > 0 else generate_user_agent()
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" user-agent: {u_agent}")
+            self._headers['User-Agent'] = u_agent
+        self._managers = OrderedDict()
+        self._managers_lock = threading.Lock()
+        self._page = None
+        self._document = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close all pooled connections."""
+        with self._managers_lock:
+            managers = list(self._managers.values())
+            self._managers.clear()
+        for manager in managers:
+            manager.clear()
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    @property
+    def current_url(self):
+        return self._page.url if self._page else None
+
+    @property
+    def page_source(self):
+        return self._page.text if self._page else None
+
+    @property
+    def status(self):
+        return self._page.status if self._page else None
+
+    @property
+    def document(self):
+        """staticDom tree of the last get_page() result, parsed on first access."""
+        if self._document is None and self._page is not None:
+            self._document = parse(self._page.text)
+        return self._document
+
+    def _manager(self, proxy: str = None):
+        with self._managers_lock:
+            manager = self._managers.get(proxy)
+            if manager is not None:
+                self._managers.move_to_end(proxy)
+                return manager
+            if proxy:
+                proxy_url = urllib3.util.parse_url(proxy if '://' in proxy else 'http://' + proxy)
+                proxy_headers = urllib3.make_headers(proxy_basic_auth=proxy_url.auth) if proxy_url.auth else None
+                manager = urllib3.ProxyManager(proxy_url._replace(auth=None).url, num_pools=50,
+                                               maxsize=self._pool_size, proxy_headers=proxy_headers)
+            else:
+                manager = urllib3.PoolManager(num_pools=50, maxsize=self._pool_size)
+            self._managers[proxy] = manager
+            evicted = self._managers.popitem(last=False)[1] if len(self._managers) > self._max_proxy_pools else None
+        if evicted is not None:
+            evicted.clear()
+        return manager
+
+    @staticmethod
+    def _final_url(url: str, response):
+        """urllib3 1.x keeps the redirect chain in the retries history only."""
+        history = response.retries.history if response.retries else ()
+        for redirect in history:
+            if redirect.redirect_location:
+                url = urljoin(url, redirect.redirect_location)
+        return url
+
+    def fetch(self, url: str, method: str = 'GET', fields: dict = None, headers: dict = None):
+        """Request url with up to max_retry attempts, a failed proxy is reported and replaced.
+        Returns HttpPage, raises the last error if no attempt got a response."""
+        headers = dict(self._headers, **(headers or {}))
+        start = monotonic()
+        error = None
+        page = None
+        delay = 0
+        for attempt in range(1, self._max_retry + 1):
+            if delay:
+                echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' http retry of {url} in {delay:.2f} s')
+                sleep(delay)
+                delay = 0
+            proxy = self._get_proxy() if self._proxy else None
+            request_start = monotonic()
+            try:
+                with self._metrics.phase('http_request', url=url, attempt=attempt):
+                    response = self._manager(proxy).request(method, url, fields=fields, headers=headers,
+                                                            timeout=self._timeout, retries=urllib3.Retry(
+                                                                total=None, connect=0, read=0, redirect=10))
+            except urllib3.exceptions.HTTPError as e:
+                error = e
+                echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in HttpParser.fetch({url}): ', str(e))
+                self._metrics.inc('http_requests_total', status='error')
+                if proxy:
+                    self.proxy_pool.report_failure(proxy)
+                else:
+                    delay = self._retry_delay(attempt)
+                continue
+            self._metrics.inc('http_requests_total', status=str(response.status))
+            page = HttpPage(self._final_url(url, response), response.status, dict(response.headers),
+                            self._decode(response), monotonic() - start, attempt, proxy)
+            if response.status in _RETRY_STATUSES:
+                if proxy:
+                    self.proxy_pool.report_failure(proxy)
+                delay = self._retry_delay(attempt, retry_after(response.headers))
+                continue
+            if proxy:
+                self.proxy_pool.report_success(proxy, monotonic() - request_start)
+            return page
+        if page is None:
+            raise error
+        return page
+
+    def _retry_delay(self, attempt: int, server_delay: float = None):
+        """Pause before the retry after the attempt, none after the last one."""
+        if attempt >= self._max_retry:
+            return 0
+        delay = server_delay if server_delay is not None else self._backoff * 2 ** (attempt - 1)
+        return min(delay, self._max_backoff)
+
+    @staticmethod
+    def _decode(response):
+        charset = response.headers.get('Content-Type', '').partition('charset=')[2].split(';')[0].strip(' "\'')
+        try:
+            return response.data.decode(charset or 'utf-8', 'replace')
+        except LookupError:
+            # unknown charset name
+            return response.data.decode('utf-8', 'replace')
+
+    def get_page(self, url: str, element: tuple = None, el_has_css_class: tuple = None):
+        """Fetch url, True if it answered below 400 and the expected element (if any) is in the static html.
+        element: tuple[By, str];
+        el_has_css_class: tuple[element[By, str], class];
+        """
+        self._page = None
+        self._document = None
+        try:
+            self._page = self.fetch(url)
+        except urllib3.exceptions.HTTPError:
+            return False
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' http {self._page.status}: {self._page.url}')
+        if self._page.status >= 400:
+            return False
+        return static_match(self.document, element, el_has_css_class)
+
+    def extract(self, fields: dict, properties=('text',)):
+        """WebDriver.extract() over the static html of the last page, None if there is no page."""
+        if self.document is None:
+            return None
+        return extract_static(self.document, normalize_fields(fields, properties), self._page.url)
+
+    def find_element(self, element: tuple):
+        """staticDom node of the last page or None."""
+        return self.document.find(*element) if self.document is not None else None
@@ -0,0 +1,3 @@
+__all__ = ['Metrics', 'JsonlSink', 'metrics', 'echo', 'set_console', 'BYTE_BUCKETS', 'COUNT_BUCKETS']
+
+from MetricsPack.metrics import Metrics, JsonlSink, metrics, echo, set_console, BYTE_BUCKETS, COUNT_BUCKETS
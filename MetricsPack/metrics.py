@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import monotonic
+
+_console = True
+
+# seconds: covers single WebDriver commands up to full page loads with retries
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+# small counts: attempts, responses, items per page
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# bytes: process memory from 64 MB to 8 GB
+BYTE_BUCKETS = tuple(2 ** power for power in range(26, 34))
+
+
+def set_console(enabled: bool):
+    """Turn the colored console output of all packs on / off."""
+    global _console
+    _console = enabled
+
+
+def console_enabled():
+    return _console
+
+
+def echo(*args, **kwargs):
+    """print() that respects set_console()."""
+    if _console:
+        print(*args, **kwargs)
+
+
+def _labels_key(labels: dict):
+    return tuple(sorted(labels.items()))
+
+
+def _prometheus_labels(key: tuple, extra: tuple = ()):
+    pairs = [f'{name}="{str(value)}"' for name, value in key + extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class JsonlSink:
+    """Event sink appending one JSON object per event to a file."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Metrics:
+    """Counters, histograms and a structured event stream.
+
+    Events are dicts {'event': name, 'ts': unix time, 'mono': monotonic time, **fields} passed to every sink;
+    without sinks event() costs one check. Counters and histograms are keyed by name and labels.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self._buckets = tuple(buckets)
+        self._counters = {}
+        self._histograms = {}
+        self._sinks = []
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink):
+        """sink - callable(event: dict), e.g. JsonlSink(path) or list.append."""
+        self._sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink):
+        self._sinks.remove(sink)
+
+    def event(self, name: str, **fields):
+        if not self._sinks:
+            return
+        event = {'event': name, 'ts': time.time(), 'mono': monotonic(), **fields}
+        for sink in self._sinks:
+            sink(event)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, *, buckets: tuple = None, **labels):
+        """buckets - upper bounds of the histogram when it is created, the registry buckets (seconds) by default."""
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                bounds = tuple(buckets) if buckets is not None else self._buckets
+                histogram = self._histograms[key] = {'bounds': bounds, 'buckets': [0] * (len(bounds) + 1),
+                                                     'sum': 0, 'count': 0}
+            histogram['buckets'][bisect_left(histogram['bounds'], value)] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    @contextmanager
+    def phase(self, name: str, **fields):
+        """Time a block: observes 'phase_seconds{phase=name}' and emits a '<name>' event with
+        the duration and outcome (ok / the exception class)."""
+        start = monotonic()
+        outcome = 'ok'
+        try:
+            yield
+        except BaseException as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            duration = monotonic() - start
+            self.observe('phase_seconds', duration, phase=name)
+            self.event(name, duration=duration, outcome=outcome, **fields)
+
+    def snapshot(self):
+        """{'counters': [...], 'histograms': [...]} with labels as dicts."""
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in self._counters.items()]
+            histograms = [{'name': name, 'labels': dict(labels), 'buckets': list(h['bounds']),
+                           'counts': list(h['buckets']), 'sum': h['sum'], 'count': h['count']}
+                          for (name, labels), h in self._histograms.items()]
+        return {'counters': counters, 'histograms': histograms}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def dump_json(self, path: str):
+        self._write(path, json.dumps(self.snapshot(), indent=1))
+
+    def dump_prometheus(self, path: str):
+        """Prometheus text exposition format, for node_exporter textfile collector or a plain scrape."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            histograms = [(key, {'bounds': h['bounds'], 'buckets': list(h['buckets']), 'sum': h['sum'],
+                                 'count': h['count']})
+                          for key, h in histograms]
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name}{_prometheus_labels(labels)} {value}')
+        for (name, labels), h in histograms:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f'# TYPE {name} histogram')
+            cumulative = 0
+            for bound, count in zip(h['bounds'] + ('+Inf',), h['buckets']):
+                cumulative += count
+                lines.append(f'{name}_bucket{_prometheus_labels(labels, (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_sum{_prometheus_labels(labels)} {h["sum"]}')
+            lines.append(f'{name}_count{_prometheus_labels(labels)} {h["count"]}')
+        self._write(path, '\n'.join(lines) + '\n')
+
+    @staticmethod
+    def _write(path: str, content: str):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+# default registry used by WebDriver when no Metrics is given
+metrics = Metrics()
@@ -1,3 +1,5 @@
-__all__ = ['Parser']
+__all__ = ['Parser', 'ProxyPool', 'LineStore']
 
-from ParserPack.parser import Parser
\ No newline at end of file
+from ParserPack.parser import Parser
+from ParserPack.proxyPool import ProxyPool
+from ParserPack.lineStore import LineStore
@@ -0,0 +1,134 @@
+"""Bulk extraction of named fields: one spec, evaluated in the browser by EXTRACT_SCRIPT
+(WebDriver.extract(), a single execute_script round-trip) or on a staticDom tree by extract_static().
+
+fields - {name: locator} or {name: {'locator': locator, 'properties': [...], 'many': bool, 'fields': {...}}};
+locator - (By, selector); properties - what to read from each element: 'text', 'innerHTML', 'outerHTML',
+'textContent' or any attribute / property name ('href', 'value', 'class', 'data-id'...);
+many - all matching elements as a list instead of the first one, no match gives [] (None without many);
+fields - nested fields looked up inside each matched element (rows of a listing), the value is a dict.
+A single property gives the value itself, several give {property: value}.
+
+extract_static() reads the same values from the html, with what a parser can't know left out:
+'text' is the text content with whitespace collapsed, where innerText keeps the line breaks of the rendered
+layout and skips hidden elements; href / src of the elements that have these properties are resolved
+against the page url (no <base href>, no url normalization), other properties are the attribute values,
+not their current state ('value' of an edited input, 'checked').
+"""
+from urllib.parse import urljoin
+
+# find(scope, by, value, many) - selenium locator strategies in page JavaScript, shared by the bulk scripts
+FIND_FUNCTION = """
+function find(scope, by, value, many) {
+    var found = [], i;
+    if (by === 'xpath') {
+        var result = document.evaluate(value, scope, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (i = 0; i < result.snapshotLength; i++) found.push(result.snapshotItem(i));
+    } else if (by === 'link text' || by === 'partial link text') {
+        var links = scope.querySelectorAll('a');
+        for (i = 0; i < links.length; i++) {
+            var text = (links[i].innerText || links[i].textContent || '').trim();
+            if (by === 'link text' ? text === value : text.indexOf(value) !== -1) found.push(links[i]);
+        }
+    } else {
+        var css = by === 'id' ? '[id="' + CSS.escape(value) + '"]'
+            : by === 'name' ? '[name="' + CSS.escape(value) + '"]'
+            : by === 'class name' ? '.' + CSS.escape(value) : value;
+        found = Array.prototype.slice.call(scope.querySelectorAll(css));
+    }
+    return many ? found : found.slice(0, 1);
+}
+"""
+
+EXTRACT_SCRIPT = FIND_FUNCTION + """
+var specs = arguments[0], root = arguments[1] || document;
+function read(element, property) {
+    if (property === 'text') {
+        return (element.innerText !== undefined ? element.innerText : element.textContent || '').trim();
+    }
+    var value = element[property];
+    if (value === undefined || value === null || typeof value === 'object' || typeof value === 'function') {
+        value = element.getAttribute(property);
+    }
+    return value;
+}
+function extract(scope, specs) {
+    var data = {};
+    specs.forEach(function (spec) {
+        var values = find(scope, spec.by, spec.value, spec.many).map(function (element) {
+            if (spec.fields) return extract(element, spec.fields);
+            if (spec.properties.length === 1) return read(element, spec.properties[0]);
+            var item = {};
+            spec.properties.forEach(function (property) { item[property] = read(element, property); });
+            return item;
+        });
+        data[spec.name] = spec.many ? values : (values.length ? values[0] : null);
+    });
+    return data;
+}
+return extract(root, specs);
+"""
+
+
+def normalize_fields(fields: dict, properties=('text',)):
+    """Field specs as plain JSON-able dicts, the argument of EXTRACT_SCRIPT and extract_static()."""
+    specs = []
+    for name, field in fields.items():
+        if not isinstance(field, dict):
+            field = {'locator': field}
+        locator = field.get('locator')
+        if not isinstance(locator, (list, tuple)) or len(locator) != 2:
+            raise ValueError(f'extract: field {name!r} needs a (By, selector) locator, got {locator!r}')
+        field_properties = field.get('properties', properties)
+        if isinstance(field_properties, str):
+            field_properties = [field_properties]
+        specs.append({
+            'name': name,
+            'by': locator[0],
+            'value': locator[1],
+            'many': bool(field.get('many', False)),
+            'properties': list(field_properties),
+            'fields': normalize_fields(field['fields'], properties) if field.get('fields') else None,
+        })
+    return specs
+
+
+# elements whose href / src property is the absolute url in a browser
+_URL_PROPERTIES = {
+    'href': {'a', 'area', 'link', 'base'},
+    'src': {'img', 'script', 'iframe', 'frame', 'embed', 'input', 'source', 'track', 'audio', 'video'},
+}
+
+
+def _read_static(node, prop: str, base_url: str = None):
+    if prop in ('text', 'textContent', 'innerText'):
+        return node.text
+    if prop == 'innerHTML':
+        return node.inner_html
+    if prop == 'outerHTML':
+        return node.outer_html
+    if prop == 'className':
+        prop = 'class'
+    value = node.attrs.get(prop)
+    if value is not None and base_url and node.tag in _URL_PROPERTIES.get(prop, ()):
+        value = urljoin(base_url, value.strip())
+    return value
+
+
+def extract_static(root, specs: list, base_url: str = None):
+    """EXTRACT_SCRIPT over a staticDom node, for pages without a live browser (HTTP pages, cached pages);
+    base_url - url of the page, relative href / src are resolved against it."""
+    data = {}
+    for spec in specs:
+        nodes = root.find_all(spec['by'], spec['value'])
+        if not spec['many']:
+            nodes = nodes[:1]
+        values = []
+        for node in nodes:
+            if spec['fields']:
+                values.append(extract_static(node, spec['fields'], base_url))
+            elif len(spec['properties']) == 1:
+                values.append(_read_static(node, spec['properties'][0], base_url))
+            else:
+                values.append({prop: _read_static(node, prop, base_url) for prop in spec['properties']})
+        data[spec['name']] = values if spec['many'] else (values[0] if values else None)
+    return data
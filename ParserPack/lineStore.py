@@ -0,0 +1,162 @@
+import mmap
+import os
+import re
+import struct
+import threading
+from array import array
+from collections.abc import Sequence
+from random import randrange
+
+from colorama import Fore, Style
+
+from MetricsPack import echo
+
+_INDEX_MAGIC = b'WDPLIDX1'
+_INDEX_HEADER = struct.Struct('<8sQQQ')  # magic, file size, file mtime_ns, lines count
+# start of a line with a non-whitespace byte (bytes.strip() whitespace)
+_LINE_START = re.compile(rb'^[ \t\r\x0b\x0c]*[^ \t\r\n\x0b\x0c]', re.MULTILINE)
+
+
+class SampleCursor:
+    """Endless sampling without replacement over a sequence: every item is returned once per round,
+    rounds are independent random permutations. Lazy Fisher-Yates, memory grows with the draws of the round only."""
+
+    def __init__(self, sequence):
+        self._sequence = sequence
+        self._position = 0
+        self._swaps = {}
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        count = len(self._sequence)
+        if count == 0:
+            raise StopIteration
+        if self._position >= count:
+            self._position = 0
+            self._swaps = {}
+        position = self._position
+        pick = randrange(position, count)
+        index = self._swaps.get(pick, pick)
+        self._swaps[pick] = self._swaps.pop(position, position)
+        self._position += 1
+        return self._sequence[index]
+
+
+class LineView(Sequence):
+    """Read-only sequence over a range of lines of a LineStore (slices of a store)."""
+
+    def __init__(self, store, indexes: range):
+        self._store = store
+        self._indexes = indexes
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return LineView(self._store, self._indexes[item])
+        return self._store[self._indexes[item]]
+
+    def sampler(self):
+        return SampleCursor(self)
+
+
+class LineStore(Sequence):
+    """Read-only view of the non-empty lines of a text file.
+
+    The file is memory-mapped on first access, line start offsets are kept in a '<path>.idx' sidecar
+    (rebuilt when the file changes), also memory-mapped, so len() and store[i] are O(1), nothing is
+    copied into Python lists and all processes opening the same file share the pages.
+    Use LineStore.open(path) to share one instance per file within a process.
+    """
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, path: str, encoding: str = 'utf-8'):
+        self._path = os.path.abspath(path)
+        self._encoding = encoding
+        self._mm = None
+        self._index = None
+        self._index_mm = None
+        self._load_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str, encoding: str = 'utf-8'):
+        key = (os.path.abspath(path), encoding)
+        with cls._stores_lock:
+            store = cls._stores.get(key)
+            if store is None:
+                store = cls._stores[key] = cls(path, encoding)
+            return store
+
+    @property
+    def path(self):
+        return self._path
+
+    def _load(self):
+        with self._load_lock:
+            if self._index is not None:
+                return
+            with open(self._path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b''
+            index = self._open_index(stat) if stat.st_size else array('Q')
+            if index is None:
+                index = self._build_index(mm, stat)
+            self._mm = mm
+            self._index = index
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' {os.path.basename(self._path)} lines count: ' +
+             Fore.CYAN + f'{len(index)}')
+
+    def _open_index(self, stat):
+        index_path = self._path + '.idx'
+        try:
+            with open(index_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < _INDEX_HEADER.size:
+                    return None
+                index_mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            return None
+        magic, size, mtime_ns, count = _INDEX_HEADER.unpack_from(index_mm)
+        if magic != _INDEX_MAGIC or size != stat.st_size or mtime_ns != stat.st_mtime_ns or \
+                len(index_mm) != _INDEX_HEADER.size + count * 8:
+            index_mm.close()
+            return None
+        self._index_mm = index_mm
+        return memoryview(index_mm)[_INDEX_HEADER.size:].cast('Q')
+
+    def _build_index(self, mm, stat):
+        # one regex scan over the mapped file: blank lines are skipped without copying any line
+        offsets = array('Q', (match.start() for match in _LINE_START.finditer(mm)))
+        # the sidecar is an optimization only: a read-only folder keeps the index in memory
+        try:
+            tmp_path = f'{self._path}.idx.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets)))
+                offsets.tofile(f)
+            os.replace(tmp_path, self._path + '.idx')
+        except OSError:
+            pass
+        return offsets
+
+    def __len__(self):
+        if self._index is None:
+            self._load()
+        return len(self._index)
+
+    def __getitem__(self, item):
+        if self._index is None:
+            self._load()
+        if isinstance(item, slice):
+            return LineView(self, range(len(self._index))[item])
+        start = self._index[item]
+        end = self._mm.find(b'\n', start)
+        if end == -1:
+            end = len(self._mm)
+        return self._mm[start:end].decode(self._encoding).strip()
+
+    def sampler(self):
+        """Cursor sampling lines without replacement, a cheap per-consumer alternative to a list copy."""
+        return SampleCursor(self)
@@ -2,16 +2,21 @@ import os
 
 from colorama import Fore, Style
 
+from MetricsPack import echo
+from ParserPack.lineStore import LineStore, SampleCursor
+from ParserPack.proxyPool import ProxyPool
+
 
 class Parser:
     __is_init = False
     __number = 0
     _user_agents_list = []
     _proxies_list = []
+    _proxy_pool = None
 
     def __new__(cls, *args, **kwargs):
         cls.__number += 1
-        print(Fore.YELLOW + f'[INFO]  start {cls.__name__}', Fore.CYAN + f'{cls.__number}')
+        echo(Fore.YELLOW + f'[INFO]  start {cls.__name__}', Fore.CYAN + f'{cls.__number}')
         if not cls.__is_init:
             cls.__is_init = True
             cls._set_variables()
@@ -21,51 +26,63 @@ class Parser:
     def __init__(self):
         super(Parser, self).__init__()
         self._current_proxy = None
-        self._proxies = [proxy for proxy in self._proxies_list]
+        self._proxies = SampleCursor(self._proxies_list)
         self._encoding = 'utf-8'
         self._max_retry = 5
         self._except_print = False
 
     @classmethod
     def _set_variables(cls):
+        # memory-mapped, indexed on first access: nothing is read until a line is needed
         if os.path.exists(os.getcwd() + '/text_files/user-agents.txt'):
-            cls._user_agents_list = cls.__get_user_agents_list()
+            cls._user_agents_list = LineStore.open('text_files/user-agents.txt')
         else:
-            print(Fore.YELLOW + '[INFO]', Style.RESET_ALL +
-                  f' user-agent.txt - not found, by default the user_agent module will be used for generation.')
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL +
+                 f' user-agent.txt - not found, by default the user_agent module will be used for generation.')
         if os.path.exists(os.getcwd() + '/text_files/proxies.txt'):
-            cls._proxies_list = cls.__get_proxies_list()
+            cls._proxies_list = LineStore.open('text_files/proxies.txt')
         else:
-            print(Fore.YELLOW + '[INFO]', Style.RESET_ALL +
-                  f' proxies.txt - not found, using a proxy is not possible.')
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL +
+                 f' proxies.txt - not found, using a proxy is not possible.')
 
     @classmethod
-    def __get_user_agents_list(cls):
-        ua_list = open('text_files/user-agents.txt').read().strip().split('\n')
-        for ua in ua_list:
-            if len(ua) == 0:
-                ua_list.remove(ua)
-        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' user agent list count: ' + Fore.CYAN + f'{len(ua_list)}')
-        return ua_list
+    def use_proxies_shard(cls, index: int, count: int):
+        """Keep only every count-th proxy starting from index, so parallel workers don't share proxies."""
+        if not cls.__is_init:
+            cls.__is_init = True
+            cls._set_variables()
+        if len(cls._proxies_list) >= count:
+            cls._proxies_list = cls._proxies_list[index::count]
+            cls._proxy_pool = None
 
     @classmethod
-    def __get_proxies_list(cls):
-        p_list = open('text_files/proxies.txt').read().strip().split('\n')
-        for p in p_list:
-            if len(p) == 0:
-                p_list.remove(p)
-        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' proxies list count: ' + Fore.CYAN + f'{len(p_list)}')
-        return p_list
+    def get_proxy_pool(cls):
+        """ProxyPool over _proxies_list, shared by all instances of the class."""
+        if cls._proxy_pool is None:
+            cls._proxy_pool = ProxyPool(cls._proxies_list)
+        return cls._proxy_pool
+
+    def _get_proxy(self):
+        """Next proxy from the pool, avoiding the current one."""
+        if len(self._proxies_list) == 0:
+            return None
+        proxy = self.proxy_pool.get(exclude=self._current_proxy, cursor=self._proxies)
+        self._current_proxy = proxy
+        return proxy
 
     @classmethod
     def set_marker(cls, marker: str):
         if marker:
-            print(Fore.YELLOW + f'[INFO]  {cls.__name__}', Fore.MAGENTA + f' {marker}')
+            echo(Fore.YELLOW + f'[INFO]  {cls.__name__}', Fore.MAGENTA + f' {marker}')
 
     @property
     def current_proxy(self):
         return self._current_proxy
 
+    @property
+    def proxy_pool(self):
+        return self.get_proxy_pool()
+
     @property
     def max_retry(self):
         return self._max_retry
@@ -0,0 +1,203 @@
+import atexit
+import json
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from random import random, randrange
+
+from colorama import Fore, Style
+
+from MetricsPack import echo
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are merged without the inter-process lock
+    fcntl = None
+
+
+class ProxyPool:
+    """Proxy selection with health scoring.
+
+    Every proxy gets a rolling (exponentially weighted) latency and success/error counters.
+    get() samples a few proxies, skips quarantined ones and picks among the rest with probability
+    proportional to 1 / latency. A failing proxy is quarantined for base_quarantine * 2 ** (streak - 1)
+    seconds (up to max_quarantine), a success clears the streak. Scores are kept in scores_path between runs;
+    processes sharing the file (runner workers) merge on save: the proxies reported by this pool since
+    the last save replace the stored ones, the rest are refreshed from the file.
+
+    proxies - sequence of 'host:port' strings (Parser._proxies_list);
+    check_url - url requested through the proxy by check();
+    sample_size - candidates looked at by one get();
+    unknown_latency - latency assumed for proxies without measurements, so new proxies get tried.
+    """
+    save_every = 50  # reports between automatic saves
+
+    def __init__(self, proxies, scores_path: str = 'text_files/proxy_scores.json',
+                 check_url: str = 'http://www.gstatic.com/generate_204', sample_size: int = 8,
+                 alpha: float = .3, unknown_latency: float = 1.0,
+                 base_quarantine: float = 30, max_quarantine: float = 3600):
+        self._proxies = proxies
+        self._scores_path = scores_path
+        self._check_url = check_url
+        self._sample_size = sample_size
+        self._alpha = alpha
+        self._unknown_latency = unknown_latency
+        self._base_quarantine = base_quarantine
+        self._max_quarantine = max_quarantine
+        self._scores = {}
+        self._changed = set()  # proxies reported since the last save
+        self._reports = 0
+        self._lock = threading.Lock()
+        self.load()
+        if scores_path:
+            atexit.register(self.save)
+
+    def __len__(self):
+        return len(self._proxies)
+
+    def _score(self, proxy: str):
+        score = self._scores.get(proxy)
+        if score is None:
+            score = self._scores[proxy] = {'latency': None, 'ok': 0, 'fail': 0, 'streak': 0, 'until': 0}
+        return score
+
+    def stats(self, proxy: str):
+        """Copy of the proxy score: latency, ok, fail, streak, until (quarantine end, unix time)."""
+        with self._lock:
+            return dict(self._score(proxy))
+
+    def is_quarantined(self, proxy: str, now: float = None):
+        score = self._scores.get(proxy)
+        return score is not None and score['until'] > (now or time.time())
+
+    def get(self, exclude: str = None, cursor=None):
+        """Pick a healthy proxy, preferring fast ones; exclude is avoided when there is any other choice.
+        cursor - SampleCursor over the proxies the candidates are drawn from (random draws by default)."""
+        count = len(self._proxies)
+        if count == 0:
+            return None
+        if count == 1:
+            return self._proxies[0]
+        draw = (lambda: next(cursor)) if cursor is not None else (lambda: self._proxies[randrange(count)])
+        now = time.time()
+        with self._lock:
+            candidates = []
+            # a few sampling rounds in case most of the list is quarantined
+            for attempt in range(4):
+                for i in range(min(self._sample_size, count)):
+                    proxy = draw()
+                    if proxy != exclude and not self.is_quarantined(proxy, now):
+                        latency = self._scores.get(proxy, {}).get('latency') or self._unknown_latency
+                        candidates.append((proxy, 1 / max(latency, .001)))
+                if candidates:
+                    break
+            if not candidates:
+                # everything sampled is quarantined: take the one released soonest
+                sampled = {draw() for i in range(min(self._sample_size, count))}
+                sampled.discard(exclude)
+                return min(sampled, key=lambda p: self._scores.get(p, {}).get('until', 0)) if sampled else exclude
+        point = random() * sum(weight for proxy, weight in candidates)
+        for proxy, weight in candidates:
+            point -= weight
+            if point <= 0:
+                return proxy
+        return candidates[-1][0]
+
+    def report_success(self, proxy: str, latency: float):
+        with self._lock:
+            score = self._score(proxy)
+            score['latency'] = latency if score['latency'] is None \
+                else self._alpha * latency + (1 - self._alpha) * score['latency']
+            score['ok'] += 1
+            score['streak'] = 0
+            score['until'] = 0
+            self._changed.add(proxy)
+        self._reported()
+
+    def report_failure(self, proxy: str):
+        with self._lock:
+            score = self._score(proxy)
+            score['fail'] += 1
+            score['streak'] += 1
+            quarantine = min(self._base_quarantine * 2 ** (score['streak'] - 1), self._max_quarantine)
+            score['until'] = time.time() + quarantine
+            self._changed.add(proxy)
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' proxy {proxy} quarantined for ' +
+             Fore.CYAN + f'{quarantine:.0f} s')
+        self._reported()
+
+    def _reported(self):
+        with self._lock:
+            self._reports += 1
+            due = self._reports % self.save_every == 0
+        if due:
+            self.save()
+
+    def _check_one(self, proxy: str, timeout: float):
+        handler = urllib.request.ProxyHandler({'http': 'http://' + proxy, 'https': 'http://' + proxy})
+        opener = urllib.request.build_opener(handler)
+        start = time.monotonic()
+        try:
+            with opener.open(self._check_url, timeout=timeout) as response:
+                response.read()
+        except Exception:
+            self.report_failure(proxy)
+            return proxy, None
+        latency = time.monotonic() - start
+        self.report_success(proxy, latency)
+        return proxy, latency
+
+    def check(self, proxies=None, workers: int = 32, timeout: float = 5):
+        """Request check_url through every proxy concurrently, update the scores,
+        return {proxy: latency or None if failed}."""
+        proxies = self._proxies if proxies is None else proxies
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ProxyPool.check') as executor:
+            result = dict(executor.map(lambda proxy: self._check_one(proxy, timeout), proxies))
+        alive = sum(latency is not None for latency in result.values())
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' proxies checked: {len(result)}, alive: ' +
+             Fore.CYAN + f'{alive}')
+        self.save()
+        return result
+
+    def _read_scores(self):
+        if not os.path.exists(self._scores_path):
+            return {}
+        try:
+            with open(self._scores_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in ProxyPool._read_scores(): ', str(e))
+            return {}
+
+    def load(self):
+        if not self._scores_path:
+            return
+        scores = self._read_scores()
+        with self._lock:
+            self._scores.update(scores)
+
+    def save(self):
+        """Merge the scores into scores_path under a file lock: re-read, replace the changed proxies, write."""
+        if not self._scores_path:
+            return
+        folder = os.path.dirname(self._scores_path)
+        if folder and not os.path.isdir(folder):
+            return
+        with open(self._scores_path + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                # released when the lock file is closed
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            stored = self._read_scores()
+            with self._lock:
+                changed = {proxy: self._scores[proxy] for proxy in self._changed}
+                self._changed.clear()
+                # scores other processes saved meanwhile
+                self._scores.update((proxy, score) for proxy, score in stored.items() if proxy not in changed)
+                stored.update(changed)
+                data = json.dumps(stored)
+            tmp_path = f'{self._scores_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self._scores_path)
@@ -0,0 +1,256 @@
+import html
+import re
+from html.parser import HTMLParser
+
+# selenium By values, kept as strings so the module works without selenium
+BY_ID = 'id'
+BY_NAME = 'name'
+BY_CLASS_NAME = 'class name'
+BY_TAG_NAME = 'tag name'
+BY_CSS_SELECTOR = 'css selector'
+BY_XPATH = 'xpath'
+BY_LINK_TEXT = 'link text'
+BY_PARTIAL_LINK_TEXT = 'partial link text'
+
+_void_tags = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source',
+              'track', 'wbr'}
+_raw_text_tags = {'script', 'style'}
+
+
+class Node:
+    """Element of a static HTML document, children are Nodes and text strings in document order."""
+
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+
+    def __repr__(self):
+        return f'<Node {self.tag} {self.attrs}>'
+
+    @property
+    def classes(self):
+        return self.attrs.get('class', '').split()
+
+    @property
+    def elements(self):
+        """Child elements without text."""
+        return [child for child in self.children if isinstance(child, Node)]
+
+    @property
+    def text(self):
+        """Text content, whitespace collapsed, script/style excluded."""
+        parts = []
+        self._collect_text(parts)
+        return ' '.join(' '.join(parts).split())
+
+    def _collect_text(self, parts):
+        if self.tag in _raw_text_tags:
+            return
+        for child in self.children:
+            if isinstance(child, Node):
+                child._collect_text(parts)
+            else:
+                parts.append(child)
+
+    @property
+    def inner_html(self):
+        return ''.join(child.outer_html if isinstance(child, Node) else
+                       (child if self.tag in _raw_text_tags else html.escape(child, quote=False))
+                       for child in self.children)
+
+    @property
+    def outer_html(self):
+        if self.tag == '#document':
+            return self.inner_html
+        attrs = ''.join(f' {name}="{html.escape(value)}"' for name, value in self.attrs.items())
+        if self.tag in _void_tags:
+            return f'<{self.tag}{attrs}>'
+        return f'<{self.tag}{attrs}>{self.inner_html}</{self.tag}>'
+
+    def iter(self):
+        """All descendant elements in document order, <template> content is not part of the document."""
+        for child in self.children:
+            if isinstance(child, Node):
+                yield child
+                if child.tag != 'template':
+                    yield from child.iter()
+
+    def find_all(self, by: str, value: str):
+        if by == BY_ID:
+            return [node for node in self.iter() if node.attrs.get('id') == value]
+        if by == BY_NAME:
+            return [node for node in self.iter() if node.attrs.get('name') == value]
+        if by == BY_CLASS_NAME:
+            return [node for node in self.iter() if value in node.classes]
+        if by == BY_TAG_NAME:
+            return [node for node in self.iter() if node.tag == value.lower()]
+        if by == BY_LINK_TEXT:
+            return [node for node in self.iter() if node.tag == 'a' and node.text == value]
+        if by == BY_PARTIAL_LINK_TEXT:
+            return [node for node in self.iter() if node.tag == 'a' and value in node.text]
+        if by == BY_CSS_SELECTOR:
+            return select(self, value)
+        if by == BY_XPATH:
+            return xpath(self, value)
+        raise ValueError(f'staticDom: unsupported locator strategy {by!r}')
+
+    def find(self, by: str, value: str):
+        """First matching element or None."""
+        found = self.find_all(by, value)
+        return found[0] if found else None
+
+
+class _Builder(HTMLParser):
+    def __init__(self):
+        super(_Builder, self).__init__(convert_charrefs=True)
+        self.root = Node('#document', {})
+        self._current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value if value is not None else '' for name, value in attrs}, self._current)
+        self._current.children.append(node)
+        if tag not in _void_tags:
+            self._current = node
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {name: value if value is not None else '' for name, value in attrs}, self._current)
+        self._current.children.append(node)
+
+    def handle_endtag(self, tag):
+        # tolerate unclosed elements: close up to the nearest open element with this tag
+        node = self._current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self._current = node.parent
+
+    def handle_data(self, data):
+        self._current.children.append(data)
+
+
+def parse(html: str):
+    """Parse an HTML document into a Node tree (the root is '#document')."""
+    builder = _Builder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+# css: compound selectors (tag#id.class[attr], [attr=value], [attr*=value]...) with ' ' and '>' combinators
+_compound_re = re.compile(r'([a-zA-Z*][\w-]*)?((?:[#.][\w-]+|\[[^\]]+\]|:nth-child\(\d+\))*)')
+_part_re = re.compile(r'#([\w-]+)|\.([\w-]+)|\[\s*([\w-]+)\s*(?:([~^$*|]?=)\s*["\']?([^"\'\]]*)["\']?)?\s*\]'
+                      r'|:nth-child\((\d+)\)')
+
+
+def _parse_compound(text: str):
+    match = _compound_re.fullmatch(text)
+    if not match:
+        raise ValueError(f'staticDom: unsupported css selector part {text!r}')
+    tag, rest = match.group(1), match.group(2)
+    checks = []
+    for part in _part_re.finditer(rest):
+        checks.append(part.groups())
+    return (tag.lower() if tag and tag != '*' else None), checks
+
+
+def _attr_matches(value, op, expected):
+    if value is None:
+        return False
+    if op is None:
+        return True
+    if op == '=':
+        return value == expected
+    if op == '~=':
+        return expected in value.split()
+    if op == '^=':
+        return value.startswith(expected)
+    if op == '$=':
+        return value.endswith(expected)
+    if op == '*=':
+        return expected in value
+    if op == '|=':
+        return value == expected or value.startswith(expected + '-')
+    return False
+
+
+def _matches(node: Node, compound):
+    tag, checks = compound
+    if tag and node.tag != tag:
+        return False
+    for id_, class_, attr, op, expected, nth in checks:
+        if id_ and node.attrs.get('id') != id_:
+            return False
+        if class_ and class_ not in node.classes:
+            return False
+        if attr and not _attr_matches(node.attrs.get(attr), op, expected):
+            return False
+        if nth:
+            siblings = node.parent.elements if node.parent else [node]
+            if siblings.index(node) + 1 != int(nth):
+                return False
+    return True
+
+
+def _tokenize_css(selector: str):
+    """'div.a > span b' -> [compound, '>', compound, ' ', compound]"""
+    tokens = []
+    for chunk in re.split(r'\s*(>)\s*|\s+', selector.strip()):
+        if chunk is None or chunk == '':
+            continue
+        if chunk == '>':
+            tokens.append('>')
+        else:
+            if tokens and tokens[-1] not in ('>', ' '):
+                tokens.append(' ')
+            tokens.append(_parse_compound(chunk))
+    return tokens
+
+
+def _match_chain(node: Node, tokens: list):
+    """Does node match the last compound of tokens with its ancestors matching the rest."""
+    if not _matches(node, tokens[-1]):
+        return False
+    if len(tokens) == 1:
+        return True
+    combinator, rest = tokens[-2], tokens[:-2]
+    parent = node.parent
+    if combinator == '>':
+        return parent is not None and parent.tag != '#document' and _match_chain(parent, rest)
+    while parent is not None and parent.tag != '#document':
+        if _match_chain(parent, rest):
+            return True
+        parent = parent.parent
+    return False
+
+
+def select(root: Node, selector: str):
+    """Elements matching a (comma separated) css selector, in document order."""
+    groups = [_tokenize_css(part) for part in selector.split(',') if part.strip()]
+    return [node for node in root.iter() if any(_match_chain(node, tokens) for tokens in groups)]
+
+
+# xpath: //tag, //tag[@attr="value"], //*[@id="value"], //tag[contains(@attr, "value")], //tag[text()="value"]
+_xpath_re = re.compile(r'//([\w*-]+)(?:\[(?:@([\w-]+)\s*=\s*["\']([^"\']*)["\']'
+                       r'|contains\(\s*@([\w-]+)\s*,\s*["\']([^"\']*)["\']\s*\)'
+                       r'|text\(\)\s*=\s*["\']([^"\']*)["\'])\])?')
+
+
+def xpath(root: Node, expression: str):
+    match = _xpath_re.fullmatch(expression.strip())
+    if not match:
+        raise ValueError(f'staticDom: unsupported xpath {expression!r}')
+    tag, attr, value, contains_attr, contains_value, text = match.groups()
+    found = []
+    for node in root.iter():
+        if tag != '*' and node.tag != tag.lower():
+            continue
+        if attr and node.attrs.get(attr) != value:
+            continue
+        if contains_attr and contains_value not in node.attrs.get(contains_attr, ''):
+            continue
+        if text is not None and node.text != text:
+            continue
+        found.append(node)
+    return found
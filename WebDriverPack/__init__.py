@@ -1,3 +1,19 @@
-__all__ = ['WebDriver']
+__all__ = ['WebDriver', 'WebDriverPool', 'AsyncWebDriver', 'ForwardingProxy', 'TimingPolicy', 'ThroughputTiming',
+           'RecoveryPolicy', 'LoadProfile', 'PageCache', 'SessionState', 'BrowserHost',
+           'LifecyclePolicy', 'TabSet', 'NetworkCapture', 'DriverService', 'fetch_many']
 
 from WebDriverPack.webDriver import WebDriver
+from WebDriverPack.pool import WebDriverPool
+from WebDriverPack.asyncWebDriver import AsyncWebDriver
+from WebDriverPack.forwardProxy import ForwardingProxy
+from WebDriverPack.timing import TimingPolicy, ThroughputTiming
+from WebDriverPack.recovery import RecoveryPolicy
+from WebDriverPack.loadProfile import LoadProfile
+from WebDriverPack.pageCache import PageCache
+from WebDriverPack.sessionState import SessionState
+from WebDriverPack.browserHost import BrowserHost
+from WebDriverPack.lifecycle import LifecyclePolicy
+from WebDriverPack.tabs import TabSet
+from WebDriverPack.networkCapture import NetworkCapture
+from WebDriverPack.driverService import DriverService
+from WebDriverPack.batch import fetch_many
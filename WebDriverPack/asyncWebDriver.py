@@ -0,0 +1,171 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import monotonic
+
+from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+
+from WebDriverPack.loadProfile import LoadProfile
+from WebDriverPack.networkCapture import NetworkCapture
+from WebDriverPack.webDriver import CALL, NEW_DRIVER, PAUSE, SLEEP, WAIT, WebDriver
+
+
+class AsyncWebDriver:
+    """asyncio front-end for WebDriver.
+
+    Every WebDriver command is a short blocking HTTP call, it runs on a thread pool shared by all
+    AsyncWebDriver instances. Waits and pauses between commands are awaited on the event loop,
+    so a thread is busy only for the duration of a single command, not for a whole wait.
+    The driver implicit wait is set to 0: failed lookups return at once and are polled by the event loop.
+    """
+    _executor = None
+    _executor_lock = threading.Lock()
+    executor_workers = 32
+
+    def __init__(self, web_driver: WebDriver, poll_frequency: float = .1):
+        self._web_driver = web_driver
+        self._poll_frequency = poll_frequency
+        self._web_driver.driver.implicitly_wait(0)
+
+    @classmethod
+    async def create(cls, poll_frequency: float = .1, **driver_kwargs):
+        """Start a WebDriver(**driver_kwargs) without blocking the event loop."""
+        web_driver = await cls._run(partial(WebDriver, **driver_kwargs))
+        return cls(web_driver, poll_frequency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.quit()
+
+    @classmethod
+    def _get_executor(cls):
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=cls.executor_workers,
+                                                   thread_name_prefix='AsyncWebDriver')
+            return cls._executor
+
+    @classmethod
+    async def _run(cls, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(cls._get_executor(), func, *args)
+
+    @property
+    def web_driver(self):
+        return self._web_driver
+
+    @property
+    def driver(self):
+        return self._web_driver.driver
+
+    @property
+    def attempts(self):
+        return self._web_driver.attempts
+
+    @property
+    def captured(self):
+        return self._web_driver.captured
+
+    async def current_url(self):
+        return await self._run(lambda: self._web_driver.current_url)
+
+    async def page_source(self):
+        return await self._run(lambda: self._web_driver.page_source)
+
+    async def quit(self):
+        await self._run(self._web_driver.quit)
+
+    async def _reset_driver(self):
+        await self._run(self._web_driver._reset_driver)
+        await self._run(self.driver.implicitly_wait, 0)
+
+    async def _wait(self, condition, timeout: float):
+        """Async analogue of WebDriverWait(driver, timeout).until(condition)."""
+        end_time = monotonic() + timeout
+        while True:
+            try:
+                value = await self._run(condition, self.driver)
+                if value:
+                    return value
+            except (NoSuchElementException, StaleElementReferenceException):
+                pass
+            if monotonic() > end_time:
+                raise TimeoutException(f'AsyncWebDriver: condition is not met in {timeout} s')
+            await asyncio.sleep(self._poll_frequency)
+
+    async def _pause(self, phase: str, element=None):
+        """TimingPolicy.wait() on the event loop: sleep for the phase delay or poll its readiness condition."""
+        timing = self._web_driver.timing
+        condition = timing.condition(phase, element)
+        start = monotonic()
+        if condition is None:
+            seconds = timing.delay(phase)
+            if seconds:
+                await asyncio.sleep(seconds)
+        else:
+            try:
+                await self._wait(condition, timing.timeout)
+            except TimeoutException:
+                pass
+        timing.record(phase, monotonic() - start)
+
+    async def _run_steps(self, steps):
+        """WebDriver._run_steps() on the event loop."""
+        send, value = steps.send, None
+        while True:
+            try:
+                step = send(value)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                value, send = await self._step(*step), steps.send
+            except Exception as e:
+                value, send = e, steps.throw
+
+    async def _step(self, kind: str, *args):
+        if kind == CALL:
+            return await self._run(*args)
+        if kind == PAUSE:
+            return await self._pause(*args)
+        if kind == WAIT:
+            return await self._wait(*args[:2])
+        if kind == SLEEP:
+            return await asyncio.sleep(args[0])
+        if kind == NEW_DRIVER:
+            # a restarted browser comes with the default implicit wait
+            return await self._run(self.driver.implicitly_wait, 0)
+
+    async def save_session(self, path: str = None):
+        """Awaitable WebDriver.save_session()."""
+        return await self._run(self._web_driver.save_session, path)
+
+    async def extract(self, fields: dict, properties=('text',), root=None):
+        """Awaitable WebDriver.extract()."""
+        return await self._run(self._web_driver.extract, fields, properties, root)
+
+    async def get_element(self, element: tuple[webdriver.common.by.By, str]):
+        await self._run(self._web_driver._load_cached_page)
+        if await self.current_url() == 'data:,':
+            return None
+        return await self._run(lambda: self.driver.find_element(*element))
+
+    async def get_page(self, url: str, el_max_wait_time: float = 3, element: tuple[webdriver.common.by.By, str] = None,
+                       el_has_css_class: tuple[tuple[webdriver.common.by.By, str], str] = None,
+                       form_data: list[list[tuple[webdriver.common.by.By, str], str]] = None,
+                       recaptcha: bool = False, recaptcha_type: str = 'v2',
+                       recaptcha_image_element: tuple[webdriver.common.by.By, str] = None,
+                       submit_button: tuple[webdriver.common.by.By, str] = None,
+                       submit_check_element: list[tuple[webdriver.common.by.By, str], str] = None,
+                       load_profile: LoadProfile = None, use_cache: bool = True, fill_mode: str = None,
+                       capture: NetworkCapture = None):
+        """Awaitable WebDriver.get_page(), same arguments, result, metrics and recovery: the steps are
+        WebDriver._page_steps(), driver commands run on the shared executor, waits and pauses are awaited
+        on the event loop. Recaptcha solvers are long blocking sequences, they run on the executor as is.
+        """
+        return await self._run_steps(self._web_driver._page_steps(
+            'AsyncWebDriver.get_page()', url, el_max_wait_time, element, el_has_css_class, form_data, recaptcha,
+            recaptcha_type, recaptcha_image_element, submit_button, submit_check_element, load_profile, use_cache,
+            fill_mode, capture))
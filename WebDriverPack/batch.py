@@ -0,0 +1,192 @@
+import inspect
+import json
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from time import monotonic
+
+from colorama import Fore, Style
+
+from HttpParserPack.httpParser import HttpParser, static_match
+from MetricsPack import echo
+from ParserPack.extraction import extract_static, normalize_fields
+from ParserPack.staticDom import parse
+from WebDriverPack.loadProfile import LoadProfile
+from WebDriverPack.networkCapture import NetworkCapture
+from WebDriverPack.webDriver import WebDriver
+from WebDriverPack.pool import WebDriverPool
+
+# get_page() keyword arguments a page spec may carry, other keys (id, tags...) are passed through to the result
+_get_page_args = frozenset(inspect.signature(WebDriver.get_page).parameters) - {'self'}
+# specs with these keys interact with the page or read its network traffic, only a browser can do it
+_browser_only_args = ('form_data', 'recaptcha', 'submit_button', 'capture')
+
+MODES = ('browser', 'http', 'auto')
+
+
+def page_spec(spec):
+    """Normalize a page spec: 'url' or {'url': url, <get_page kwargs>, 'extract': <fields>, <any user keys>}.
+    extract - WebDriver.extract() fields read from the loaded page into the result 'data'."""
+    if isinstance(spec, str):
+        return {'url': spec}
+    if 'url' not in spec:
+        raise ValueError(f'page spec without url: {spec!r}')
+    return dict(spec)
+
+
+def _locators_to_tuples(value):
+    """JSON has no tuples: turn [by, selector] pairs (and nested lists of them) back into tuples."""
+    if isinstance(value, list):
+        value = [_locators_to_tuples(item) for item in value]
+        if len(value) == 2 and isinstance(value[0], str) and (value[1] is None or isinstance(value[1], str)):
+            return tuple(value)
+    return value
+
+
+def page_spec_from_json(line: str):
+    """Page spec from a task line: a bare url or a JSON object with url and get_page() kwargs."""
+    line = line.strip()
+    if not line.startswith('{'):
+        return page_spec(line)
+    spec = json.loads(line)
+    for key in _get_page_args.intersection(spec):
+        if key != 'form_data':
+            spec[key] = _locators_to_tuples(spec[key])
+    if spec.get('form_data'):
+        # [[[by, selector], text], ...] - the field text must stay a string
+        spec['form_data'] = [[_locators_to_tuples(field[0]), field[1]] for field in spec['form_data']]
+    return page_spec(spec)
+
+
+def get_page_kwargs(spec: dict):
+    """get_page() keyword arguments of the page spec, a load_profile dict becomes a LoadProfile,
+    a capture dict a NetworkCapture."""
+    kwargs = {key: value for key, value in spec.items() if key in _get_page_args}
+    if isinstance(kwargs.get('load_profile'), dict):
+        kwargs['load_profile'] = LoadProfile(**kwargs['load_profile'])
+    if isinstance(kwargs.get('capture'), dict):
+        kwargs['capture'] = NetworkCapture(**kwargs['capture'])
+    return kwargs
+
+
+def fetch_page(web_driver: WebDriver, spec: dict):
+    """Run get_page() for one page spec and return the result dict:
+    {'spec', 'url', 'ok', 'attempts', 'current_url', 'page_source', 'data', 'error', 'elapsed', 'via'},
+    plus 'responses' - the captured responses as dicts for a spec with capture."""
+    start = monotonic()
+    result = {'spec': spec, 'url': spec['url'], 'ok': False, 'attempts': 0,
+              'current_url': None, 'page_source': None, 'data': None, 'error': None, 'via': 'browser'}
+    try:
+        result['ok'] = web_driver.get_page(**get_page_kwargs(spec))
+        result['attempts'] = web_driver.attempts
+        result['current_url'] = web_driver.current_url
+        if result['ok']:
+            result['page_source'] = web_driver.page_source
+            if spec.get('extract'):
+                result['data'] = web_driver.extract(spec['extract'])
+            if spec.get('capture'):
+                result['responses'] = [response._asdict() for response in web_driver.captured]
+    except Exception as e:
+        result['attempts'] = web_driver.attempts
+        result['error'] = str(e)
+        echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in batch.fetch_page({spec["url"]}): ', str(e))
+    result['elapsed'] = monotonic() - start
+    return result
+
+
+def needs_browser(spec: dict):
+    """Does the spec interact with the page (forms, recaptcha), so plain HTTP can't serve it."""
+    return any(spec.get(key) for key in _browser_only_args)
+
+
+def fetch_page_http(http_parser: HttpParser, spec: dict, fallback=None):
+    """Plain HTTP version of fetch_page(), same result dict with 'via': 'http'.
+    fallback - callable(spec) -> result dict, used when the static html does not meet the spec
+    (element missing, error status, form / recaptcha specs), 'auto' mode of fetch_many()."""
+    start = monotonic()
+    result = {'spec': spec, 'url': spec['url'], 'ok': False, 'attempts': 0,
+              'current_url': None, 'page_source': None, 'data': None, 'error': None, 'via': 'http'}
+    if fallback is not None and needs_browser(spec):
+        return fallback(spec)
+    try:
+        page = http_parser.fetch(spec['url'])
+        result['attempts'] = page.attempts
+        result['current_url'] = page.url
+        document = parse(page.text)
+        result['ok'] = page.status < 400 and not needs_browser(spec) and \
+            static_match(document, spec.get('element'), spec.get('el_has_css_class'))
+        if result['ok']:
+            result['page_source'] = page.text
+            if spec.get('extract'):
+                result['data'] = extract_static(document, normalize_fields(spec['extract']), page.url)
+    except Exception as e:
+        result['error'] = str(e)
+        echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in batch.fetch_page_http({spec["url"]}): ', str(e))
+    if not result['ok'] and fallback is not None:
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' static html does not match, browser fallback: {spec["url"]}')
+        return fallback(spec)
+    result['elapsed'] = monotonic() - start
+    return result
+
+
+def fetch_many(pages, concurrency: int = 4, pool: WebDriverPool = None, mode: str = 'browser',
+               http_parser: HttpParser = None, browser_concurrency: int = None, **driver_kwargs):
+    """Fetch page specs concurrently, yield result dicts as they complete.
+
+    pages - iterable of page specs (see page_spec()), consumed lazily;
+    concurrency - pages in progress at once;
+    pool - sessions source, by default a pool of `browser_concurrency` (`concurrency` if None) sessions
+    is created on demand and closed at the end;
+    mode - 'browser': WebDriver.get_page(); 'http': plain HTTP only (HttpParser);
+    'auto': plain HTTP first, the browser only when the static html does not contain the expected element;
+    http_parser - HTTP client for 'http' / 'auto', by default one is created with the proxy / max_retry
+    settings of driver_kwargs;
+    driver_kwargs - WebDriver(...) arguments for the created pool (max_retry sets the per-page retry budget).
+    """
+    if concurrency < 1:
+        raise ValueError('fetch_many(): concurrency must be >= 1')
+    if mode not in MODES:
+        raise ValueError(f'fetch_many(): mode must be one of {MODES}')
+    own_pool = pool is None and mode != 'http'
+    if own_pool:
+        # sessions start on first checkout: an 'auto' run served by HTTP never launches a browser
+        pool = WebDriverPool(min_size=0, max_size=browser_concurrency or concurrency, prestart=False,
+                             **driver_kwargs)
+    own_parser = http_parser is None and mode != 'browser'
+    if own_parser:
+        http_parser = HttpParser(proxy=driver_kwargs.get('proxy', False), max_retry=driver_kwargs.get('max_retry', 3),
+                                 pool_size=concurrency)
+
+    def browser_task(spec):
+        with pool.driver() as web_driver:
+            return fetch_page(web_driver, spec)
+
+    if mode == 'browser':
+        task = browser_task
+    else:
+        def task(spec):
+            return fetch_page_http(http_parser, spec, browser_task if mode == 'auto' else None)
+
+    pages = iter(pages)
+    pending = set()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='fetch_many') as executor:
+            try:
+                # keep at most 2 * concurrency specs in flight so a huge input is never materialized
+                for spec in pages:
+                    pending.add(executor.submit(task, page_spec(spec)))
+                    if len(pending) >= 2 * concurrency:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            finally:
+                # the consumer stopped early: drop the queued specs, running ones finish
+                for future in pending:
+                    future.cancel()
+    finally:
+        if own_pool:
+            pool.close()
+        if own_parser:
+            http_parser.close()
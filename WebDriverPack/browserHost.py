@@ -0,0 +1,114 @@
+import json
+import os
+import signal
+import subprocess
+import urllib.request
+from time import monotonic, sleep
+
+from colorama import Fore, Style
+
+from MetricsPack import echo
+from WebDriverPack.patch import find_chrome_binary
+
+
+class BrowserHost:
+    """Chrome started once with --remote-debugging-port and --user-data-dir, WebDriver(browser_host=...)
+    attaches chromedriver to it (debuggerAddress) and leaves it running on quit.
+
+    The browser is spawned detached from the launching process when nothing answers on the port, cookies,
+    cache and storage stay in profile_dir between runs. Launch arguments (headless, user-agent, proxy)
+    belong to the host, an attached session can't change them.
+    """
+
+    def __init__(self, port: int = 9222, profile_dir: str = 'browser_profile', host: str = '127.0.0.1',
+                 headless: bool = False, chrome_binary: str = None, arguments: tuple = (),
+                 start_timeout: float = 20):
+        self.port = port
+        self.profile_dir = os.path.abspath(profile_dir)
+        self.host = host
+        self.headless = headless
+        self.chrome_binary = chrome_binary
+        self.arguments = tuple(arguments)
+        self.start_timeout = start_timeout
+
+    def __repr__(self):
+        return f'BrowserHost({self.address}, profile_dir={self.profile_dir!r})'
+
+    @property
+    def address(self):
+        return f'{self.host}:{self.port}'
+
+    @property
+    def _pid_path(self):
+        return os.path.join(self.profile_dir, 'browser_host.pid')
+
+    def version(self):
+        """/json/version of the running browser, None if nothing answers on the port."""
+        try:
+            with urllib.request.urlopen(f'http://{self.address}/json/version', timeout=.5) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def is_running(self):
+        return self.version() is not None
+
+    def start(self):
+        """Spawn the browser unless it already answers, returns True if it was spawned."""
+        if self.is_running():
+            return False
+        chrome_binary = self.chrome_binary or find_chrome_binary()
+        if chrome_binary is None:
+            raise RuntimeError('BrowserHost: Chrome binary is not found, set chrome_binary or CHROME_BINARY')
+        os.makedirs(self.profile_dir, exist_ok=True)
+        command = [chrome_binary, f'--remote-debugging-port={self.port}', f'--remote-debugging-address={self.host}',
+                   f'--user-data-dir={self.profile_dir}', '--no-first-run', '--no-default-browser-check']
+        if self.headless:
+            command.append('--headless')
+        command.extend(self.arguments)
+        command.append('about:blank')
+        if os.name == 'nt':
+            detached = {'creationflags': subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            detached = {'start_new_session': True}
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL, close_fds=True, **detached)
+        with open(self._pid_path, 'w') as f:
+            f.write(str(process.pid))
+        deadline = monotonic() + self.start_timeout
+        while not self.is_running():
+            if process.poll() is not None:
+                raise RuntimeError(f'BrowserHost: Chrome exited with code {process.returncode}')
+            if monotonic() > deadline:
+                raise RuntimeError(f'BrowserHost: no answer on {self.address} in {self.start_timeout} s')
+            sleep(.1)
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' browser host started: {self.address}, pid {process.pid}')
+        return True
+
+    def ensure(self):
+        """Start the browser if it is missing, returns self."""
+        self.start()
+        return self
+
+    def stop(self):
+        """Terminate a browser spawned by start() (by its pid file), returns True if there was one."""
+        try:
+            with open(self._pid_path) as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError):
+            return False
+        try:
+            os.remove(self._pid_path)
+            os.kill(pid, signal.SIGTERM)
+        except OSError as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in BrowserHost.stop(): ', str(e))
+            return False
+        deadline = monotonic() + 10
+        while self.is_running() and monotonic() < deadline:
+            sleep(.1)
+        return True
+
+    def apply_options(self, options):
+        """Point chromedriver at the running browser instead of launching one."""
+        options.add_experimental_option('debuggerAddress', self.address)
+
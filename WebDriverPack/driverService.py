@@ -0,0 +1,179 @@
+import atexit
+import json
+import socket
+import subprocess
+import threading
+import urllib.request
+from itertools import count
+from time import monotonic, sleep
+
+import urllib3
+from colorama import Fore, Style
+from selenium import webdriver
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+
+from MetricsPack import echo
+from WebDriverPack.lifecycle import terminate
+from WebDriverPack.patch import find_chrome_binary, get_chrome_version, get_chromedriver_path
+from WebDriverPack.procinfo import process_tree
+
+# command connections of the process, one per chromedriver url
+_connections = {}
+_connections_lock = threading.Lock()
+# sessions spread over the urls of a service
+_round_robin = count()
+
+
+class _SharedConnection(ChromiumRemoteConnection):
+    """Keep-alive command channel to one chromedriver, shared by all the sessions of the process:
+    up to pool_size idle sockets are kept open, a session quit does not close them."""
+
+    def __init__(self, url: str, pool_size: int = 16):
+        self._pool_size = pool_size
+        super().__init__(url, vendor_prefix='goog', browser_name='chrome', keep_alive=True, ignore_proxy=True)
+
+    def _get_connection_manager(self):
+        return urllib3.PoolManager(maxsize=self._pool_size, timeout=self._timeout)
+
+    def close(self):
+        # webdriver.Remote.quit() closes its connection, the other sessions still use it
+        pass
+
+
+def connection(url: str, pool_size: int = 16):
+    """The shared keep-alive connection to the chromedriver at url."""
+    with _connections_lock:
+        if url not in _connections:
+            _connections[url] = _SharedConnection(url, pool_size)
+        return _connections[url]
+
+
+class RemoteChrome(webdriver.Remote):
+    """Chrome session created on a running chromedriver, with the DevTools command of webdriver.Chrome."""
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+        return self.execute('executeCdpCommand', {'cmd': cmd, 'params': cmd_args})['value']
+
+
+def status(url: str, timeout: float = .5):
+    """/status of the chromedriver at url ({'ready': ..., 'message': ..., 'build': ...}), None if no answer."""
+    try:
+        with urllib.request.urlopen(f'{url}/status', timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8')).get('value')
+    except (OSError, ValueError):
+        return None
+
+
+def _free_port(host: str):
+    with socket.socket() as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+class DriverService:
+    """chromedriver processes started once and shared by many WebDriver(driver_service=...) sessions,
+    each session is a webdriver.Remote on a pooled keep-alive connection instead of its own chromedriver.
+
+    instances - chromedriver processes, new sessions are spread over them round robin;
+    path - chromedriver binary, by default the one matching the local Chrome (as WebDriver resolves it).
+    Sessions in other processes (runner workers) attach by the urls: WebDriver(driver_service=service.urls).
+    The processes are stopped by stop(), on leaving a with block or at interpreter exit.
+    """
+
+    def __init__(self, instances: int = 1, path: str = None, host: str = '127.0.0.1', start_timeout: float = 20):
+        if instances < 1:
+            raise ValueError('DriverService: instances must be >= 1')
+        self.instances = instances
+        self.path = path
+        self.host = host
+        self.start_timeout = start_timeout
+        self._processes = []
+        self._urls = []
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'DriverService({self._urls or self.instances})'
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def urls(self):
+        return list(self._urls)
+
+    @property
+    def pids(self):
+        return [process.pid for process in self._processes]
+
+    def is_running(self):
+        return bool(self._urls) and all(status(url) for url in self._urls)
+
+    def _resolve_path(self):
+        chrome_binary = find_chrome_binary()
+        if chrome_binary is None:
+            raise RuntimeError('DriverService: Chrome binary is not found, set path or CHROME_BINARY')
+        path = get_chromedriver_path(get_chrome_version(chrome_binary))
+        if path is None:
+            raise RuntimeError('DriverService: no chromedriver for the local Chrome, set path')
+        return path
+
+    def start(self):
+        """Spawn the chromedriver processes unless started, returns self."""
+        with self._lock:
+            if self._processes:
+                return self
+            path = self.path or self._resolve_path()
+            for _ in range(self.instances):
+                port = _free_port(self.host)
+                process = subprocess.Popen([path, f'--port={port}'], stdin=subprocess.DEVNULL,
+                                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True)
+                self._processes.append(process)
+                self._urls.append(f'http://{self.host}:{port}')
+            atexit.register(self.stop)
+            try:
+                for process, url in zip(self._processes, self._urls):
+                    self._wait_ready(process, url)
+            except RuntimeError:
+                self._stop()
+                raise
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' driver service started: {", ".join(self._urls)}')
+        return self
+
+    def _wait_ready(self, process, url: str):
+        deadline = monotonic() + self.start_timeout
+        while not (status(url) or {}).get('ready'):
+            if process.poll() is not None:
+                raise RuntimeError(f'DriverService: chromedriver exited with code {process.returncode}')
+            if monotonic() > deadline:
+                raise RuntimeError(f'DriverService: no answer on {url} in {self.start_timeout} s')
+            sleep(.05)
+
+    def stop(self):
+        """Terminate the chromedriver processes with the browsers of sessions still open."""
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+        if not self._processes:
+            return
+        tree = [pid for process in self._processes for pid in process_tree(process.pid)]
+        terminate(tree)
+        for process in self._processes:
+            process.wait()
+        self._processes = []
+        self._urls = []
+        atexit.unregister(self.stop)
+
+
+def service_url(driver_service):
+    """Command url for a new session: DriverService (started if needed), a url or a list of urls."""
+    if isinstance(driver_service, DriverService):
+        urls = driver_service.start().urls
+    elif isinstance(driver_service, str):
+        urls = [driver_service]
+    else:
+        urls = list(driver_service)
+    return urls[next(_round_robin) % len(urls)]
@@ -0,0 +1,52 @@
+from ParserPack.extraction import FIND_FUNCTION
+
+KEYS = 'keys'  # pointer move + pause + send_keys per field, human-like (default)
+SCRIPT = 'script'  # all values set by one script with input / change events
+
+FILL_MODES = (KEYS, SCRIPT)
+
+# selenium Keys (ENTER, TAB...) are code points of the unicode private use area
+_SPECIAL_KEYS = range(0xE000, 0xE05E)
+
+# sets the values through the native value setters (frameworks like React track those),
+# returns the indexes of the fields that were not found
+FILL_SCRIPT = FIND_FUNCTION + """
+var fields = arguments[0], missing = [];
+function setNative(element, property, value) {
+    var proto = Object.getPrototypeOf(element), descriptor;
+    while (proto && !(descriptor = Object.getOwnPropertyDescriptor(proto, property))) {
+        proto = Object.getPrototypeOf(proto);
+    }
+    if (descriptor && descriptor.set) descriptor.set.call(element, value); else element[property] = value;
+}
+function fire(element, type) {
+    element.dispatchEvent(new Event(type, {bubbles: true}));
+}
+fields.forEach(function (field, index) {
+    var element = find(document, field.by, field.value, false)[0];
+    if (!element) { missing.push(index); return; }
+    if (element.focus) element.focus();
+    var type = (element.type || '').toLowerCase();
+    if (type === 'checkbox' || type === 'radio') {
+        setNative(element, 'checked', ['', '0', 'false', 'off'].indexOf(field.text.toLowerCase()) === -1);
+    } else if (element.isContentEditable) {
+        element.textContent = field.text;
+    } else {
+        setNative(element, 'value', field.text);
+    }
+    fire(element, 'input');
+    fire(element, 'change');
+    if (element.blur) element.blur();
+});
+return missing;
+"""
+
+
+def has_special_keys(text: str):
+    """Does the text hold selenium Keys, which only real key events can deliver."""
+    return any(ord(char) in _SPECIAL_KEYS for char in text)
+
+
+def fill_specs(data: list):
+    """form_data [[(By, str), text], ...] as FILL_SCRIPT arguments."""
+    return [{'by': field[0][0], 'value': field[0][1], 'text': str(field[1])} for field in data]
@@ -0,0 +1,202 @@
+import base64
+import selectors
+import socket
+import socketserver
+import threading
+from urllib.parse import urlsplit
+
+from colorama import Fore, Style
+
+from MetricsPack import echo
+
+
+def _split_proxy(proxy: str):
+    """'[scheme://][user:password@]host:port' -> (host, port, 'user:password' or None)"""
+    if '://' not in proxy:
+        proxy = 'http://' + proxy
+    parts = urlsplit(proxy)
+    credentials = None
+    if parts.username is not None:
+        credentials = f'{parts.username}:{parts.password or ""}'
+    return parts.hostname, parts.port or 80, credentials
+
+
+def _split_target(method: str, target: str):
+    """Request target -> (host, port): 'host:port' / '[ipv6]:port' of CONNECT, an absolute url otherwise.
+    ValueError if it is not a proxy request target."""
+    if method == 'CONNECT':
+        host, separator, port = target.rpartition(':')
+        if host.startswith('[') and host.endswith(']'):
+            host = host[1:-1]
+        if not separator or not host:
+            raise ValueError(f'CONNECT target is not host:port: {target!r}')
+        port = int(port)
+        if not 0 < port < 65536:
+            raise ValueError(f'CONNECT port out of range: {target!r}')
+        return host, port
+    parts = urlsplit(target)
+    if not parts.hostname:
+        raise ValueError(f'request target is not an absolute url: {target!r}')
+    return parts.hostname, parts.port or 80
+
+
+def _reply(client, status: str):
+    try:
+        client.sendall(f'HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'.encode())
+    except OSError:
+        pass
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    buffer_size = 64 * 1024
+
+    def handle(self):
+        proxy = self.server.owner
+        client = self.request
+        head = b''
+        while b'\r\n\r\n' not in head:
+            chunk = client.recv(self.buffer_size)
+            if not chunk:
+                return
+            head += chunk
+            if len(head) > 256 * 1024:
+                return
+        head, rest = head.split(b'\r\n\r\n', 1)
+        lines = head.split(b'\r\n')
+        try:
+            method, target, version = lines[0].decode('latin-1').split(' ', 2)
+            host, port = _split_target(method, target)
+        except ValueError as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in ForwardingProxy: bad request {lines[0][:200]}: ',
+                 str(e))
+            _reply(client, '400 Bad Request')
+            return
+        upstream = proxy.upstream_for(host)
+        try:
+            if upstream:
+                up_host, up_port, credentials = _split_proxy(upstream)
+                remote = socket.create_connection((up_host, up_port), timeout=proxy.connect_timeout)
+                if credentials:
+                    auth = base64.b64encode(credentials.encode()).decode()
+                    lines = [line for line in lines if not line.lower().startswith(b'proxy-authorization:')]
+                    lines.insert(1, f'Proxy-Authorization: Basic {auth}'.encode())
+                # the upstream is a proxy too: it understands CONNECT and absolute-form requests as they are
+                remote.sendall(b'\r\n'.join(lines) + b'\r\n\r\n' + rest)
+            else:
+                remote = socket.create_connection((host, port), timeout=proxy.connect_timeout)
+                if method == 'CONNECT':
+                    client.sendall(f'{version} 200 Connection established\r\n\r\n'.encode())
+                    if rest:
+                        # tunnel data sent along with the CONNECT request
+                        remote.sendall(rest)
+                else:
+                    # direct: origin-form request line, one request per connection
+                    parts = urlsplit(target)
+                    path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+                    headers = [line for line in lines[1:]
+                               if not line.lower().startswith((b'proxy-connection:', b'connection:'))]
+                    request = [f'{method} {path} {version}'.encode()] + headers + [b'Connection: close']
+                    remote.sendall(b'\r\n'.join(request) + b'\r\n\r\n' + rest)
+        except OSError as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL +
+                 f' in ForwardingProxy: {host}:{port} via {upstream or "direct"}: ', str(e))
+            _reply(client, '502 Bad Gateway')
+            return
+        remote.settimeout(None)
+        proxy._track(client, remote)
+        try:
+            self._pipe(client, remote)
+        finally:
+            proxy._untrack(client, remote)
+            remote.close()
+
+    def _pipe(self, client, remote):
+        with selectors.DefaultSelector() as selector:
+            selector.register(client, selectors.EVENT_READ, remote)
+            selector.register(remote, selectors.EVENT_READ, client)
+            while True:
+                for key, events in selector.select():
+                    try:
+                        data = key.fileobj.recv(self.buffer_size)
+                        if not data:
+                            return
+                        key.data.sendall(data)
+                    except OSError:
+                        return
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ForwardingProxy:
+    """Local HTTP proxy Chrome always points at; the upstream proxy behind it is switched at runtime.
+
+    upstream - '[user:password@]host:port' of the upstream HTTP proxy, None for direct connections;
+    selector - optional callable(host) -> upstream or None, consulted for every new connection
+    (per request routing), it overrides upstream.
+    Switching the upstream is instant: no browser restart, new connections go through the new upstream,
+    and with drop_connections=True kept-alive connections to the old one are closed.
+    """
+    connect_timeout = 10
+
+    def __init__(self, upstream: str = None, selector=None, host: str = '127.0.0.1', port: int = 0):
+        self._upstream = upstream
+        self._selector = selector
+        self._connections = set()
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.owner = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='ForwardingProxy', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def address(self):
+        """'host:port' to pass to chrome --proxy-server."""
+        host, port = self._server.server_address[:2]
+        return f'{host}:{port}'
+
+    @property
+    def upstream(self):
+        return self._upstream
+
+    def upstream_for(self, host: str):
+        if self._selector is not None:
+            return self._selector(host)
+        return self._upstream
+
+    def set_upstream(self, upstream: str = None, drop_connections: bool = True):
+        """Route new connections through upstream (None - direct)."""
+        self._upstream = upstream
+        if drop_connections:
+            self.drop_connections()
+
+    def drop_connections(self):
+        with self._lock:
+            connections = list(self._connections)
+        for client, remote in connections:
+            for sock in (client, remote):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def _track(self, client, remote):
+        with self._lock:
+            self._connections.add((client, remote))
+
+    def _untrack(self, client, remote):
+        with self._lock:
+            self._connections.discard((client, remote))
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self.drop_connections()
@@ -0,0 +1,34 @@
+"""Start / stop / check the shared BrowserHost Chrome, e.g. before and after a series of cron jobs.
+
+    python -m WebDriverPack.hostCtl start --port 9222 --profile browser_profile
+    python -m WebDriverPack.hostCtl status
+    python -m WebDriverPack.hostCtl stop
+"""
+import argparse
+import sys
+
+from WebDriverPack.browserHost import BrowserHost
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m WebDriverPack.hostCtl', description=__doc__.split('\n')[0])
+    parser.add_argument('command', choices=('start', 'stop', 'status'))
+    parser.add_argument('--port', type=int, default=9222)
+    parser.add_argument('--profile', default='browser_profile', help='Chrome user data directory')
+    parser.add_argument('--headless', action='store_true')
+    args = parser.parse_args(argv)
+
+    host = BrowserHost(args.port, args.profile, headless=args.headless)
+    if args.command == 'start':
+        if not host.start():
+            print(f'already running on {host.address}')
+    elif args.command == 'stop':
+        print('stopped' if host.stop() else 'no browser started by the host')
+    else:
+        version = host.version()
+        print(f'{host.address}: {version["Browser"] if version else "not running"}')
+        sys.exit(0 if version else 1)
+
+
+if __name__ == '__main__':
+    main()
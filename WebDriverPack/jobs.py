@@ -0,0 +1,189 @@
+import json
+import os
+from hashlib import blake2b
+
+from colorama import Fore, Style
+
+from MetricsPack import echo
+
+
+class Checkpoint:
+    """Completed task ids of a run, kept so that a restarted run skips them.
+
+    The file is an append-only log, one entry per line: an integer id, a range of integer ids 'first-last'
+    or a JSON string id; a line cut by a crash is ignored. compact() (on open and close) folds the integer
+    ids into ranges, so a finished run of a million line-numbered tasks is a one-line file.
+    In memory integer ids below bitmap_limit are a bitmap (125 KB per million, the line-number case),
+    other ids (strings, large integers such as timestamps) 8-byte digests.
+    read_only - for workers that only filter the tasks, the file is not written;
+    sync_every - ids between fsyncs: after a crash up to that many of the last completed tasks may be missing.
+    """
+    bitmap_limit = 2 ** 27  # 16 MB of bitmap at most
+
+    def __init__(self, path: str, read_only: bool = False, sync_every: int = 100):
+        self._path = path
+        self._read_only = read_only
+        self._sync_every = sync_every
+        self._bits = bytearray()
+        self._digests = set()
+        self._others = []  # ids outside the bitmap in the order of completion, for compact()
+        self._count = 0
+        self._pending = 0
+        self._file = None
+        self._load()
+        if not read_only:
+            self.compact()
+            self._file = open(path, 'a', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def path(self):
+        return self._path
+
+    @staticmethod
+    def _digest(task_id):
+        return blake2b(str(task_id).encode('utf-8'), digest_size=8).digest()
+
+    def _in_bitmap(self, task_id):
+        return isinstance(task_id, int) and 0 <= task_id < self.bitmap_limit
+
+    def __contains__(self, task_id):
+        if self._in_bitmap(task_id):
+            byte = task_id >> 3
+            return byte < len(self._bits) and bool(self._bits[byte] & (1 << (task_id & 7)))
+        return self._digest(task_id) in self._digests
+
+    def _mark(self, task_id):
+        """Add to the in-memory set, False if the id was there already."""
+        if task_id in self:
+            return False
+        if self._in_bitmap(task_id):
+            byte = task_id >> 3
+            if byte >= len(self._bits):
+                self._bits.extend(bytes(max(byte + 1 - len(self._bits), len(self._bits))))
+            self._bits[byte] |= 1 << (task_id & 7)
+        else:
+            self._digests.add(self._digest(task_id))
+            self._others.append(task_id)
+        self._count += 1
+        return True
+
+    def _load(self):
+        try:
+            f = open(self._path, encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # cut by a crash
+                line = line.strip()
+                try:
+                    if line.startswith('"'):
+                        self._mark(json.loads(line))
+                    elif '-' in line.lstrip('-'):
+                        first, last = line.split('-', 1)
+                        for task_id in range(int(first), int(last) + 1):
+                            self._mark(task_id)
+                    elif line:
+                        self._mark(int(line))
+                except ValueError:
+                    echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in Checkpoint: bad line {line!r}')
+
+    def _ranges(self):
+        first = last = None
+        for byte_index, byte in enumerate(self._bits):
+            if not byte:
+                continue
+            if byte == 0xFF and last == byte_index * 8 - 1:
+                last += 8
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    task_id = byte_index * 8 + bit
+                    if last is not None and task_id == last + 1:
+                        last = task_id
+                        continue
+                    if first is not None:
+                        yield first, last
+                    first = last = task_id
+        if first is not None:
+            yield first, last
+
+    def compact(self):
+        """Rewrite the file as integer ranges plus the other ids."""
+        if self._read_only or not os.path.exists(self._path):
+            return
+        if self._file is not None:
+            self._file.close()
+        tmp_path = f'{self._path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for first, last in self._ranges():
+                f.write(f'{first}\n' if first == last else f'{first}-{last}\n')
+            for task_id in self._others:
+                f.write(json.dumps(task_id, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
+        if self._file is not None:
+            self._file = open(self._path, 'a', encoding='utf-8')
+
+    def add(self, task_id):
+        """Record a completed task, synced to disk every sync_every ids."""
+        if self._read_only:
+            raise ValueError('Checkpoint: opened read-only')
+        if isinstance(task_id, bool) or not isinstance(task_id, int) or task_id < 0:
+            task_id = str(task_id)
+        if not self._mark(task_id):
+            return
+        if isinstance(task_id, str):
+            self._file.write(json.dumps(task_id, ensure_ascii=False) + '\n')
+        else:
+            self._file.write(f'{task_id}\n')
+        self._pending += 1
+        if self._pending >= self._sync_every:
+            self.flush()
+
+    def flush(self):
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        self.compact()
+
+
+def open_results(path: str, resume: bool):
+    """Results file for writing: appended to on resume, after dropping a line cut by a crash."""
+    if not resume or not os.path.exists(path):
+        return open(path, 'w', encoding='utf-8')
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = position = f.tell()
+        while position > 0:
+            step = min(64 * 1024, position)
+            f.seek(position - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != size:
+            f.truncate(position)
+    return open(path, 'a', encoding='utf-8')
@@ -0,0 +1,134 @@
+import atexit
+import os
+import signal
+import weakref
+from time import monotonic, sleep
+
+from colorama import Fore, Style
+
+from MetricsPack import echo
+from WebDriverPack.procinfo import alive, cmdline, parent, pids, process_tree, tree_rss
+
+# WebDriver instances not yet quit, closed at interpreter exit instead of relying on __del__
+_live = weakref.WeakSet()
+
+
+class LifecyclePolicy:
+    """When WebDriver.get_page() replaces its browser with a fresh one, checked before the navigation.
+
+    max_pages - pages loaded by the browser (navigations, retries included);
+    max_age - seconds since the browser start;
+    max_rss - bytes of the chromedriver + Chrome process tree resident memory (read from /proc);
+    rss_every - read the memory every rss_every pages, the other checks are free.
+    None disables a limit.
+    """
+
+    def __init__(self, max_pages: int = None, max_age: float = None, max_rss: int = None, rss_every: int = 1):
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.max_rss = max_rss
+        self.rss_every = max(1, rss_every)
+
+    def __repr__(self):
+        return f'LifecyclePolicy(max_pages={self.max_pages}, max_age={self.max_age}, max_rss={self.max_rss})'
+
+    def reason(self, pages: int, age: float, rss=None):
+        """'pages' / 'age' / 'rss' if the browser is due for recycling, else None.
+        rss - callable returning the tree RSS, called only when the memory is to be checked."""
+        if self.max_pages is not None and pages >= self.max_pages:
+            return 'pages'
+        if self.max_age is not None and age >= self.max_age:
+            return 'age'
+        if self.max_rss is not None and rss is not None and pages and pages % self.rss_every == 0 \
+                and rss() >= self.max_rss:
+            return 'rss'
+        return None
+
+
+def _driver_root(driver):
+    """Root pid of the processes of a selenium driver, None if unknown: its own chromedriver, or for a session
+    of a shared DriverService the Chrome launched for it, found by the profile dir chromedriver reports."""
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if getattr(process, 'pid', None):
+        return process.pid
+    user_data_dir = (getattr(driver, 'capabilities', None) or {}).get('chrome', {}).get('userDataDir')
+    if not user_data_dir:
+        return None
+    argument = f'--user-data-dir={user_data_dir}'
+    browsers = [pid for pid in pids() if argument in cmdline(pid)]
+    # the renderer / gpu processes repeat the argument, the root is the one without such a parent
+    roots = [pid for pid in browsers if parent(pid) not in browsers]
+    return roots[0] if roots else None
+
+
+def driver_pids(driver):
+    """Process tree of a selenium driver: chromedriver and the browser it launched, empty if unknown."""
+    pid = _driver_root(driver)
+    return process_tree(pid) if pid else []
+
+
+def driver_rss(driver):
+    pid = _driver_root(driver)
+    return tree_rss(pid) if pid else 0
+
+
+def terminate(pid_list: list, grace: float = 3):
+    """SIGTERM the processes still running, SIGKILL those left after grace seconds; returns the pids signalled."""
+    running = [pid for pid in pid_list if pid != os.getpid() and alive(pid)]
+    for pid in running:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+    deadline = monotonic() + grace
+    while monotonic() < deadline and any(alive(pid) for pid in running):
+        sleep(.05)
+    for pid in running:
+        if alive(pid):
+            try:
+                os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            except OSError:
+                pass
+    return running
+
+
+def _is_webdriver_process(pid: int):
+    args = cmdline(pid)
+    name = os.path.basename(args[0]) if args else ''
+    # chromedriver launches Chrome with --test-type=webdriver
+    return 'chromedriver' in name or ('chrom' in name.lower() and '--test-type=webdriver' in args)
+
+
+def orphans():
+    """chromedriver processes and webdriver-launched Chrome left without their parent (re-parented to pid 1)."""
+    return [pid for pid in pids() if parent(pid) == 1 and _is_webdriver_process(pid)]
+
+
+def reap_orphans(grace: float = 3):
+    """Terminate orphaned chromedriver / Chrome process trees of crashed runs, returns the pids signalled.
+    BrowserHost browsers are not launched by chromedriver and are left alone."""
+    found = []
+    for pid in orphans():
+        found.extend(process_tree(pid))
+    if not found:
+        return []
+    echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' reaping {len(found)} orphaned webdriver processes')
+    return terminate(found, grace)
+
+
+def register(web_driver):
+    _live.add(web_driver)
+
+
+def unregister(web_driver):
+    _live.discard(web_driver)
+
+
+@atexit.register
+def shutdown_all():
+    """Quit every WebDriver still running."""
+    for web_driver in list(_live):
+        try:
+            web_driver.quit()
+        except Exception as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in lifecycle.shutdown_all(): ', str(e))
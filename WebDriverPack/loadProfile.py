@@ -0,0 +1,114 @@
+from selenium.common.exceptions import JavascriptException, StaleElementReferenceException
+from selenium.webdriver.support.wait import WebDriverWait
+
+NORMAL = 'normal'  # driver.get() returns after the load event
+EAGER = 'eager'  # after DOMContentLoaded, images / stylesheets / subframes may still load
+NONE = 'none'  # as soon as the new document is committed
+
+STRATEGIES = (NONE, EAGER, NORMAL)
+
+# resource type -> url patterns of Network.setBlockedURLs ('*' is the only wildcard)
+RESOURCE_PATTERNS = {
+    'image': ('*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico', '*.bmp'),
+    'font': ('*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'),
+    'media': ('*.mp4', '*.webm', '*.ogg', '*.ogv', '*.mp3', '*.wav', '*.m4a', '*.m3u8', '*.mov', '*.avi'),
+    'stylesheet': ('*.css',),
+    'script': ('*.js',),
+}
+
+# resource type -> Chrome content setting blocked at launch through prefs (covers urls without extensions)
+_CONTENT_SETTINGS = {
+    'image': 'profile.managed_default_content_settings.images',
+    'script': 'profile.managed_default_content_settings.javascript',
+}
+
+# the old document is marked before a script navigation, the mark disappears with it
+NAVIGATE_SCRIPT = 'window.__wdpNavigating = true; window.location.href = arguments[0];'
+_COMMITTED_SCRIPT = 'return window.__wdpNavigating === undefined && document.readyState'
+READY_STATES = {NONE: ('loading', 'interactive', 'complete'), EAGER: ('interactive', 'complete'),
+                NORMAL: ('complete',)}
+
+
+class LoadProfile:
+    """What a page load downloads and what get_page() waits for.
+
+    block - resource types to block: 'image', 'font', 'media', 'stylesheet', 'script';
+    block_urls - extra url patterns to block, e.g. '*google-analytics.com*' ('*' is the wildcard);
+    page_load_strategy - 'normal' / 'eager' / 'none', when driver.get() returns;
+    element_wait_only - get_page() skips the page readiness wait when an element to wait for is given,
+    by default True for the 'eager' and 'none' strategies.
+
+    As the driver profile (WebDriver(load_profile=...)) the strategy is the session page load strategy,
+    image / script blocking also goes to the Chrome prefs. As a per-call profile (get_page(load_profile=...))
+    the url blocking is switched through DevTools and a lighter strategy than the session one is emulated by
+    a script navigation that does not wait for the load event.
+    """
+
+    def __init__(self, block: tuple = (), block_urls: tuple = (), page_load_strategy: str = NORMAL,
+                 element_wait_only: bool = None):
+        unknown = set(block) - set(RESOURCE_PATTERNS)
+        if unknown:
+            raise ValueError(f'LoadProfile: unknown resource types {sorted(unknown)}, '
+                             f'expected some of {sorted(RESOURCE_PATTERNS)}')
+        if page_load_strategy not in STRATEGIES:
+            raise ValueError(f'LoadProfile: page_load_strategy must be one of {STRATEGIES}')
+        self.block = tuple(block)
+        self.block_urls = tuple(block_urls)
+        self.page_load_strategy = page_load_strategy
+        self.element_wait_only = page_load_strategy != NORMAL if element_wait_only is None else element_wait_only
+
+    def __repr__(self):
+        return f'LoadProfile(block={self.block}, block_urls={self.block_urls}, ' \
+               f'page_load_strategy={self.page_load_strategy!r}, element_wait_only={self.element_wait_only})'
+
+    @property
+    def blocked_urls(self):
+        """All url patterns blocked by the profile."""
+        patterns = [pattern for kind in self.block for pattern in RESOURCE_PATTERNS[kind]]
+        return patterns + [pattern for pattern in self.block_urls if pattern not in patterns]
+
+    def apply_options(self, options):
+        """Launch-time part: page load strategy and content settings prefs of ChromeOptions."""
+        options.page_load_strategy = self.page_load_strategy
+        settings = {_CONTENT_SETTINGS[kind]: 2 for kind in self.block if kind in _CONTENT_SETTINGS}
+        if settings:
+            prefs = dict(options.experimental_options.get('prefs', {}), **settings)
+            options.add_experimental_option('prefs', prefs)
+
+    def apply_driver(self, driver):
+        """Session part: url blocking through DevTools (an empty list clears the previous profile),
+        no commands when nothing is blocked and nothing was. Returns False for drivers without DevTools commands."""
+        if not hasattr(driver, 'execute_cdp_cmd'):
+            return False
+        patterns = self.blocked_urls
+        if patterns or getattr(driver, '_blocked_urls', None):
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            driver._blocked_urls = patterns
+        return True
+
+    def navigate(self, driver, url: str, session_strategy: str = NORMAL, timeout: float = 30):
+        """Load url with this profile's strategy on a session started with session_strategy."""
+        rank = STRATEGIES.index
+        if rank(self.page_load_strategy) >= rank(session_strategy) or '#' in url:
+            driver.get(url)
+            if self.page_load_strategy == session_strategy:
+                return
+            # a heavier strategy than the session one: wait for the rest of the load
+            states = READY_STATES[self.page_load_strategy]
+            condition = lambda d: d.execute_script('return document.readyState') in states
+        else:
+            driver.execute_script(NAVIGATE_SCRIPT, url)
+            states = READY_STATES[self.page_load_strategy]
+            condition = lambda d: d.execute_script(_COMMITTED_SCRIPT) in states
+        # scripts may fail while the old document is being replaced; a dead session or a crashed browser
+        # is not ignored, it goes straight to the recovery policy
+        WebDriverWait(driver, timeout, poll_frequency=.05,
+                      ignored_exceptions=(JavascriptException, StaleElementReferenceException)) \
+            .until(condition, f'page load ({self.page_load_strategy}) timed out: {url}')
+
+
+# all resources, driver.get() waits for the load event: the WebDriver default
+FULL = LoadProfile()
+# text scraping: no images / fonts / media / stylesheets, DOMContentLoaded is enough
+TEXT_ONLY = LoadProfile(block=('image', 'font', 'media', 'stylesheet'), page_load_strategy=EAGER)
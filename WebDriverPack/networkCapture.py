@@ -0,0 +1,104 @@
+import json
+import re
+from collections import namedtuple
+
+from colorama import Fore, Style
+
+from MetricsPack import echo
+
+# a response caught by NetworkCapture: body is parsed JSON for JSON responses, text otherwise, None if lost
+CapturedResponse = namedtuple('CapturedResponse', 'url status mime_type resource_type body request_id')
+
+# Chrome option enabling the DevTools events log read by NetworkCapture (set at launch)
+LOGGING_PREFS = ('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def _wildcard(pattern: str):
+    """'*' wildcard url pattern (as in LoadProfile.block_urls) -> compiled regex."""
+    return re.compile('.*'.join(re.escape(part) for part in pattern.split('*')) + r'\Z', re.DOTALL)
+
+
+class NetworkCapture:
+    """Responses of a page picked from the Chrome DevTools performance log, WebDriver(network_log=True).
+
+    url_pattern - '*' wildcard pattern of the response url ('*/api/items*'), None - any url;
+    mime_types - accepted response MIME types, None - any;
+    resource_types - DevTools resource types ('XHR', 'Fetch', 'Document', 'Script'...), None - any;
+    min_count - get_page(capture=...) waits until this many matching responses have arrived, 0 - no wait.
+    """
+
+    def __init__(self, url_pattern: str = None, mime_types: tuple = ('application/json',),
+                 resource_types: tuple = None, min_count: int = 1):
+        self.url_pattern = url_pattern
+        self.mime_types = tuple(mime_types) if mime_types else None
+        self.resource_types = tuple(resource_types) if resource_types else None
+        self.min_count = min_count
+        self._url_regex = _wildcard(url_pattern) if url_pattern else None
+        self._pending = {}  # requestId -> response params of matching responses not finished loading
+        self.responses = []
+
+    def __repr__(self):
+        return f'NetworkCapture(url_pattern={self.url_pattern!r}, mime_types={self.mime_types}, ' \
+               f'resource_types={self.resource_types}, min_count={self.min_count})'
+
+    @property
+    def done(self):
+        return len(self.responses) >= self.min_count
+
+    def matches(self, url: str, mime_type: str, resource_type: str = None):
+        if self._url_regex is not None and not self._url_regex.match(url):
+            return False
+        if self.mime_types is not None and mime_type not in self.mime_types:
+            return False
+        return self.resource_types is None or resource_type in self.resource_types
+
+    def reset(self):
+        self._pending.clear()
+        self.responses = []
+
+    @staticmethod
+    def discard(driver):
+        """Drop the log entries collected so far (the log is cleared on every read)."""
+        driver.get_log('performance')
+
+    def collect(self, driver):
+        """Read the new log entries, fetch the bodies of finished matching responses; returns the new ones."""
+        new = []
+        for entry in driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                if self.matches(response.get('url', ''), response.get('mimeType', ''), params.get('type')):
+                    self._pending[params['requestId']] = params
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._pending:
+                new.append(self._captured(driver, self._pending.pop(params['requestId'])))
+            elif method == 'Network.loadingFailed':
+                self._pending.pop(params.get('requestId'), None)
+        self.responses.extend(new)
+        return new
+
+    def arrived(self, driver):
+        """collect(), then True once min_count responses have arrived (a wait condition)."""
+        self.collect(driver)
+        return self.done
+
+    @staticmethod
+    def _captured(driver, params: dict):
+        response = params['response']
+        body = None
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+            body = result['body']
+            if result.get('base64Encoded'):
+                body = None  # binary
+            elif 'json' in response.get('mimeType', ''):
+                body = json.loads(body)
+        except Exception as e:
+            # evicted from the DevTools buffer or not JSON after all: keep what there is
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in NetworkCapture: {response.get("url")}: ', str(e))
+        return CapturedResponse(response.get('url'), response.get('status'), response.get('mimeType'),
+                                params.get('type'), body, params['requestId'])
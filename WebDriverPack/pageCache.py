@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from colorama import Fore, Style
+
+from MetricsPack import Metrics, echo, metrics as default_metrics
+
+
+class PageCache:
+    """On-disk cache of rendered pages: final url + page_source by a key of url and wait spec.
+
+    Page sources are zlib-compressed and content-addressed ('<path>/blobs/ab/<sha256>.z'), so equal pages
+    under different keys are stored once. The index is an sqlite database ('<path>/index.sqlite'), safe to
+    share between threads and processes.
+    ttl - seconds an entry is served, None - forever;
+    max_bytes - compressed size bound, least recently used entries are evicted above it.
+    The size is a running total of this instance: above max_bytes the least recently used entries are dropped
+    down to 90% of it; every evict_every stores a full pass drops the expired entries and re-counts the total
+    with the blobs stored by other processes.
+    Blob files are removed and written back only inside an index write transaction, so an entry never points
+    at a blob another process has just dropped.
+    """
+    evict_every = 100
+
+    def __init__(self, path: str = 'cache/pages', ttl: float = 24 * 3600, max_bytes: int = 512 * 2 ** 20,
+                 compress_level: int = 6, metrics: Metrics = None):
+        self._path = os.path.abspath(path)
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._compress_level = compress_level
+        self._metrics = metrics or default_metrics
+        self._open()
+
+    def __getstate__(self):
+        # the sqlite connection can't cross processes: a pickled cache (runner workers) reopens the index
+        return {'path': self._path, 'ttl': self._ttl, 'max_bytes': self._max_bytes,
+                'compress_level': self._compress_level}
+
+    def __setstate__(self, state):
+        self._path = state['path']
+        self._ttl = state['ttl']
+        self._max_bytes = state['max_bytes']
+        self._compress_level = state['compress_level']
+        self._metrics = default_metrics
+        self._open()
+
+    def _open(self):
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stores': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self._path, 'blobs'), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(self._path, 'index.sqlite'), timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+        with self._lock:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, url TEXT, final_url TEXT, '
+                             'digest TEXT, created REAL, accessed REAL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS entries_created ON entries (created)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)')
+            self._db.execute('CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER)')
+            self._size = self._stored_size()
+        self._puts = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def stats(self):
+        """{'hits', 'misses', 'expired', 'stores', 'evictions', 'hit_ratio'} of this instance."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0
+        return stats
+
+    @staticmethod
+    def key(url: str, **spec):
+        """Cache key of a url and the get_page() wait spec (element, el_has_css_class...), None values ignored."""
+        spec = {name: value for name, value in spec.items() if value is not None}
+        return hashlib.sha256(json.dumps([url, spec], sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    @contextmanager
+    def _transaction(self):
+        """Index write transaction, shared by the processes (called under the lock)."""
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+        self._db.execute('COMMIT')
+
+    def _blob_path(self, digest: str):
+        return os.path.join(self._path, 'blobs', digest[:2], digest + '.z')
+
+    def _count(self, name: str, result: str):
+        self._stats[name] += 1
+        self._metrics.inc('page_cache_total', result=result)
+
+    def get(self, key: str):
+        """(final_url, page_source) or None on a miss / an expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT final_url, digest, created FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self._count('misses', 'miss')
+                return None
+            final_url, digest, created = row
+            if self._ttl is not None and now - created > self._ttl:
+                with self._transaction():
+                    self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+                    self._drop_orphans([digest])
+                self._stats['expired'] += 1
+                self._count('misses', 'expired')
+                return None
+            self._db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+        try:
+            with open(self._blob_path(digest), 'rb') as f:
+                page_source = zlib.decompress(f.read()).decode('utf-8')
+        except (OSError, zlib.error) as e:
+            # a blob removed or truncated behind our back: forget the entry
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in PageCache.get(): ', str(e))
+            with self._lock:
+                self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._count('misses', 'miss')
+            return None
+        with self._lock:
+            self._count('hits', 'hit')
+        return final_url, page_source
+
+    def put(self, key: str, url: str, final_url: str, page_source: str):
+        data = page_source.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        compressed = None
+        if not os.path.exists(blob_path):
+            # compressed and written outside the lock, most stores are new pages
+            compressed = zlib.compress(data, self._compress_level)
+            self._write_blob(blob_path, compressed)
+        now = time.time()
+        with self._lock, self._transaction():
+            if not os.path.exists(blob_path):
+                # dropped by another instance since the check above: no one can drop it now
+                compressed = compressed or zlib.compress(data, self._compress_level)
+                self._write_blob(blob_path, compressed)
+            size = os.path.getsize(blob_path)
+            old = self._db.execute('SELECT digest FROM entries WHERE key = ?', (key,)).fetchone()
+            if self._db.execute('INSERT OR IGNORE INTO blobs (digest, size) VALUES (?, ?)', (digest, size)).rowcount:
+                self._size += size
+            self._db.execute('INSERT OR REPLACE INTO entries (key, url, final_url, digest, created, accessed) '
+                             'VALUES (?, ?, ?, ?, ?, ?)', (key, url, final_url, digest, now, now))
+            self._stats['stores'] += 1
+            if old and old[0] != digest:
+                self._drop_orphans([old[0]])
+            self._puts += 1
+            if self._puts % self.evict_every == 0:
+                self._evict()
+            elif self._size > self._max_bytes:
+                self._evict_lru()
+
+    @staticmethod
+    def _write_blob(blob_path: str, compressed: bytes):
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f'{blob_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, blob_path)
+
+    def _drop_orphans(self, digests: list):
+        """Remove blobs no entry refers to any more (called under the lock, in a transaction)."""
+        for digest in digests:
+            if self._db.execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone():
+                continue
+            size = self._db.execute('SELECT size FROM blobs WHERE digest = ?', (digest,)).fetchone()
+            if size is None:
+                continue  # dropped by another process
+            self._db.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+            self._size -= size[0]
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until the blobs fit max_bytes
+        (under the lock, in a transaction)."""
+        if self._ttl is not None:
+            expired = self._db.execute('SELECT key, digest FROM entries WHERE created < ?',
+                                       (time.time() - self._ttl,)).fetchall()
+            self._db.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key, _ in expired])
+            self._drop_orphans({digest for _, digest in expired})
+        self._size = self._stored_size()
+        if self._size > self._max_bytes:
+            self._evict_lru()
+
+    def _evict_lru(self):
+        """Drop least recently used entries until the blobs take 90% of max_bytes (under the lock, in a transaction)."""
+        target = self._max_bytes * .9
+        while self._size > target:
+            oldest = self._db.execute('SELECT key, digest FROM entries ORDER BY accessed LIMIT 64').fetchall()
+            if not oldest:
+                break
+            for key, digest in oldest:
+                self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._stats['evictions'] += 1
+                self._drop_orphans([digest])
+                if self._size <= target:
+                    break
+
+    def _stored_size(self):
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+    def invalidate(self, key: str):
+        with self._lock, self._transaction():
+            row = self._db.execute('SELECT digest FROM entries WHERE key = ?', (key,)).fetchone()
+            self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+            if row:
+                self._drop_orphans([row[0]])
+
+    def clear(self):
+        with self._lock, self._transaction():
+            digests = [row[0] for row in self._db.execute('SELECT digest FROM entries').fetchall()]
+            self._db.execute('DELETE FROM entries')
+            self._drop_orphans(set(digests))
@@ -1,14 +1,52 @@
+import json
 import os
 import re
+import shutil
 import stat
+import subprocess
 import sys
+import threading
+import time
 import urllib.request
 import zipfile
+from contextlib import contextmanager
 from sys import platform
 
+try:
+    import fcntl
+except ImportError:  # Windows: the temp files are still per process, only the download may be repeated
+    fcntl = None
+
 from colorama import Fore, Style
 
+from MetricsPack import echo
+
 webdriver_folder_name = 'chromedriver'
+manifest_name = 'versions.json'
+manifest_max_age = 24 * 60 * 60  # seconds before the cached milestone -> version map is refreshed
+
+# Chrome for Testing serves chromedriver for Chrome 115+, older versions are on the legacy storage
+cft_versions_url = 'https://googlechromelabs.github.io/chrome-for-testing/latest-versions-per-milestone-with-downloads.json'
+legacy_base_url = 'https://chromedriver.storage.googleapis.com'
+
+_store_lock = threading.Lock()
+
+
+@contextmanager
+def _store_locked():
+    """Exclusive access to the store for the threads of this process and the other processes (runner workers)."""
+    with _store_lock:
+        folder = get_store_folder()
+        os.makedirs(folder, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(folder, '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
 
 def get_platform_filename():
@@ -31,56 +69,176 @@ def get_platform_filename():
     return filename
 
 
+def get_cft_platform():
+    """Platform name used by Chrome for Testing downloads."""
+    if platform.startswith('linux'):
+        return 'linux64'
+    if platform == 'darwin':
+        return 'mac-arm64' if os.uname().machine == 'arm64' else 'mac-x64'
+    return 'win64' if sys.maxsize > 2 ** 32 else 'win32'
+
+
+def chromedriver_name():
+    return 'chromedriver.exe' if platform == 'win32' else 'chromedriver'
+
+
+def get_store_folder():
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), webdriver_folder_name))
+
+
+def find_chrome_binary():
+    """Path to the Chrome binary: CHROME_BINARY env variable, the usual install paths, then PATH."""
+    if os.environ.get('CHROME_BINARY'):
+        return os.environ['CHROME_BINARY'] if os.path.exists(os.environ['CHROME_BINARY']) else None
+    if platform == 'win32':
+        candidates = [os.path.join(os.environ.get(env, default), 'Google/Chrome/Application/chrome.exe')
+                      for env, default in (('PROGRAMFILES', 'C:/Program Files'),
+                                           ('PROGRAMFILES(X86)', 'C:/Program Files (x86)'),
+                                           ('LOCALAPPDATA', ''))]
+    elif platform == 'darwin':
+        candidates = ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+                      '/Applications/Chromium.app/Contents/MacOS/Chromium']
+    else:
+        candidates = []
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+    for name in ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome'):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def get_chrome_version(chrome_binary: str):
+    """Full Chrome version string ('120.0.6099.109') or '' if it can't be detected."""
+    pattern = r'(\d+\.\d+\.\d+\.\d+)'
+    if platform == 'win32':
+        # chrome.exe --version opens a window on Windows, the version folders next to it are enough
+        folder = os.path.dirname(chrome_binary)
+        versions = [name for name in os.listdir(folder) if re.fullmatch(pattern, name)]
+        if versions:
+            return max(versions, key=lambda v: [int(part) for part in v.split('.')])
+        return ''
+    try:
+        output = subprocess.run([chrome_binary, '--version'], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ''
+    match = re.search(pattern, output)
+    return match.group(1) if match else ''
+
+
+def get_major(version: str):
+    return version.split('.')[0] if version else ''
+
+
+def _read_manifest():
+    path = os.path.join(get_store_folder(), manifest_name)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'fetched': 0, 'milestones': {}, 'installed': {}}
+
+
+def _write_manifest(manifest: dict):
+    folder = get_store_folder()
+    os.makedirs(folder, exist_ok=True)
+    tmp_path = os.path.join(folder, f'{manifest_name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(folder, manifest_name))
+
+
+def get_local_chromedriver(major: str):
+    """Path of the stored chromedriver for the Chrome major version or None, no network."""
+    if not major:
+        return None
+    path = os.path.join(get_store_folder(), major, chromedriver_name())
+    return path if os.path.isfile(path) else None
+
+
+def _lookup_download(major: str, manifest: dict):
+    """(version, zip url) of chromedriver for the Chrome major version, manifest cached on disk."""
+    if int(major) < 115:
+        with urllib.request.urlopen(f'{legacy_base_url}/LATEST_RELEASE_{major}', timeout=30) as stream:
+            version = stream.read().decode('utf8').strip()
+        return version, '/'.join((legacy_base_url, version, 'chromedriver_' + get_platform_filename()))
+    milestones = manifest.get('milestones', {})
+    if major not in milestones or time.time() - manifest.get('fetched', 0) > manifest_max_age:
+        with urllib.request.urlopen(cft_versions_url, timeout=30) as stream:
+            content = json.loads(stream.read().decode('utf8'))
+        milestones = {}
+        for milestone, data in content['milestones'].items():
+            urls = {item['platform']: item['url'] for item in data.get('downloads', {}).get('chromedriver', [])}
+            milestones[milestone] = {'version': data['version'], 'urls': urls}
+        manifest['milestones'] = milestones
+        manifest['fetched'] = time.time()
+    data = milestones[major]
+    return data['version'], data['urls'][get_cft_platform()]
+
+
+def download_chromedriver(major: str):
+    """Download chromedriver for the Chrome major version into the store, return its path."""
+    manifest = _read_manifest()
+    version, driver_url = _lookup_download(major, manifest)
+    echo(f'[+] downloading chromedriver ver: {version}: {driver_url}')
+    folder = os.path.join(get_store_folder(), major)
+    os.makedirs(folder, exist_ok=True)
+    zip_path = os.path.join(folder, f'chromedriver.{os.getpid()}.zip')
+    urllib.request.urlretrieve(driver_url, zip_path)
+    chromedriver_path = os.path.join(folder, chromedriver_name())
+    # the archive layout differs between storages: pick the binary wherever it is
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        member = next(name for name in zip_ref.namelist() if os.path.basename(name) == chromedriver_name())
+        tmp_path = f'{chromedriver_path}.{os.getpid()}.tmp'
+        with zip_ref.open(member) as src, open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+    st = os.stat(tmp_path)
+    os.chmod(tmp_path, st.st_mode | stat.S_IEXEC)
+    os.replace(tmp_path, chromedriver_path)
+    os.remove(zip_path)
+    manifest.setdefault('installed', {})[major] = version
+    _write_manifest(manifest)
+    echo(f'[+] chromedriver {version} is stored: {chromedriver_path}')
+    return chromedriver_path
+
+
+def get_chromedriver_path(chrome_version: str):
+    """Chromedriver matching the Chrome version: from the local store, downloaded only when missing."""
+    major = get_major(chrome_version)
+    with _store_locked():
+        # another process may have stored it while this one was waiting for the lock
+        path = get_local_chromedriver(major)
+        if path is None and major:
+            path = download_chromedriver(major)
+    if path is None:
+        # unknown Chrome version: fall back to the latest stored driver
+        folder = get_store_folder()
+        majors = sorted((name for name in os.listdir(folder) if name.isdigit()), key=int) \
+            if os.path.isdir(folder) else []
+        for major in reversed(majors):
+            path = get_local_chromedriver(major)
+            if path:
+                break
+    return path
+
+
 def download_latest_chromedriver(current_chrome_version=''):
-    """Find the latest chromedriver, download, unzip, set permissions to executable."""
+    """Download chromedriver for the Chrome version (detected if not given) into the store."""
     try:
-        url = 'https://chromedriver.chromium.org/downloads'
-        base_driver_url = 'https://chromedriver.storage.googleapis.com'
-        file_name = 'chromedriver_' + get_platform_filename()
-        pattern = r'https://.*?path=(\d+\.\d+\.\d+\.\d+)'
-
-        # Download latest chromedriver.
-        stream = urllib.request.urlopen(url)
-        content = stream.read().decode('utf8')
-
-        # Parse the latest version.
-        all_match = re.findall(pattern, content)
-
-        if all_match:
-            # Version of latest driver.
-            if current_chrome_version != '':
-                print('[+] updating chromedriver')
-                all_match = list(set(re.findall(pattern, content)))
-                current_chrome_version = '.'.join(current_chrome_version.split('.')[:-1])
-                version_match = [i for i in all_match if re.search('^%s' % current_chrome_version, i)]
-                version = version_match[0]
-            else:
-                print('[+] installing new chromedriver')
-                version = all_match[1]
-            driver_url = '/'.join((base_driver_url, version, file_name))
-
-            # Download the file.
-            print(f'[+] downloading chromedriver ver: {version}: {driver_url}')
-            app_path = os.path.dirname(os.path.realpath(__file__))
-            driver_folder = os.path.normpath(os.path.join(app_path, webdriver_folder_name))
-            if not os.path.isdir(driver_folder):
-                os.mkdir(driver_folder)
-            chromedriver_path = os.path.normpath(os.path.join(driver_folder, 'chromedriver.exe'))
-            file_path = os.path.normpath(os.path.join(driver_folder, file_name))
-            urllib.request.urlretrieve(driver_url, file_path)
-
-            # Unzip the file into folder
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(os.path.normpath(os.path.join(driver_folder)))
-
-            st = os.stat(chromedriver_path)
-            os.chmod(chromedriver_path, st.st_mode | stat.S_IEXEC)
-            print('[+] latest chromedriver downloaded.')
-            # Cleanup.
-            os.remove(file_path)
-            return True
+        if not current_chrome_version:
+            chrome_binary = find_chrome_binary()
+            current_chrome_version = get_chrome_version(chrome_binary) if chrome_binary else ''
+        if not current_chrome_version:
+            echo('[-] unable to detect the chrome version.')
+            return False
+        echo('[+] updating chromedriver')
+        with _store_locked():
+            download_chromedriver(get_major(current_chrome_version))
+        return True
     except Exception as e:
-        print(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL +
-              f' in WebDriverPack.patch.download_latest_chromedriver(current_chrome_version=''): \n', str(e))
-        print('[-] unable to download latest chromedriver. the system will use the local version instead.')
+        echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL +
+             f' in WebDriverPack.patch.download_latest_chromedriver(current_chrome_version=''): \n', str(e))
+        echo('[-] unable to download latest chromedriver. the system will use the local version instead.')
         return False
@@ -0,0 +1,177 @@
+import threading
+from contextlib import contextmanager
+from time import monotonic
+
+from colorama import Fore, Style
+
+from MetricsPack import echo
+from WebDriverPack.webDriver import WebDriver
+
+
+class WebDriverPool:
+    """Pool of warm WebDriver sessions.
+
+    min_size - sessions that are kept alive even when idle;
+    max_size - upper bound of sessions (checked out + idle);
+    idle_timeout - seconds an idle session above min_size lives before eviction;
+    reaper_interval - period of the background idle eviction, None disables the thread;
+    driver_kwargs - passed to every WebDriver(...) created by the pool.
+    """
+
+    def __init__(self, min_size: int = 1, max_size: int = 4, idle_timeout: float = 300,
+                 reaper_interval: float = None, prestart: bool = True, **driver_kwargs):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError('WebDriverPool: expected 0 <= min_size <= max_size and max_size >= 1')
+        self._min_size = min_size
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._driver_kwargs = driver_kwargs
+        self._idle = []  # [(WebDriver, last checkin time)], most recently used at the end
+        self._in_use = set()
+        self._starting = 0
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._reaper_stop = threading.Event()
+        self._reaper = None
+        if prestart:
+            for i in range(min_size):
+                with self._cond:
+                    self._created += 1
+                    number = self._created
+                self._put_idle(self._new_driver(number))
+        if reaper_interval:
+            self._reaper = threading.Thread(target=self._reap, args=(reaper_interval,),
+                                            name='WebDriverPool-reaper', daemon=True)
+            self._reaper.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def size(self):
+        with self._cond:
+            return len(self._idle) + len(self._in_use) + self._starting
+
+    @property
+    def idle(self):
+        with self._cond:
+            return len(self._idle)
+
+    @property
+    def in_use(self):
+        with self._cond:
+            return len(self._in_use)
+
+    def _new_driver(self, number: int):
+        kwargs = dict(self._driver_kwargs)
+        kwargs.setdefault('marker', f'pool session {number}')
+        return WebDriver(**kwargs)
+
+    def _put_idle(self, web_driver: WebDriver):
+        with self._cond:
+            self._idle.append((web_driver, monotonic()))
+            self._cond.notify()
+
+    def checkout(self, timeout: float = None):
+        """Take a session from the pool, start a new one if the pool is not full.
+        Blocks up to timeout seconds (forever if None) when all sessions are busy."""
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError('WebDriverPool is closed')
+                if self._idle:
+                    web_driver, _ = self._idle.pop()
+                    self._in_use.add(web_driver)
+                    return web_driver
+                if len(self._in_use) + self._starting < self._max_size:
+                    self._starting += 1
+                    self._created += 1
+                    number = self._created
+                    break
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f'WebDriverPool: no free session in {timeout} s')
+                self._cond.wait(remaining)
+        # the browser is started outside the lock, other threads keep checking out/in meanwhile
+        try:
+            web_driver = self._new_driver(number)
+        except BaseException:
+            with self._cond:
+                self._starting -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._starting -= 1
+            self._in_use.add(web_driver)
+        return web_driver
+
+    def checkin(self, web_driver: WebDriver, discard: bool = False):
+        """Return a session to the pool. Dead (failed health check) or discarded sessions are closed."""
+        with self._cond:
+            if web_driver not in self._in_use:
+                raise ValueError('WebDriverPool.checkin(): the session does not belong to this pool')
+            self._in_use.discard(web_driver)
+            closed = self._closed
+        if closed or discard or not web_driver.is_alive():
+            if not closed and not discard:
+                echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + ' pool session failed health check, closed')
+            web_driver.quit()
+            with self._cond:
+                self._cond.notify()
+            return
+        self._put_idle(web_driver)
+        self.evict_idle()
+
+    @contextmanager
+    def driver(self, timeout: float = None):
+        """with pool.driver() as web_driver: ... - checkout on enter, checkin on exit."""
+        web_driver = self.checkout(timeout)
+        try:
+            yield web_driver
+        except BaseException:
+            # the session state after an error is unknown, checkin runs the health check on it
+            self.checkin(web_driver)
+            raise
+        self.checkin(web_driver)
+
+    def evict_idle(self):
+        """Close sessions above min_size that were idle longer than idle_timeout."""
+        now = monotonic()
+        evicted = []
+        with self._cond:
+            keep = []
+            # the least recently used sessions are at the start of the list
+            surplus = len(self._idle) + len(self._in_use) - self._min_size
+            for web_driver, last_used in self._idle:
+                if surplus > 0 and now - last_used >= self._idle_timeout:
+                    evicted.append(web_driver)
+                    surplus -= 1
+                else:
+                    keep.append((web_driver, last_used))
+            self._idle = keep
+        for web_driver in evicted:
+            web_driver.quit()
+        return len(evicted)
+
+    def _reap(self, interval: float):
+        while not self._reaper_stop.wait(interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in WebDriverPool._reap(): ', str(e))
+
+    def close(self):
+        """Close all idle sessions, sessions checked out now are closed on checkin."""
+        self._reaper_stop.set()
+        with self._cond:
+            self._closed = True
+            idle = [web_driver for web_driver, _ in self._idle]
+            self._idle = []
+            self._cond.notify_all()
+        for web_driver in idle:
+            web_driver.quit()
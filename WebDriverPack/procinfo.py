@@ -0,0 +1,71 @@
+import os
+
+
+def _read(path: str):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return ''
+
+
+def children(pid: int):
+    """Direct child pids from /proc (empty where /proc is not available)."""
+    result = []
+    for task in os.listdir(f'/proc/{pid}/task') if os.path.isdir(f'/proc/{pid}/task') else []:
+        result.extend(int(child) for child in _read(f'/proc/{pid}/task/{task}/children').split())
+    return result
+
+
+def process_tree(pid: int):
+    """pid and all its descendants."""
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children(current))
+    return tree
+
+
+def rss(pid: int):
+    """Resident set size of a process in bytes, 0 if unknown."""
+    for line in _read(f'/proc/{pid}/status').splitlines():
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1]) * 1024
+    return 0
+
+
+def tree_rss(pid: int):
+    """Resident set size of a process with all its descendants in bytes."""
+    return sum(rss(child) for child in process_tree(pid))
+
+
+def cmdline(pid: int):
+    return _read(f'/proc/{pid}/cmdline').split('\0')
+
+
+def parent(pid: int):
+    """Parent pid from /proc/<pid>/stat, None if unknown."""
+    stat = _read(f'/proc/{pid}/stat')
+    # the command name is in parentheses and may contain spaces
+    fields = stat[stat.rfind(')') + 2:].split()
+    return int(fields[1]) if len(fields) > 1 else None
+
+
+def pids():
+    """All pids from /proc (empty where /proc is not available)."""
+    if not os.path.isdir('/proc'):
+        return []
+    return [int(name) for name in os.listdir('/proc') if name.isdigit()]
+
+
+def alive(pid: int):
+    """Is the process running (a zombie counts as gone)."""
+    stat = _read(f'/proc/{pid}/stat')
+    if stat:
+        return stat[stat.rfind(')') + 2:stat.rfind(')') + 3] not in ('Z', 'X')
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,104 @@
+import threading
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException, ElementNotInteractableException, InvalidSessionIdException,
+    NoSuchElementException, NoSuchFrameException, NoSuchWindowException, StaleElementReferenceException,
+    TimeoutException, WebDriverException
+)
+
+# failure classes
+TIMEOUT = 'timeout'
+STALE = 'stale'
+NETWORK = 'network'
+SESSION = 'session'
+
+# recovery actions
+RENAVIGATE = 'renavigate'
+REFRESH = 'refresh'
+ROTATE_PROXY = 'rotate_proxy'
+RESTART = 'restart'
+
+_session_messages = ('chrome not reachable', 'session deleted', 'disconnected', 'target window already closed',
+                     'tab crashed', 'no such session', 'invalid session id', 'cannot determine loading status')
+_network_messages = ('net::ERR_', 'ERR_PROXY', 'ERR_TUNNEL', 'ERR_CONNECTION', 'ERR_TIMED_OUT',
+                     'ERR_NAME_NOT_RESOLVED')
+
+
+class RecoveryPolicy:
+    """Classifies get_page() failures and picks the cheapest recovery for each class:
+
+    timeout (wait timed out, element not found) - re-navigate;
+    stale (stale element, frame switch, element not interactable) - refresh the page;
+    network (net::ERR_*, proxy errors) - rotate the proxy;
+    session (dead browser or chromedriver, anything unknown) - restart the browser.
+
+    budgets - {class: retries per get_page() call}; the wait before the n-th retry of a class is
+    backoff * 2 ** (n - 1) seconds, capped by max_backoff. counters - failures / recoveries / give-ups per class.
+    """
+    default_budgets = {TIMEOUT: 2, STALE: 2, NETWORK: 4, SESSION: 2}
+    actions = {TIMEOUT: RENAVIGATE, STALE: REFRESH, NETWORK: ROTATE_PROXY, SESSION: RESTART}
+
+    def __init__(self, budgets: dict = None, backoff: float = .5, max_backoff: float = 10):
+        self.budgets = dict(self.default_budgets, **(budgets or {}))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @property
+    def counters(self):
+        """{'<class>.failures' | '<class>.<action>' | '<class>.giveup': count}"""
+        with self._lock:
+            return dict(self._counters)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    @staticmethod
+    def classify(e: BaseException):
+        if isinstance(e, (TimeoutException, NoSuchElementException)):
+            return TIMEOUT
+        if isinstance(e, (StaleElementReferenceException, NoSuchFrameException,
+                          ElementNotInteractableException, ElementClickInterceptedException)):
+            return STALE
+        if isinstance(e, (InvalidSessionIdException, NoSuchWindowException)):
+            return SESSION
+        if isinstance(e, WebDriverException):
+            message = e.msg or ''
+            if any(text in message for text in _session_messages):
+                return SESSION
+            if any(text in message for text in _network_messages):
+                return NETWORK
+        # chromedriver process gone (connection refused / reset) or unknown errors: a fresh browser is the safe bet
+        return SESSION
+
+    def start(self, max_attempts: int = None):
+        """Retry accounting for one get_page() call; max_attempts caps the total number of attempts."""
+        return RecoveryState(self, max_attempts)
+
+
+class RecoveryState:
+    """Per call retry budget of a RecoveryPolicy."""
+
+    def __init__(self, policy: RecoveryPolicy, max_attempts: int = None):
+        self._policy = policy
+        self._max_attempts = max_attempts
+        self._attempts = 0
+        self._retries = {}
+
+    def failure(self, e: BaseException):
+        """Register the failure, return (failure class, action, backoff seconds); action is None on give up."""
+        policy = self._policy
+        self._attempts += 1
+        failure_class = policy.classify(e)
+        policy._count(f'{failure_class}.failures')
+        retries = self._retries.get(failure_class, 0) + 1
+        self._retries[failure_class] = retries
+        if retries > policy.budgets.get(failure_class, 0) or \
+                (self._max_attempts is not None and self._attempts >= self._max_attempts):
+            policy._count(f'{failure_class}.giveup')
+            return failure_class, None, 0
+        action = policy.actions[failure_class]
+        policy._count(f'{failure_class}.{action}')
+        return failure_class, action, min(policy.backoff * 2 ** (retries - 1), policy.max_backoff)
@@ -0,0 +1,219 @@
+"""Sharded crawl runner: one process per shard, each process owns its own browser sessions.
+
+usage: python -m WebDriverPack.runner tasks.txt -o results.jsonl -w 8 -c 2 --headless
+
+tasks file - one task per line: a bare url or a JSON object {"url": ..., <get_page() kwargs>};
+results - JSON lines in completion order, merged from all workers; the throughput report goes to stderr;
+checkpoint - ids of the completed tasks (the "id" key or the line number): a run restarted with the same
+checkpoint skips them and appends to the results; the checkpoint is synced to disk every sync_every (100) tasks,
+so up to that many tasks finished right before a crash may be repeated.
+A task line that can't be parsed gets an error result ('via': 'task') instead of stopping its shard.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+from time import monotonic
+
+from colorama import Fore, Style
+
+from MetricsPack import echo
+from WebDriverPack.driverService import DriverService
+from WebDriverPack.jobs import Checkpoint, open_results
+from WebDriverPack.lifecycle import LifecyclePolicy, reap_orphans
+from WebDriverPack.loadProfile import TEXT_ONLY
+from WebDriverPack.pageCache import PageCache
+
+_DONE = 'done'
+_RESULT = 'result'
+
+
+def iter_shard(task_path: str, index: int, count: int):
+    """Lines index, index + count, index + 2 * count... of the task file, read lazily."""
+    with open(task_path, encoding='utf-8') as f:
+        for number, line in enumerate(f):
+            if number % count == index and line.strip():
+                yield number, line
+
+
+def _task_error(number: int, line: str, error: Exception):
+    """Result of a task line that is not a valid page spec."""
+    echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in runner: bad task line {number}: ', str(error))
+    return {'spec': {'id': number, 'line': line.strip()}, 'url': None, 'ok': False, 'attempts': 0,
+            'current_url': None, 'page_source': None, 'data': None, 'error': f'bad task line: {error}',
+            'elapsed': 0, 'via': 'task'}
+
+
+def _worker(task_path: str, index: int, count: int, concurrency: int, driver_kwargs: dict,
+            with_source: bool, mode: str, checkpoint_path: str, results):
+    # imported in the worker: every process loads its own Parser lists and starts its own drivers
+    from HttpParserPack import HttpParser
+    from WebDriverPack.webDriver import WebDriver
+    from WebDriverPack.batch import fetch_many, page_spec_from_json
+
+    WebDriver.use_proxies_shard(index, count)
+    if mode != 'browser':
+        HttpParser.use_proxies_shard(index, count)
+    start = monotonic()
+    done = ok = 0
+    completed = Checkpoint(checkpoint_path, read_only=True) if checkpoint_path else ()
+
+    def put(result):
+        nonlocal done, ok
+        done += 1
+        ok += bool(result['ok'])
+        if not with_source:
+            result.pop('page_source')
+        result['worker'] = index
+        results.put((_RESULT, result))
+
+    def specs():
+        for number, line in iter_shard(task_path, index, count):
+            try:
+                spec = page_spec_from_json(line)
+            except Exception as e:
+                # one bad line must not end the shard
+                if number not in completed:
+                    put(_task_error(number, line, e))
+                continue
+            spec.setdefault('id', number)
+            if spec['id'] not in completed:
+                yield spec
+
+    try:
+        for result in fetch_many(specs(), concurrency=concurrency, mode=mode, **driver_kwargs):
+            put(result)
+    finally:
+        results.put((_DONE, {'worker': index, 'pid': os.getpid(), 'done': done, 'ok': ok,
+                             'elapsed': monotonic() - start}))
+
+
+def run(task_path: str, output=None, workers: int = None, concurrency: int = 1, with_source: bool = False,
+        mode: str = 'browser', checkpoint: str = None, **driver_kwargs):
+    """Shard task_path over `workers` processes (cpu count by default) with `concurrency` sessions each,
+    write merged results to output (a text stream, stdout by default) and return the per-worker report.
+    mode - fetch_many() mode: 'browser', 'http' or 'auto' (HTTP first, browser fallback);
+    checkpoint - Checkpoint file of the completed task ids, tasks recorded there are skipped."""
+    output = output or sys.stdout
+    workers = workers or os.cpu_count() or 1
+    # spawn: a forked copy of a process with live selenium threads and sockets is not safe
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue(maxsize=workers * concurrency * 4)
+    # compacted before the workers read it
+    completed = Checkpoint(checkpoint) if checkpoint else None
+    processes = [
+        context.Process(target=_worker, name=f'runner-{index}',
+                        args=(task_path, index, workers, concurrency, driver_kwargs, with_source, mode, checkpoint,
+                              results))
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    report = {}
+    while len(report) < workers:
+        try:
+            kind, data = results.get(timeout=1)
+        except queue.Empty:
+            # a worker killed without its final message must not hang the runner
+            for index, process in enumerate(processes):
+                if index not in report and not process.is_alive() and process.exitcode:
+                    report[index] = {'worker': index, 'pid': process.pid, 'done': 0, 'ok': 0, 'elapsed': 0,
+                                     'exitcode': process.exitcode}
+            continue
+        if kind == _RESULT:
+            output.write(json.dumps(data, ensure_ascii=False) + '\n')
+            if completed is not None:
+                # the result reaches the file before its id reaches the checkpoint
+                output.flush()
+                completed.add(data['spec']['id'])
+        else:
+            report[data['worker']] = data
+    for process in processes:
+        process.join()
+    output.flush()
+    if completed is not None:
+        completed.close()
+    return [report[index] for index in sorted(report)]
+
+
+def print_report(report: list, stream=None):
+    stream = stream or sys.stderr
+    total_done = total_ok = 0
+    for row in report:
+        rate = row['done'] / row['elapsed'] if row['elapsed'] else 0
+        total_done += row['done']
+        total_ok += row['ok']
+        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" worker {row['worker']} (pid {row['pid']}): "
+              f"{row['done']} pages, {row['ok']} ok, {row['elapsed']:.1f} s, " + Fore.CYAN + f'{rate:.2f} pages/s'
+              + (Fore.MAGENTA + f" exit code {row['exitcode']}" if row.get('exitcode') else ''), file=stream)
+    elapsed = max((row['elapsed'] for row in report), default=0)
+    rate = total_done / elapsed if elapsed else 0
+    print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' total: {total_done} pages, {total_ok} ok, ' +
+          Fore.CYAN + f'{rate:.2f} pages/s', file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m WebDriverPack.runner', description=__doc__.split('\n')[0])
+    parser.add_argument('tasks', help='task file: urls or JSON objects, one per line')
+    parser.add_argument('-o', '--output', help='results JSONL file, stdout by default')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='worker processes, cpu count by default')
+    parser.add_argument('-c', '--concurrency', type=int, default=1, help='browser sessions per worker')
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--proxy', action='store_true', help='use text_files/proxies.txt, sharded between workers')
+    parser.add_argument('--max-retry', type=int, default=5)
+    parser.add_argument('--recycle-pages', type=int, metavar='N', help='restart a browser after N pages')
+    parser.add_argument('--recycle-rss', type=float, metavar='MB', help='restart a browser above MB of memory')
+    parser.add_argument('--page-source', action='store_true', help='include page_source in the results')
+    parser.add_argument('--text-only', action='store_true',
+                        help='block images, fonts, media and stylesheets, eager page load strategy')
+    parser.add_argument('--cache', metavar='DIR', help='serve repeated pages from a PageCache in DIR')
+    parser.add_argument('--cache-ttl', type=float, default=24 * 3600, help='cache entry lifetime, seconds')
+    parser.add_argument('--session', metavar='FILE', help='restore the cookies and storage saved in FILE by a login')
+    parser.add_argument('--shared-driver', type=int, default=0, metavar='N',
+                        help='N chromedriver processes shared by the sessions of all workers, 0 - one per browser')
+    parser.add_argument('--network-log', action='store_true',
+                        help='enable the DevTools network log, needed by the task "capture" specs')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='completed task ids: skipped on a restart, the results file is appended to')
+    parser.add_argument('--mode', choices=('browser', 'http', 'auto'), default='browser',
+                        help='auto: plain HTTP first, the browser only when the expected element is missing')
+    args = parser.parse_args(argv)
+
+    # browsers of a crashed earlier run
+    reap_orphans()
+    driver_kwargs = dict(headless=args.headless, proxy=args.proxy, max_retry=args.max_retry)
+    if args.recycle_pages or args.recycle_rss:
+        driver_kwargs['lifecycle'] = LifecyclePolicy(
+            max_pages=args.recycle_pages, max_rss=int(args.recycle_rss * 2 ** 20) if args.recycle_rss else None)
+    if args.text_only:
+        driver_kwargs['load_profile'] = TEXT_ONLY
+    if args.cache:
+        driver_kwargs['cache'] = PageCache(args.cache, ttl=args.cache_ttl)
+    if args.session:
+        driver_kwargs['session_file'] = args.session
+    if args.network_log:
+        driver_kwargs['network_log'] = True
+    service = DriverService(instances=args.shared_driver).start() if args.shared_driver else None
+    if service is not None:
+        # the workers attach to the service by its urls
+        driver_kwargs['driver_service'] = service.urls
+    try:
+        if args.output:
+            resume = bool(args.checkpoint) and os.path.exists(args.checkpoint)
+            with open_results(args.output, resume) as output:
+                report = run(args.tasks, output, args.workers, args.concurrency, args.page_source, args.mode,
+                             args.checkpoint, **driver_kwargs)
+        else:
+            report = run(args.tasks, None, args.workers, args.concurrency, args.page_source, args.mode,
+                         args.checkpoint, **driver_kwargs)
+    finally:
+        if service is not None:
+            service.stop()
+    print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+from colorama import Fore, Style
+
+from MetricsPack import echo
+
+_RESTORED_MARK = '__wdp_restored'
+
+_DUMP_STORAGE_SCRIPT = """
+function dump(storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        if (key !== '%s') items[key] = storage.getItem(key);
+    }
+    return items;
+}
+return {origin: location.origin, local: dump(window.localStorage), session: dump(window.sessionStorage)};
+""" % _RESTORED_MARK
+
+# runs before the page scripts of every new document, fills the storage of its origin once per tab and snapshot
+_RESTORE_STORAGE_SCRIPT = """
+(function (snapshot, stamp) {
+    var entry = snapshot[location.origin];
+    if (!entry) return;
+    try {
+        if (sessionStorage.getItem('%s') === stamp) return;
+        Object.keys(entry.local).forEach(function (key) { localStorage.setItem(key, entry.local[key]); });
+        Object.keys(entry.session).forEach(function (key) { sessionStorage.setItem(key, entry.session[key]); });
+        sessionStorage.setItem('%s', stamp);
+    } catch (e) {}
+})(%%s, %%s);
+""" % (_RESTORED_MARK, _RESTORED_MARK)
+
+# Network.getAllCookies fields accepted back by Network.setCookies
+_COOKIE_PARAMS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires', 'priority',
+                  'sameParty', 'sourceScheme', 'sourcePort')
+
+
+class SessionState:
+    """Cookies of all domains and localStorage / sessionStorage per origin of a browser session.
+
+    capture() takes the cookies through DevTools (the current domain only for drivers without it) and
+    the storage of the current origin, merged into the origins captured before; apply() puts them into
+    another session: cookies at once, storage on the first document of each origin. Without DevTools
+    apply() opens the origin the cookies were taken on and adds them there, the storage is not restored.
+    """
+
+    def __init__(self, cookies: list = None, storage: dict = None, created: float = None,
+                 cookies_origin: str = None):
+        self.cookies = cookies or []
+        self.storage = storage or {}  # {origin: {'local': {...}, 'session': {...}}}
+        self.created = created or time.time()
+        self.cookies_origin = cookies_origin  # origin of get_cookies() cookies, None for DevTools ones
+
+    @property
+    def age(self):
+        return time.time() - self.created
+
+    @classmethod
+    def load(cls, path: str):
+        """SessionState saved by save(), None if the file is missing or unreadable."""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(data.get('cookies'), data.get('storage'), data.get('created'), data.get('cookies_origin'))
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in SessionState.load({path}): ', str(e))
+            return None
+
+    def save(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'created': self.created, 'cookies': self.cookies, 'storage': self.storage,
+                       'cookies_origin': self.cookies_origin}, f)
+        os.replace(tmp_path, path)
+
+    def capture(self, driver):
+        """Take the session cookies and the current origin storage from driver, returns self."""
+        if hasattr(driver, 'execute_cdp_cmd'):
+            self.cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+            self.cookies_origin = None
+        else:
+            self.cookies = driver.get_cookies()
+            parts = urlsplit(driver.current_url)
+            self.cookies_origin = f'{parts.scheme}://{parts.netloc}' if parts.netloc else None
+        try:
+            page = driver.execute_script(_DUMP_STORAGE_SCRIPT)
+        except Exception:
+            # no storage on data: / about: pages and for drivers without a JS engine
+            page = None
+        if page and page.get('origin') not in (None, 'null'):
+            self.storage[page['origin']] = {'local': page['local'], 'session': page['session']}
+        self.created = time.time()
+        return self
+
+    def apply(self, driver, previous_script: str = None):
+        """Put the state into driver. Returns the identifier of the storage script ('' without storage),
+        None for drivers without DevTools when there are no cookies of a known origin (nothing is restored).
+        previous_script: identifier returned by an earlier apply() to the same driver, replaced."""
+        if not hasattr(driver, 'execute_cdp_cmd'):
+            return self._add_cookies(driver)
+        cookies = []
+        for cookie in self.cookies:
+            param = {key: cookie[key] for key in _COOKIE_PARAMS if key in cookie}
+            if cookie.get('session') or param.get('expires', -1) < 0:
+                param.pop('expires', None)
+            cookies.append(param)
+        if cookies:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        if previous_script:
+            driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': previous_script})
+        if not self.storage:
+            return ''
+        source = _RESTORE_STORAGE_SCRIPT % (json.dumps(self.storage), json.dumps(str(self.created)))
+        return driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': source})['identifier']
+
+    def _add_cookies(self, driver):
+        """WebDriver add_cookie() works for the domain of the current page only: open the origin first."""
+        if not self.cookies or not self.cookies_origin:
+            return None
+        driver.get(self.cookies_origin + '/')
+        for cookie in self.cookies:
+            driver.add_cookie(cookie)
+        return ''
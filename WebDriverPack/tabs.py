@@ -0,0 +1,199 @@
+from collections import deque
+from time import monotonic, sleep
+
+from colorama import Fore, Style
+from selenium.common.exceptions import WebDriverException
+
+from MetricsPack import echo
+from ParserPack.extraction import EXTRACT_SCRIPT, normalize_fields
+from WebDriverPack.loadProfile import NAVIGATE_SCRIPT, READY_STATES
+from WebDriverPack.waits import CONDITIONS_FUNCTION, has_class, presence
+
+# null while the previous document of the tab is still there (the script navigation mark is set),
+# then the tab url, ready state and the wait conditions states
+TAB_STATE_SCRIPT = CONDITIONS_FUNCTION + """
+if (window.__wdpNavigating !== undefined) return null;
+return {url: location.href, ready: document.readyState, states: states(arguments[0])};
+"""
+
+# get_page() arguments a tab does not support: the tabs only load and read pages,
+# and the network log is one for all the tabs of the browser
+_interactive_args = ('form_data', 'recaptcha', 'submit_button', 'submit_check_element', 'capture')
+
+
+class _Tab:
+    __slots__ = ('handle', 'spec', 'conditions', 'started', 'deadline')
+
+    def __init__(self, handle: str):
+        self.handle = handle
+        self.spec = None
+        self.conditions = None
+        self.started = 0
+        self.deadline = 0
+
+
+class TabSet:
+    """Tabs of one WebDriver browser loading pages at the same time, for read-only page fetches.
+
+    Navigations are started in every free tab without waiting for the load, then the tabs are checked round
+    robin, one script per check, and a page is collected as soon as its tab meets the spec: the element /
+    el_has_css_class of the spec is in the page, or without them the ready state of the load profile strategy.
+    Every tab keeps its own url and spec; the browser has one focused tab, so each check switches to it.
+    With the 'normal' page load strategy chromedriver holds a check until its tab has loaded (the other tabs
+    keep loading meanwhile), with 'eager' / 'none' (loadProfile.TEXT_ONLY) the checks return at once.
+    size - tabs, the current window included; timeout - seconds a page may take, from navigation to match.
+    """
+
+    def __init__(self, web_driver, size: int = 4, timeout: float = 30, poll_interval: float = .05):
+        if size < 1:
+            raise ValueError('TabSet: size must be >= 1')
+        self._web_driver = web_driver
+        self._size = size
+        self._timeout = timeout
+        self._poll_interval = poll_interval
+        self._tabs = []
+        self._main_handle = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def handles(self):
+        return [tab.handle for tab in self._tabs]
+
+    def open(self):
+        """Open the tabs (the current window is the first one)."""
+        if self._tabs:
+            return
+        driver = self._web_driver.driver
+        self._main_handle = driver.current_window_handle
+        self._tabs = [_Tab(self._main_handle)]
+        for i in range(self._size - 1):
+            driver.switch_to.new_window('tab')
+            # DevTools url blocking is per tab
+            self._web_driver.load_profile.apply_driver(driver)
+            self._tabs.append(_Tab(driver.current_window_handle))
+        driver.switch_to.window(self._main_handle)
+
+    def close(self):
+        """Close the opened tabs and return to the original window."""
+        driver = self._web_driver.driver
+        if driver is None or not self._tabs:
+            self._tabs = []
+            return
+        try:
+            for tab in self._tabs[1:]:
+                driver.switch_to.window(tab.handle)
+                driver.close()
+            driver.switch_to.window(self._main_handle)
+        except WebDriverException as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in TabSet.close(): ', str(e))
+        self._tabs = []
+
+    def _start(self, tab: _Tab, spec: dict):
+        for key in _interactive_args:
+            if spec.get(key):
+                raise ValueError(f'TabSet: {key} is not supported, tabs only load and read pages')
+        tab.spec = spec
+        if spec.get('element'):
+            tab.conditions = [presence(spec['element'])]
+        elif spec.get('el_has_css_class'):
+            tab.conditions = [has_class(*spec['el_has_css_class'])]
+        else:
+            tab.conditions = []
+        tab.started = monotonic()
+        tab.deadline = tab.started + self._timeout
+        driver = self._web_driver.driver
+        driver.switch_to.window(tab.handle)
+        self._web_driver._pages += 1
+        # a script navigation returns at once, the tab loads while the others are checked
+        driver.execute_script(NAVIGATE_SCRIPT, spec['url'])
+
+    def _result(self, tab: _Tab, ok: bool, state: dict = None, error: str = None):
+        spec = tab.spec
+        result = {'spec': spec, 'url': spec['url'], 'ok': ok, 'attempts': 1,
+                  'current_url': state['url'] if state else None, 'page_source': None, 'data': None,
+                  'error': error, 'via': 'tab'}
+        driver = self._web_driver.driver
+        if ok:
+            # the tab is the current window after its check
+            result['page_source'] = driver.page_source
+            if spec.get('extract'):
+                result['data'] = driver.execute_script(EXTRACT_SCRIPT, normalize_fields(spec['extract']), None)
+        result['elapsed'] = monotonic() - tab.started
+        metrics = self._web_driver.metrics
+        metrics.inc('tab_pages_total', result='ok' if ok else 'failed')
+        metrics.observe('tab_page_seconds', result['elapsed'])
+        tab.spec = None
+        return result
+
+    def _check(self, tab: _Tab, ready_states: tuple):
+        """Result dict if the tab is done (matched, failed or timed out), else None."""
+        driver = self._web_driver.driver
+        try:
+            driver.switch_to.window(tab.handle)
+            state = driver.execute_script(TAB_STATE_SCRIPT, tab.conditions)
+        except WebDriverException as e:
+            # scripts fail while a document is being replaced
+            state = None
+            error = str(e)
+        else:
+            error = None
+        if state is not None:
+            matched = all(state['states']) if tab.conditions else state['ready'] in ready_states
+            if matched:
+                return self._result(tab, True, state)
+        if monotonic() >= tab.deadline:
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' tab page timed out: {tab.spec["url"]}')
+            return self._result(tab, False, state, error or f'not matched in {self._timeout} s')
+        return None
+
+    def fetch(self, pages):
+        """Load page specs ('url' or {'url': ..., 'element' / 'el_has_css_class', 'extract', <user keys>})
+        in the tabs, yield fetch_many()-like result dicts with 'via': 'tab' in completion order."""
+        self.open()
+        web_driver = self._web_driver
+        web_driver._cached_page = None
+        ready_states = READY_STATES[web_driver.load_profile.page_load_strategy]
+        pages = iter(pages)
+        free = deque(self._tabs)
+        busy = []
+        exhausted = False
+        while True:
+            while free and not exhausted:
+                spec = next(pages, None)
+                if spec is None:
+                    exhausted = True
+                    break
+                spec = {'url': spec} if isinstance(spec, str) else spec
+                tab = free.popleft()
+                try:
+                    self._start(tab, spec)
+                except ValueError:
+                    free.appendleft(tab)
+                    raise
+                except WebDriverException as e:
+                    yield self._result(tab, False, error=str(e))
+                    free.append(tab)
+                    continue
+                busy.append(tab)
+            if not busy:
+                return
+            progressed = False
+            for tab in list(busy):
+                result = self._check(tab, ready_states)
+                if result is not None:
+                    busy.remove(tab)
+                    free.append(tab)
+                    progressed = True
+                    yield result
+            if not progressed:
+                sleep(self._poll_interval)
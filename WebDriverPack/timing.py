@@ -0,0 +1,111 @@
+import threading
+from random import uniform
+from time import sleep, monotonic
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support.wait import WebDriverWait
+
+
+class TimingPolicy:
+    """Human-like timing: the random pauses WebDriver has always made, per phase.
+
+    delays - {phase: (min, max) seconds} overrides of the default delays;
+    The time spent in every phase is accumulated: see waited / counts.
+    Subclasses replace pauses by readiness conditions through condition().
+    """
+    default_delays = {
+        'navigate': (.5, 3),  # before driver.get()
+        'page': (0, 0),  # after driver.get()
+        'form_input': (1.0, 5.0),  # before typing into a form field
+        'submit': (1.0, 5.0),  # before the submit button click
+        'action': (1.0, 2.0),  # ActionChains pause between the pointer move and the click / keys
+        'recaptcha': (1.0, 5.0),  # before every recaptcha solver step
+        'recaptcha_check': (3, 3),  # before checking the recaptcha result
+    }
+
+    def __init__(self, delays: dict = None, timeout: float = 10):
+        self.delays = dict(self.default_delays, **(delays or {}))
+        self.timeout = timeout
+        self._waited = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def waited(self):
+        """{phase: seconds spent waiting}"""
+        with self._lock:
+            return dict(self._waited)
+
+    @property
+    def counts(self):
+        """{phase: number of waits}"""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_stats(self):
+        with self._lock:
+            self._waited.clear()
+            self._counts.clear()
+
+    def record(self, phase: str, seconds: float):
+        with self._lock:
+            self._waited[phase] = self._waited.get(phase, 0) + seconds
+            self._counts[phase] = self._counts.get(phase, 0) + 1
+
+    def delay(self, phase: str):
+        low, high = self.delays.get(phase, (0, 0))
+        return uniform(low, high) if high > 0 else 0
+
+    def condition(self, phase: str, element=None, until=None):
+        """Readiness condition callable(driver) replacing the phase pause, None - pause for delay(phase)."""
+        return None
+
+    def action_pause(self):
+        """Pause inside ActionChains, the browser makes it, so it is only recorded here."""
+        seconds = self.delay('action')
+        self.record('action', seconds)
+        return seconds
+
+    def wait(self, phase: str, driver=None, element=None, until=None, timeout: float = None):
+        """Pause before/after a phase: sleep for delay(phase) or wait for the readiness condition.
+        element - the element the phase works with; until - callable(driver) that ends the wait early.
+        A readiness wait is best effort: on timeout the phase goes on and the next command reports real errors."""
+        condition = self.condition(phase, element, until) if driver is not None else None
+        start = monotonic()
+        if condition is None:
+            seconds = self.delay(phase)
+            if seconds:
+                sleep(seconds)
+        else:
+            try:
+                WebDriverWait(driver, timeout or self.timeout, poll_frequency=.05,
+                              ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)) \
+                    .until(condition)
+            except TimeoutException:
+                pass
+        self.record(phase, monotonic() - start)
+
+
+def document_ready(driver):
+    return driver.execute_script('return document.readyState') == 'complete'
+
+
+def element_interactable(element):
+    return lambda driver: element.is_displayed() and element.is_enabled()
+
+
+class ThroughputTiming(TimingPolicy):
+    """Event-driven timing for sites that don't need to look human: no random pauses,
+    only waits for the document ready state and for elements to become interactable."""
+
+    def __init__(self, timeout: float = 10):
+        super(ThroughputTiming, self).__init__({phase: (0, 0) for phase in self.default_delays}, timeout)
+
+    def condition(self, phase: str, element=None, until=None):
+        if until is not None:
+            return until
+        if element is not None:
+            return element_interactable(element)
+        if phase == 'page':
+            return document_ready
+        return None
@@ -0,0 +1,119 @@
+"""Waits evaluated in the page: a set of conditions goes to the browser in one execute_async_script,
+a MutationObserver re-checks them on every DOM change and the script returns as soon as they are met.
+
+condition - plain dict built by presence(), has_class(), text_contains(), url_changes(), url_contains();
+mode - ANY: one met condition ends the wait, ALL: every condition must be met.
+"""
+from time import monotonic
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from ParserPack.extraction import FIND_FUNCTION
+
+POLL = 'poll'  # selenium WebDriverWait + expected conditions, a round-trip per check
+OBSERVER = 'observer'  # wait_for(): one async script per wait, resolved by a MutationObserver
+
+WAIT_ENGINES = (POLL, OBSERVER)
+
+ANY = 'any'
+ALL = 'all'
+
+# check(condition), states(conditions) - condition evaluation in page JavaScript, shared by the wait scripts
+CONDITIONS_FUNCTION = FIND_FUNCTION + """
+function check(condition) {
+    if (condition.type === 'url_changes') return location.href !== condition.url;
+    if (condition.type === 'url_contains') return location.href.indexOf(condition.text) !== -1;
+    var element = find(document, condition.by, condition.value, false)[0];
+    if (!element) return false;
+    if (condition.type === 'has_class') return (element.getAttribute('class') || '').indexOf(condition.text) !== -1;
+    if (condition.type === 'text_contains') {
+        return (element.innerText !== undefined ? element.innerText : element.textContent || '')
+            .indexOf(condition.text) !== -1;
+    }
+    return true;
+}
+function states(conditions) {
+    return conditions.map(function (condition) {
+        try { return check(condition); } catch (e) { return false; }
+    });
+}
+"""
+
+# resolves with the list of condition states: on a DOM change that meets them or on timeout;
+# location changes through the history API don't touch the DOM, a slow interval re-check covers them
+WAIT_SCRIPT = CONDITIONS_FUNCTION + """
+var conditions = arguments[0], mode = arguments[1], timeout = arguments[2], done = arguments[arguments.length - 1];
+function met(current) {
+    return mode === 'all' ? current.every(Boolean) : current.some(Boolean);
+}
+var current = states(conditions);
+if (met(current)) { done(current); return; }
+var finished = false, observer, interval, timer;
+function finish(result) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearInterval(interval);
+    clearTimeout(timer);
+    done(result);
+}
+function recheck() {
+    var result = states(conditions);
+    if (met(result)) finish(result);
+}
+observer = new MutationObserver(recheck);
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+interval = setInterval(recheck, 250);
+timer = setTimeout(function () { finish(states(conditions)); }, timeout);
+"""
+
+
+def presence(locator: tuple):
+    return {'type': 'presence', 'by': locator[0], 'value': locator[1]}
+
+
+def has_class(locator: tuple, css_class: str):
+    """The element class attribute contains css_class (the ElementHasCssClass check)."""
+    return {'type': 'has_class', 'by': locator[0], 'value': locator[1], 'text': css_class}
+
+
+def text_contains(locator: tuple, text: str):
+    return {'type': 'text_contains', 'by': locator[0], 'value': locator[1], 'text': text}
+
+
+def url_changes(url: str):
+    return {'type': 'url_changes', 'url': url}
+
+
+def url_contains(text: str):
+    return {'type': 'url_contains', 'text': text}
+
+
+def _document_replaced(error: WebDriverException):
+    # the page navigated away (a form submit) while the script was waiting
+    message = str(error).lower()
+    return 'unloaded' in message or 'navigat' in message or 'context' in message and 'destroyed' in message
+
+
+def wait_for(driver, conditions: list, mode: str = ANY, timeout: float = 10):
+    """Wait until the conditions are met in the page, returns the list of their states.
+    A navigation during the wait restarts the script in the new document within the same timeout.
+    Raises TimeoutException if the conditions are not met in time."""
+    deadline = monotonic() + timeout
+    script_timeout = getattr(driver, '_wait_script_timeout', None)
+    if script_timeout is None or script_timeout < timeout + 5:
+        # the driver ends an async script on its own timeout, keep it above ours
+        driver.set_script_timeout(timeout + 5)
+        driver._wait_script_timeout = timeout + 5
+    while True:
+        remaining = deadline - monotonic()
+        try:
+            states = driver.execute_async_script(WAIT_SCRIPT, conditions, mode, max(0, int(remaining * 1000)))
+        except WebDriverException as e:
+            if not _document_replaced(e) or monotonic() >= deadline:
+                raise
+            continue
+        if (all if mode == ALL else any)(states):
+            return states
+        if monotonic() >= deadline:
+            raise TimeoutException(f'wait_for: conditions are not met in {timeout} s: {states}')
@@ -1,7 +1,9 @@
 import os
+import re
 import sys
 import urllib
-from time import sleep
+from functools import partial
+from time import sleep, monotonic
 
 import pydub
 import speech_recognition as sr
@@ -10,15 +12,36 @@ from colorama import Fore, Style
 from random import choice, uniform
 
 from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from MetricsPack import BYTE_BUCKETS, COUNT_BUCKETS, Metrics, echo, metrics as default_metrics
 from ParserPack import Parser
-from WebDriverPack.patch import webdriver_folder_name, download_latest_chromedriver
+from ParserPack.extraction import EXTRACT_SCRIPT, extract_static, normalize_fields
+from ParserPack.staticDom import parse
+from WebDriverPack.browserHost import BrowserHost
+from WebDriverPack.driverService import DriverService, RemoteChrome, connection, service_url
+from WebDriverPack.formFill import FILL_MODES, FILL_SCRIPT, KEYS, SCRIPT, fill_specs, has_special_keys
+from WebDriverPack.forwardProxy import ForwardingProxy
+from WebDriverPack.lifecycle import LifecyclePolicy, driver_pids, driver_rss, register, terminate, unregister
+from WebDriverPack.loadProfile import LoadProfile
+from WebDriverPack.networkCapture import LOGGING_PREFS, NetworkCapture
+from WebDriverPack.pageCache import PageCache
+from WebDriverPack.patch import download_latest_chromedriver, find_chrome_binary, get_chrome_version, \
+    get_chromedriver_path
+from WebDriverPack.recovery import RecoveryPolicy, REFRESH, ROTATE_PROXY, RESTART
+from WebDriverPack.sessionState import SessionState
+from WebDriverPack.tabs import TabSet
+from WebDriverPack.timing import TimingPolicy
+from WebDriverPack.waits import OBSERVER, WAIT_ENGINES, has_class, presence, text_contains, url_changes, wait_for
 from user_agent import generate_user_agent
 
+# get_page() step kinds, see WebDriver._page_steps()
+CALL, PAUSE, WAIT, SLEEP, NEW_DRIVER = 'call', 'pause', 'wait', 'sleep', 'new_driver'
+
 
 class ElementHasCssClass(object):
     """An expectation for checking that an element has a particular css class.
@@ -41,99 +64,327 @@ class ElementHasCssClass(object):
 
 class WebDriver(Parser):
     __number = 0
+    _chrome_binary = None
+    _chrome_version = ''
+    _chromedriver_path = None
+    max_driver_downloads = 1  # chromedriver downloads per browser start before a version mismatch is raised
 
     def __new__(cls, *args, **kwargs):
         cls.__number += 1
         return super(WebDriver, cls).__new__(cls)
 
     def __init__(self, marker: str = None, user_agent: bool = True, proxy: bool = False,
-                 delay_time: int = 3, headless: bool = False, max_retry: int = 5):
+                 delay_time: int = 3, headless: bool = False, max_retry: int = 5, local_proxy: bool = False,
+                 timing: TimingPolicy = None, recovery: RecoveryPolicy = None, metrics: Metrics = None,
+                 driver_factory=None, load_profile: LoadProfile = None, cache: PageCache = None,
+                 fill_mode: str = KEYS, session_file: str = None, session_max_age: float = None,
+                 browser_host: BrowserHost = None, lifecycle: LifecyclePolicy = None, wait_engine: str = 'poll',
+                 network_log: bool = False, driver_service: DriverService = None):
+        """local_proxy: with proxy=True and a proxy list Chrome is pointed at a local ForwardingProxy once,
+        proxy rotation then switches its upstream instead of restarting the browser;
+        timing: pauses / readiness waits between steps, TimingPolicy() (human-like pauses) by default,
+        ThroughputTiming() for sites where only readiness matters;
+        recovery: failure classification and per class retry budgets of get_page(), RecoveryPolicy() by default,
+        max_retry still caps the total number of attempts;
+        metrics: phase timings, counters and events, the MetricsPack default registry by default;
+        driver_factory: callable(ChromeOptions) -> selenium driver, replaces the local Chrome launch
+        (e.g. BenchPack.FakeDriver for benchmarks);
+        load_profile: blocked resources and page load strategy of the session, everything is loaded
+        and driver.get() waits for the load event by default (see loadProfile.TEXT_ONLY);
+        cache: PageCache of rendered pages, get_page() without form / recaptcha steps is served from it
+        while the entry is fresh, without touching the browser;
+        fill_mode: how get_page() fills form_data, 'keys' - pointer moves and key presses per field with
+        the timing pauses, 'script' - all fields set by one script firing input / change events;
+        session_file: json file of the session cookies and storage, restored into every new browser
+        (and again when another instance updates it), saved after a confirmed form submission; a get_page()
+        with form_data and submit_check_element first checks the restored session and skips the form
+        while the check element is there (see save_session());
+        session_max_age: seconds a saved session is restored, None - until the check finds it stale;
+        browser_host: BrowserHost to attach to instead of launching Chrome, spawned if it is not running and
+        left running by quit(); headless and proxy are the host launch settings, user-agent is set through
+        DevTools;
+        lifecycle: LifecyclePolicy, get_page() restarts the browser after max_pages pages, max_age seconds
+        or above max_rss bytes of memory, before its navigation;
+        wait_engine: how get_page() waits for elements and submit checks, 'poll' - selenium expected conditions
+        checked every 0.5 s, 'observer' - one script per wait resolved in the page by a MutationObserver;
+        network_log: launch Chrome with the DevTools performance log, needed by get_page(capture=...);
+        driver_service: DriverService (or its urls, from another process) to create the session on, shared by
+        the sessions over keep-alive connections instead of a chromedriver launched per browser.
+        The browser is closed by quit(), on leaving a with block or at interpreter exit; processes that
+        survive the driver quit are terminated."""
         super(WebDriver, self).__init__()
-        print(Fore.YELLOW + '[INFO]', Fore.MAGENTA + f' {marker}')
+        echo(Fore.YELLOW + '[INFO]', Fore.MAGENTA + f' {marker}')
+        if proxy and browser_host is not None:
+            raise ValueError('WebDriver: proxy is a launch argument, it can not be set on an attached browser_host')
         self._user_agent = user_agent
         self._proxy = proxy
         self._delay_time = delay_time
         self._headless = headless
         self._max_retry = max_retry
+        self._attempts = 0
+        self._timing = timing or TimingPolicy()
+        self._recovery = recovery or RecoveryPolicy()
+        self._metrics = metrics or default_metrics
+        self._driver_factory = driver_factory
+        self._load_profile = load_profile or LoadProfile()
+        self._applied_profile = None
+        if fill_mode not in FILL_MODES:
+            raise ValueError(f'WebDriver: fill_mode must be one of {FILL_MODES}')
+        if wait_engine not in WAIT_ENGINES:
+            raise ValueError(f'WebDriver: wait_engine must be one of {WAIT_ENGINES}')
+        self._wait_engine = wait_engine
+        self._network_log = network_log
+        self._captured = []  # responses caught by the last get_page(capture=...)
+        self._fill_mode = fill_mode
+        self._cache = cache
+        self._cached_page = None  # (final url, page source) of the last get_page() served from the cache
+        self._session_file = session_file
+        self._session_max_age = session_max_age
+        self._session_mtime = None  # mtime of the session file restored / saved by this instance
+        self._session_script = None  # storage restore script of the current browser
+        self._session_restored = False  # restored and not yet checked by get_page()
+        self._browser_host = browser_host
+        self._driver_service = driver_service
+        self._lifecycle = lifecycle
+        self._pages = 0  # pages loaded by the current browser
+        self._driver_started = monotonic()
+        self._forward_proxy = None
+        if proxy and local_proxy:
+            if len(self._proxies_list) > 0:
+                self._forward_proxy = ForwardingProxy()
+            else:
+                echo(Fore.YELLOW + '[INFO]', Fore.MAGENTA + ' local_proxy is ignored: the proxy list is empty, '
+                                                            'Chrome is started without a proxy')
         self._driver = self._get_driver()
+        register(self)
 
     def __del__(self):
-        self._driver.quit()
+        self.quit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.quit()
+
+    def quit(self):
+        """Close the browser (detach from a browser_host) and the local proxy, safe to call more than once."""
+        unregister(self)
+        self._close_driver()
+        forward_proxy = getattr(self, '_forward_proxy', None)
+        if forward_proxy is not None:
+            self._forward_proxy = None
+            forward_proxy.stop()
+
+    def _close_driver(self):
+        """Close the current browser only, the instance stays registered for the exit shutdown."""
+        driver = getattr(self, '_driver', None)
+        if driver is None:
+            return
+        self._driver = None
+        self._quit_driver(driver)
+
+    def _quit_driver(self, driver):
+        pids = driver_pids(driver)
+        try:
+            with self._metrics.phase('driver_quit', shared=self._driver_service is not None):
+                driver.quit()
+        except Exception as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in WebDriver.quit(): ', str(e))
+        # a hung or crashed browser may outlive the quit command
+        terminate(pids, grace=1)
+
+    def is_alive(self):
+        """Check that the browser session still responds to commands."""
+        if self._driver is None:
+            return False
+        try:
+            self._driver.switch_to.default_content()
+            return len(self._driver.window_handles) > 0
+        except Exception:
+            return False
 
     @property
     def current_url(self):
+        if self._cached_page is not None:
+            return self._cached_page[0]
         return self._driver.current_url
 
+    @property
+    def page_source(self):
+        if self._cached_page is not None:
+            return self._cached_page[1]
+        return self._driver.page_source
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def fill_mode(self):
+        return self._fill_mode
+
+    @property
+    def wait_engine(self):
+        return self._wait_engine
+
+    @property
+    def rss(self):
+        """Resident memory of the chromedriver + Chrome process tree in bytes, 0 if unknown."""
+        return driver_rss(self._driver) if self._driver is not None else 0
+
+    @property
+    def pages(self):
+        """Pages loaded by the current browser."""
+        return self._pages
+
+    @property
+    def captured(self):
+        """CapturedResponse list of the last get_page(capture=...)."""
+        return self._captured
+
+    @property
+    def browser_host(self):
+        return self._browser_host
+
+    @property
+    def session_file(self):
+        return self._session_file
+
     @property
     def driver(self):
         return self._driver
 
-    def _get_proxy(self):
-        if len(self._proxies_list) == 0:
-            return None
-        proxy = self._current_proxy
-        while proxy == self._current_proxy:
-            proxy = choice(self._proxies)
-        self._proxies.remove(proxy)
-        self._current_proxy = proxy
-        if len(self._proxies) == 0:
-            self._proxies = [proxy for proxy in self._proxies_list]
-        return proxy
+    @property
+    def timing(self):
+        return self._timing
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    @property
+    def recovery(self):
+        return self._recovery
+
+    @property
+    def load_profile(self):
+        return self._load_profile
+
+    @property
+    def attempts(self):
+        """Number of attempts made by the last get_page() call."""
+        return self._attempts
+
+    @classmethod
+    def _resolve_chrome(cls):
+        """Chrome binary and matching chromedriver path, resolved once per process from the local store."""
+        if cls._chrome_binary is None:
+            chrome_binary = find_chrome_binary()
+            if chrome_binary is None:
+                sys.exit(
+                    "[ERR] Please make sure Chrome browser is installed "
+                    "(or set the CHROME_BINARY environment variable) and updated and rerun program"
+                )
+            WebDriver._chrome_version = get_chrome_version(chrome_binary)
+            WebDriver._chrome_binary = chrome_binary
+        if cls._chromedriver_path is None:
+            WebDriver._chromedriver_path = get_chromedriver_path(cls._chrome_version)
+        return cls._chrome_binary, cls._chromedriver_path
 
     def _get_driver(self):
-        if not os.path.exists('C:/Program Files/Google/Chrome/Application/chrome.exe'):
-            sys.exit(
-                "[ERR] Please make sure Chrome browser is installed "
-                "(path is exists: C:/Program Files/Google/Chrome/Application/chrome.exe) "
-                "and updated and rerun program"
-            )
-        # download latest chromedriver, please ensure that your chrome is up to date
-        driver = None
+        if self._browser_host is not None:
+            self._browser_host.ensure()
+        downloads = 0
         while True:
+            driver = None
             try:
                 # create chrome driver
-                path_to_chromedriver = os.path.normpath(
-                    os.path.join(os.getcwd() + '/WebDriverPack', webdriver_folder_name, "chromedriver.exe")
-                )
                 options = webdriver.ChromeOptions()
-                options.headless = self._headless
+                if self._driver_factory is None:
+                    chrome_binary, path_to_chromedriver = self._resolve_chrome()
+                    options.binary_location = chrome_binary
+                if self._browser_host is not None:
+                    # launch arguments are ignored by an attached browser
+                    self._browser_host.apply_options(options)
+                else:
+                    options.headless = self._headless
+                u_agent = None
                 if self._user_agent:
                     if len(self._user_agents_list) > 0:
                         u_agent = choice(self._user_agents_list)
                     else:
                         u_agent = generate_user_agent()
-                    print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" user-agent: {u_agent}")
+                    echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" user-agent: {u_agent}")
                     options.add_argument('user-agent=' + u_agent)
                 if self._proxy and len(self._proxies_list) > 0:
                     prx = self._get_proxy()
-                    print('driver proxy: ', prx)
+                    echo('driver proxy: ', prx)
+                    if self._forward_proxy is not None:
+                        self._forward_proxy.set_upstream(prx)
+                        prx = self._forward_proxy.address
                     options.add_argument('--proxy-server=' + prx)
-                driver = webdriver.Chrome(path_to_chromedriver, options=options)
+                self._load_profile.apply_options(options)
+                if self._network_log:
+                    options.set_capability(*LOGGING_PREFS)
+                with self._metrics.phase('driver_start', shared=self._driver_service is not None):
+                    if self._driver_factory is not None:
+                        driver = self._driver_factory(options)
+                    elif self._driver_service is not None:
+                        driver = RemoteChrome(command_executor=connection(service_url(self._driver_service)),
+                                              options=options)
+                    else:
+                        driver = webdriver.Chrome(path_to_chromedriver, options=options)
                 self.__delay(driver, self._delay_time)
+                if self._browser_host is not None and u_agent and hasattr(driver, 'execute_cdp_cmd'):
+                    driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': u_agent})
+                self._load_profile.apply_driver(driver)
+                self._applied_profile = self._load_profile
+                self._session_script = None
+                self._restore_session(driver)
+                self._pages = 0
+                self._driver_started = monotonic()
                 return driver
             except Exception as e:
-                print(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL +
-                      f' in WebDriver._get_driver(): ', str(e))
-                # patch chromedriver if not available or outdated
-                if driver is None:
-                    is_patched = download_latest_chromedriver()
-                else:
-                    is_patched = download_latest_chromedriver(
-                        driver.capabilities["version"]
-                    )
+                echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL +
+                     f' in WebDriver._get_driver(): ', str(e))
+                if driver is not None:
+                    # the session is started, a later step failed: its browser is not left running
+                    self._quit_driver(driver)
+                if self._driver_factory is not None or self._driver_service is not None:
+                    # the shared chromedriver is not replaced by a session
+                    raise
+                # patch chromedriver only if it is missing or outdated, other launch failures are not fixed by it
+                browser_version = re.search(r'Current browser version is (\d+\.\d+\.\d+\.\d+)', str(e))
+                if not (browser_version or WebDriver._chromedriver_path is None) \
+                        or downloads >= self.max_driver_downloads:
+                    raise
+                downloads += 1
+                if browser_version:
+                    WebDriver._chrome_version = browser_version.group(1)
+                is_patched = download_latest_chromedriver(self._chrome_version)
+                WebDriver._chromedriver_path = None
                 if not is_patched:
                     sys.exit(
-                        "[ERR] Please update the chromedriver.exe in the webdriver folder "
-                        "according to your chrome version: https://chromedriver.chromium.org/downloads"
+                        "[ERR] Please update the chromedriver in the WebDriverPack/chromedriver/<chrome major "
+                        "version> folder according to your chrome version: https://chromedriver.chromium.org/downloads"
                     )
 
     def _reset_driver(self):
-        self._driver.quit()
+        self._close_driver()
         self._driver = self._get_driver()
 
     def change_proxy(self, proxy: str = None):
         if proxy is None:
             proxy = self._get_proxy()
+        else:
+            self._current_proxy = proxy
+        if self._forward_proxy is not None:
+            # the browser keeps pointing at the local proxy, only its upstream changes
+            echo('driver proxy: ', proxy)
+            self._forward_proxy.set_upstream(proxy)
+            self._driver.delete_all_cookies()
+            return
         prx = {
             "proxyType": "MANUAL",
             "httpProxy": proxy,
@@ -154,7 +405,9 @@ class WebDriver(Parser):
                  recaptcha: bool = False, recaptcha_type: str = 'v2',
                  recaptcha_image_element: tuple[webdriver.common.by.By, str] = None,
                  submit_button: tuple[webdriver.common.by.By, str] = None,
-                 submit_check_element: list[tuple[webdriver.common.by.By, str], str] = None):
+                 submit_check_element: list[tuple[webdriver.common.by.By, str], str] = None,
+                 load_profile: LoadProfile = None, use_cache: bool = True, fill_mode: str = None,
+                 capture: NetworkCapture = None):
         """Get web page by url.
         element: tuple[By, str];
         el_has_css_class: tuple[element[By, str], class];
@@ -162,89 +415,496 @@ class WebDriver(Parser):
         recaptcha_image_element: tuple[By, str];
         submit_button: tuple[By, str];
         submit_check_element: list[element[By, str], partial_text];
+        load_profile: LoadProfile for this call, the driver profile by default;
+        use_cache: False - skip the cache lookup (the fresh page is still stored);
+        fill_mode: 'keys' / 'script' for this call, the driver fill_mode by default;
+        capture: NetworkCapture of the responses to keep (WebDriver(network_log=True)), waited for like an element,
+        read from captured;
         """
+        return self._run_steps(self._page_steps(
+            'WebDriver.get_page()', url, el_max_wait_time, element, el_has_css_class, form_data, recaptcha,
+            recaptcha_type, recaptcha_image_element, submit_button, submit_check_element, load_profile, use_cache,
+            fill_mode, capture))
+
+    def _run_steps(self, steps):
+        """Run a step generator in this thread: commands are called, pauses and waits block.
+        A failed step is thrown into the generator, its return value is the result."""
+        send, value = steps.send, None
+        while True:
+            try:
+                step = send(value)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                value, send = self._step(*step), steps.send
+            except Exception as e:
+                value, send = e, steps.throw
+
+    def _step(self, kind: str, *args):
+        if kind == CALL:
+            return args[0](*args[1:])
+        if kind == PAUSE:
+            return self._timing.wait(args[0], self._driver, *args[1:])
+        if kind == WAIT:
+            return WebDriverWait(self._driver, *args[1:]).until(args[0])
+        if kind == SLEEP:
+            return sleep(args[0])
+        # NEW_DRIVER: the driver implicit wait is kept as is
 
-        for i in range(self._max_retry):
+    def _page_steps(self, where: str, url: str, el_max_wait_time: float = 3, element=None, el_has_css_class=None,
+                    form_data=None, recaptcha: bool = False, recaptcha_type: str = 'v2', recaptcha_image_element=None,
+                    submit_button=None, submit_check_element=None, load_profile: LoadProfile = None,
+                    use_cache: bool = True, fill_mode: str = None, capture: NetworkCapture = None):
+        """get_page() as a generator of steps, shared by WebDriver and AsyncWebDriver: driver commands are
+        (CALL, func, *args), pauses (PAUSE, phase[, element]), waits (WAIT, condition, timeout[, poll_frequency]),
+        (SLEEP, seconds) and (NEW_DRIVER,) after the browser may have been replaced. The runner sends the step
+        result back or throws its exception in. where - the caller name for the logs."""
+        recovery, page_start = self._page_start(capture)
+        metrics = self._metrics
+        profile = load_profile or self._load_profile
+        cache_key = self._cache_key(url, element, el_has_css_class, form_data, recaptcha, capture)
+        if use_cache and cache_key and (yield CALL, self._cache_lookup, cache_key):
+            return self._page_done(url, page_start, True)
+        if (yield CALL, self._recycle_if_due):
+            yield NEW_DRIVER,
+        yield CALL, self._refresh_session
+        navigate = True
+        while True:
+            self._attempts += 1
             try:
-                sleep(uniform(.5, 3))
-                self._driver.get(url)
-                print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' driver current url: {self._driver.current_url}')
+                if capture is not None:
+                    capture.reset()
+                    yield CALL, capture.discard, self._driver
+                if navigate:
+                    with metrics.phase('navigate', url=url, attempt=self._attempts):
+                        yield PAUSE, 'navigate'
+                        nav_start = monotonic()
+                        yield CALL, self._navigate, url, profile
+                    self._navigated(nav_start)
+                navigate = True
+                if not (profile.element_wait_only and (element or el_has_css_class or capture)):
+                    with metrics.phase('page_ready', url=url):
+                        yield PAUSE, 'page'
+                current_url = yield CALL, lambda: self._driver.current_url
+                echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' driver current url: {current_url}')
+
+                # restored session: the submit check element on the page means the form is already passed
+                if self._session_check_due(form_data, submit_check_element):
+                    with metrics.phase('session_check', url=url):
+                        valid = yield from self._check_element_steps(submit_check_element, el_max_wait_time)
+                    yield CALL, self._session_checked, valid
+                    if valid:
+                        return self._page_done(url, page_start, True)
 
                 # page element waiting
-                wait = WebDriverWait(self._driver, el_max_wait_time)
-                if element:
-                    element = wait.until(EC.presence_of_element_located(element))
-                elif el_has_css_class:
-                    element = wait.until(ElementHasCssClass(el_has_css_class[0], el_has_css_class[1]))
+                if element or el_has_css_class:
+                    with metrics.phase('element_wait', url=url):
+                        if self._wait_engine == OBSERVER:
+                            # one script resolved in the page, a single command
+                            yield CALL, partial(wait_for, self._driver,
+                                                self._wait_conditions(element, el_has_css_class),
+                                                timeout=el_max_wait_time)
+                        elif element:
+                            yield WAIT, EC.presence_of_element_located(element), el_max_wait_time
+                        else:
+                            yield WAIT, ElementHasCssClass(el_has_css_class[0], el_has_css_class[1]), \
+                                el_max_wait_time
+
+                # network responses waiting
+                if capture is not None:
+                    with metrics.phase('capture_wait', url=url):
+                        self._captured = yield from self._capture_steps(capture, el_max_wait_time)
 
                 # form input
                 if form_data:
-                    self._form_input(form_data)
+                    with metrics.phase('form_input', url=url, fields=len(form_data)):
+                        yield from self._form_input_steps(form_data, fill_mode)
                     if not recaptcha:
-                        self._submit_bt_click(submit_button)
+                        # the url the form is on, the requested one may have redirected
+                        form_url = yield CALL, lambda: self._driver.current_url
+                        with metrics.phase('submit', url=url):
+                            yield from self._submit_bt_click_steps(submit_button)
                         # form submit check
-                        if not submit_check_element:
-                            print(Fore.YELLOW + '[INFO]', Fore.MAGENTA +
-                                  'Form or recaptcha submission is determined by a change in the url, set the '
-                                  'validation element if the url does not change as a result of the submission, '
-                                  '\nor for better identification!')
-                        if (submit_check_element and self._check_element(submit_check_element, el_max_wait_time)) \
-                                or self._driver.current_url != url:
-                            print(Fore.YELLOW + '[INFO]  Form submit check:', Fore.CYAN + f" passed")
-                            print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" Form data is submitted")
-                        else:
-                            print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" failed to confirm the data submission")
-                            print(Fore.YELLOW + '[INFO]  Form submit check:', Fore.CYAN + f" not passed")
+                        self._submit_check_note(submit_check_element)
+                        with metrics.phase('submit_check', url=url):
+                            submitted = yield from self._submit_check_steps(submit_check_element, form_url,
+                                                                            el_max_wait_time)
+                        yield CALL, self._form_submitted, submitted
 
-                # recaptcha
+                # recaptcha: the solvers are long blocking sequences, one step
                 solved = False
-                if recaptcha and ('www.google.com/recaptcha/api2' in self._driver.current_url
-                                  or recaptcha_type == 'v2'):
-                    solved = self.recaptcha_v2_solver(submit_button, submit_check_element)
-                elif recaptcha and recaptcha_type == 'v3':
-                    solved = self.recaptcha_v3_solver()
-                elif recaptcha and recaptcha_type == 'image':
-                    solved = self.recaptcha_image_solver(recaptcha_image_element)
-                return not recaptcha or solved
+                if recaptcha:
+                    solved = yield CALL, self._solve_recaptcha, url, recaptcha_type, recaptcha_image_element, \
+                        submit_button, submit_check_element
+                    if solved and form_data:
+                        yield CALL, self._store_session
+                if cache_key:
+                    yield CALL, self._cache_store, cache_key, url
+                return self._page_done(url, page_start, not recaptcha or solved)
             except Exception as e:
-                print(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL +
-                      f' in WebDriver.get_page(): \n', str(e))
-                self._reset_driver()
+                action, backoff = self._page_failure(url, e, recovery, where)
+                if action is None:
+                    return self._page_done(url, page_start, False)
+                if backoff:
+                    yield SLEEP, backoff
+                    self._timing.record('backoff', backoff)
+                with metrics.phase('recover', url=url, action=action):
+                    navigate = yield CALL, self._recover, action
+                yield NEW_DRIVER,
+
+    def _page_start(self, capture: NetworkCapture = None):
+        """Reset the per-call state of get_page(), returns its recovery state and start time."""
+        if capture is not None and not self._network_log:
+            raise ValueError('WebDriver: get_page(capture=...) needs WebDriver(network_log=True)')
+        self._attempts = 0
+        self._captured = []
+        return self._recovery.start(self._max_retry), monotonic()
+
+    def _navigated(self, nav_start: float):
+        if self._proxy and self._current_proxy:
+            self.proxy_pool.report_success(self._current_proxy, monotonic() - nav_start)
+
+    @staticmethod
+    def _wait_conditions(element=None, el_has_css_class=None):
+        """wait_for() conditions of the get_page() element / el_has_css_class."""
+        return [presence(element) if element else has_class(*el_has_css_class)]
+
+    @staticmethod
+    def _submit_check_note(submit_check_element):
+        if not submit_check_element:
+            echo(Fore.YELLOW + '[INFO]', Fore.MAGENTA +
+                 'Form or recaptcha submission is determined by a change in the url, set the '
+                 'validation element if the url does not change as a result of the submission, '
+                 '\nor for better identification!')
+
+    def _form_submitted(self, submitted: bool):
+        """Report the form submit check, a confirmed submission saves the session."""
+        self._metrics.inc('form_submit_total', result='passed' if submitted else 'not_passed')
+        if submitted:
+            echo(Fore.YELLOW + '[INFO]  Form submit check:', Fore.CYAN + f" passed")
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" Form data is submitted")
+            self._store_session()
+        else:
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" failed to confirm the data submission")
+            echo(Fore.YELLOW + '[INFO]  Form submit check:', Fore.CYAN + f" not passed")
+
+    def _solve_recaptcha(self, url: str, recaptcha_type: str, recaptcha_image_element=None, submit_button=None,
+                         submit_check_element=None):
+        with self._metrics.phase('recaptcha', url=url, type=recaptcha_type):
+            if 'www.google.com/recaptcha/api2' in self._driver.current_url or recaptcha_type == 'v2':
+                return self.recaptcha_v2_solver(submit_button, submit_check_element)
+            if recaptcha_type == 'v3':
+                return self.recaptcha_v3_solver()
+            if recaptcha_type == 'image':
+                return self.recaptcha_image_solver(recaptcha_image_element)
         return False
 
-    def _form_input(self, data: list[list[tuple[webdriver.common.by.By, str], str]]):
+    def _page_failure(self, url: str, error: Exception, recovery, where: str):
+        """Log and classify a get_page() failure, returns (recovery action, backoff), action None - give up."""
+        echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in {where}: \n', str(error))
+        failure_class, action, backoff = recovery.failure(error)
+        self._metrics.inc('get_page_failures_total', failure_class=failure_class, action=action or 'giveup')
+        self._metrics.event('get_page_failure', url=url, attempt=self._attempts, failure_class=failure_class,
+                            action=action, error=type(error).__name__)
+        if action is None:
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' {failure_class} retry budget is exhausted')
+        else:
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' {failure_class} failure, recovery: ' +
+                 Fore.CYAN + f'{action}')
+        return action, backoff
+
+    def save_session(self, path: str = None):
+        """Save the cookies of all domains and the storage of the current origin to path (session_file by default),
+        storage of other origins saved there before is kept. Returns the SessionState."""
+        path = path or self._session_file
+        if not path:
+            raise ValueError('WebDriver.save_session: no path given and no session_file set')
+        with self._metrics.phase('session_save'):
+            state = (SessionState.load(path) or SessionState()).capture(self._driver)
+            state.save(path)
+        if path == self._session_file:
+            self._session_mtime = os.path.getmtime(path)
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' session state saved: {path}')
+        return state
+
+    def _store_session(self):
+        if not self._session_file:
+            return
+        try:
+            self.save_session()
+        except Exception as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in WebDriver._store_session(): ', str(e))
+
+    def _restore_session(self, driver):
+        """Put the saved session state into driver (a new browser or one behind an updated session file)."""
+        self._session_restored = False
+        if not self._session_file:
+            return
+        try:
+            mtime = os.path.getmtime(self._session_file)
+        except OSError:
+            return
+        self._session_mtime = mtime
+        state = SessionState.load(self._session_file)
+        if state is None:
+            return
+        if self._session_max_age is not None and state.age > self._session_max_age:
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' session state is too old: {self._session_file}')
+            self._metrics.inc('session_state_total', result='expired')
+            return
+        try:
+            with self._metrics.phase('session_restore'):
+                script = state.apply(driver, self._session_script)
+        except Exception as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in WebDriver._restore_session(): ', str(e))
+            return
+        if script is None:
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL +
+                 ' session state is not restored: no DevTools access and no cookies origin')
+            return
+        self._session_script = script
+        self._session_restored = True
+        self._metrics.inc('session_state_total', result='restored')
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' session state restored: {self._session_file}')
+
+    def _refresh_session(self):
+        """Restore the session file again if another instance (a pool member, a worker) saved a newer one."""
+        if not self._session_file:
+            return
+        try:
+            mtime = os.path.getmtime(self._session_file)
+        except OSError:
+            return
+        if mtime != self._session_mtime:
+            self._restore_session(self._driver)
+
+    def _session_check_due(self, form_data, submit_check_element):
+        """Is this form page the first one after a restore, to be checked before filling the form."""
+        due = self._session_restored and bool(form_data) and bool(submit_check_element)
+        if due:
+            self._session_restored = False
+        return due
+
+    def _session_checked(self, valid: bool):
+        self._metrics.inc('session_state_total', result='valid' if valid else 'stale')
+        if valid:
+            echo(Fore.YELLOW + '[INFO]  Session check:', Fore.CYAN + ' passed, form is skipped')
+            return
+        echo(Fore.YELLOW + '[INFO]  Session check:', Fore.CYAN + ' not passed, session state is stale')
+        try:
+            os.remove(self._session_file)
+        except OSError:
+            pass
+        self._session_mtime = None
+        self._driver.delete_all_cookies()
+
+    def _cache_key(self, url: str, element=None, el_has_css_class=None, form_data=None, recaptcha=False,
+                   capture=None):
+        """Cache key of a plain page load, None if there is no cache, the call interacts with the page
+        or captures its network responses (not kept by the cache)."""
+        if self._cache is None or form_data or recaptcha or capture is not None:
+            return None
+        return self._cache.key(url, element=element, el_has_css_class=el_has_css_class)
+
+    def _cache_lookup(self, cache_key: str):
+        if not cache_key:
+            return False
+        with self._metrics.phase('cache_lookup'):
+            self._cached_page = self._cache.get(cache_key)
+        if self._cached_page is None:
+            return False
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' page from cache: {self._cached_page[0]}')
+        return True
+
+    def _cache_store(self, cache_key: str, url: str):
+        try:
+            self._cache.put(cache_key, url, self._driver.current_url, self._driver.page_source)
+        except Exception as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in WebDriver._cache_store(): ', str(e))
+
+    def _capture_steps(self, capture: NetworkCapture, el_max_wait_time: float = 3):
+        """Collect the capture responses until min_count of them have arrived, returns them."""
+        try:
+            yield WAIT, capture.arrived, el_max_wait_time, .05
+        except TimeoutException:
+            raise TimeoutException(f'{len(capture.responses)} of {capture.min_count} responses matching '
+                                   f'{capture!r} in {el_max_wait_time} s')
+        for response in capture.responses:
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' captured response: {response.url}')
+        self._metrics.observe('captured_responses', len(capture.responses), buckets=COUNT_BUCKETS)
+        return capture.responses
+
+    def _recycle_if_due(self):
+        """Replace the browser if the lifecycle policy says so (a safe point between pages), True if replaced."""
+        if self._lifecycle is None:
+            return False
+        measured = []
+
+        def rss():
+            measured.append(self.rss)
+            return measured[0]
+        reason = self._lifecycle.reason(self._pages, monotonic() - self._driver_started, rss)
+        if measured:
+            self._metrics.observe('driver_rss_bytes', measured[0], buckets=BYTE_BUCKETS)
+        if reason is None:
+            return False
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' browser recycled: {reason}, {self._pages} pages' +
+             (f', {measured[0] / 2 ** 20:.0f} MB' if measured else ''))
+        self._metrics.inc('driver_recycle_total', reason=reason)
+        with self._metrics.phase('recycle', reason=reason):
+            self._reset_driver()
+        return True
+
+    def _navigate(self, url: str, profile: LoadProfile):
+        """Open url with the load profile, switching the session url blocking if the profile changed."""
+        self._cached_page = None
+        self._pages += 1
+        if self._applied_profile is not profile:
+            profile.apply_driver(self._driver)
+            self._applied_profile = profile
+        profile.navigate(self._driver, url, self._load_profile.page_load_strategy)
+
+    def _page_done(self, url: str, page_start: float, ok: bool):
+        duration = monotonic() - page_start
+        self._metrics.inc('get_page_total', result='ok' if ok else 'failed')
+        self._metrics.observe('get_page_seconds', duration)
+        self._metrics.observe('get_page_attempts', self._attempts, buckets=COUNT_BUCKETS)
+        self._metrics.event('get_page', url=url, ok=ok, attempts=self._attempts, duration=duration)
+        return ok
+
+    def _recover(self, action: str):
+        """Apply a RecoveryPolicy action, return False if the page must not be navigated again (refreshed)."""
+        try:
+            if action == REFRESH:
+                self._driver.switch_to.default_content()
+                self._driver.refresh()
+                return False
+            if action == ROTATE_PROXY and self._proxy and self._current_proxy:
+                self.proxy_pool.report_failure(self._current_proxy)
+                if self._forward_proxy is not None:
+                    self.change_proxy()
+                else:
+                    # the proxy is a Chrome launch argument: a new proxy means a new browser
+                    self._reset_driver()
+            elif action == RESTART:
+                self._reset_driver()
+        except Exception as e:
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL + f' in WebDriver._recover({action}): ', str(e))
+            self._reset_driver()
+        return True
+
+    def _form_input(self, data: list[list[tuple[webdriver.common.by.By, str], str]], fill_mode: str = None):
         """fills in all form fields"""
-        print(Fore.YELLOW + '[INFO]  _form_input')
+        return self._run_steps(self._form_input_steps(data, fill_mode))
+
+    def _form_input_steps(self, data: list[list[tuple[webdriver.common.by.By, str], str]], fill_mode: str = None):
+        echo(Fore.YELLOW + '[INFO]  _form_input')
         if data is None:
             return
+        if (fill_mode or self._fill_mode) == SCRIPT:
+            data = yield CALL, self._form_fill_script, data
         for inp_data in data:
-            sleep(uniform(1.0, 5.0))
-            print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' form input: {inp_data[0][1]}' + Fore.CYAN + ' true')
-            element = self._driver.find_element(*inp_data[0])
-            offset = self._get_element_offset(element)
-            action = webdriver.ActionChains(self._driver)
-            action.move_to_element_with_offset(element, offset['x'], offset['y']).pause(uniform(1.0, 2.0)) \
-                .send_keys_to_element(element, *inp_data[1]).perform()
+            element = yield CALL, self._driver.find_element, *inp_data[0]
+            yield PAUSE, 'form_input', element
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' form input: {inp_data[0][1]}' + Fore.CYAN + ' true')
+            yield from self._move_to_steps(element)
+            yield CALL, lambda: webdriver.ActionChains(self._driver).send_keys_to_element(element, *inp_data[1]) \
+                .perform()
+
+    def _move_to_steps(self, element):
+        """move the pointer to a random point of the element, then pause"""
+        offset = yield CALL, self._get_element_offset, element
+        yield CALL, lambda: webdriver.ActionChains(self._driver) \
+            .move_to_element_with_offset(element, offset['x'], offset['y']).perform()
+        yield PAUSE, 'action'
+
+    def _form_fill_script(self, data: list[list[tuple[webdriver.common.by.By, str], str]]):
+        """Set all plain text fields with one script, return the fields left for key presses (selenium Keys)."""
+        scripted = [inp_data for inp_data in data if not has_special_keys(str(inp_data[1]))]
+        missing = self._driver.execute_script(FILL_SCRIPT, fill_specs(scripted))
+        if missing:
+            raise NoSuchElementException(f'form fields not found: {[scripted[i][0] for i in missing]}')
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' form input: {len(scripted)} fields' + Fore.CYAN + ' true')
+        return [inp_data for inp_data in data if has_special_keys(str(inp_data[1]))]
 
     def _check_element(self, element_data: list[tuple[webdriver.common.by.By, str], str], el_max_wait_time: float = 3):
         """check if an element exists on the page"""
+        return self._run_steps(self._check_element_steps(element_data, el_max_wait_time))
+
+    def _check_element_steps(self, element_data: list[tuple[webdriver.common.by.By, str], str],
+                             el_max_wait_time: float = 3):
         element = element_data[0]
         text = element_data[1]
         try:
-            wait = WebDriverWait(self._driver, el_max_wait_time)
-            wait.until(EC.presence_of_element_located(element))
-            if text and text not in self._driver.find_element(*element).text:
+            if self._wait_engine == OBSERVER:
+                condition = text_contains(element, text) if text else presence(element)
+                yield CALL, partial(wait_for, self._driver, [condition], timeout=el_max_wait_time)
+                return True
+            found = yield WAIT, EC.presence_of_element_located(element), el_max_wait_time
+            if text and text not in (yield CALL, lambda: found.text):
                 return False
         except Exception as e:
-            print(Fore.MAGENTA + '[ERROR]', Style.RESET_ALL + f"in _check_element() - Element not find. \n - {str(e)}")
+            echo(Fore.MAGENTA + '[ERROR]', Style.RESET_ALL + f"in _check_element() - Element not find. \n - {str(e)}")
+            return False
+        return True
+
+    def _submit_check(self, submit_check_element: list[tuple[webdriver.common.by.By, str], str], start_url: str,
+                      el_max_wait_time: float = 3):
+        """Is a submission confirmed: the check element (with its text) is on the page or the url has changed
+        from start_url, the url of the form page before the submit. The check element is waited for first."""
+        return self._run_steps(self._submit_check_steps(submit_check_element, start_url, el_max_wait_time))
+
+    def _submit_check_steps(self, submit_check_element: list[tuple[webdriver.common.by.By, str], str],
+                            start_url: str, el_max_wait_time: float = 3):
+        if self._wait_engine != OBSERVER or submit_check_element:
+            if submit_check_element and (yield from self._check_element_steps(submit_check_element,
+                                                                               el_max_wait_time)):
+                return True
+            return (yield CALL, lambda: self._driver.current_url) != start_url
+        try:
+            yield CALL, partial(wait_for, self._driver, [url_changes(start_url)], timeout=el_max_wait_time)
+        except TimeoutException:
             return False
         return True
 
     def get_element(self, element: tuple[webdriver.common.by.By, str]):
+        """WebElement of the current page, a page served from the cache is loaded in the browser first."""
+        self._load_cached_page()
         if self._driver.current_url == 'data:,':
             return None
         return self._driver.find_element(*element)
 
+    def _load_cached_page(self):
+        """Open the page last served from the cache in the browser: elements need the live page."""
+        if self._cached_page is None:
+            return
+        url = self._cached_page[0]
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' cached page is loaded for its elements: {url}')
+        with self._metrics.phase('navigate', url=url, attempt=0):
+            self._navigate(url, self._load_profile)
+
+    def extract(self, fields: dict, properties=('text',), root=None):
+        """Read many fields of the page in one execute_script round-trip, returns plain dicts / lists.
+        fields: {name: (By, str)} or {name: {'locator': (By, str), 'properties': [...], 'many': bool,
+        'fields': {nested fields}}} (see ParserPack.extraction);
+        properties: default properties of the fields: 'text', 'innerHTML', 'outerHTML' or attribute names;
+        root: WebElement to search in, the document by default.
+        """
+        specs = normalize_fields(fields, properties)
+        with self._metrics.phase('extract', fields=len(specs)):
+            if self._cached_page is not None:
+                # the browser is not on a page served from the cache
+                return extract_static(parse(self._cached_page[1]), specs, self._cached_page[0])
+            return self._driver.execute_script(EXTRACT_SCRIPT, specs, root)
+
+    def fetch_tabs(self, pages, tabs: int = 4, timeout: float = 30):
+        """Load read-only page specs ('url' or {'url': ..., 'element' / 'el_has_css_class', 'extract'}) in `tabs`
+        tabs of this browser at once, yield result dicts in completion order (see tabs.TabSet).
+        The extra tabs are closed when the generator is exhausted or closed."""
+        self._recycle_if_due()
+        with TabSet(self, tabs, timeout) as tab_set:
+            yield from tab_set.fetch(pages)
+
     @classmethod
     def _get_element_offset(cls, element):
         """Set offset of the specified element.
@@ -257,55 +917,55 @@ class WebDriver(Parser):
         return {'x': x_offset, 'y': y_offset}
 
     def _submit_bt_click(self, submit):
+        return self._run_steps(self._submit_bt_click_steps(submit))
+
+    def _submit_bt_click_steps(self, submit):
         try:
-            self._driver.switch_to.default_content()
-            sleep(uniform(1.0, 5.0))
-            element = self._driver.find_element(*submit)
-            offset = self._get_element_offset(element)
-            action = webdriver.ActionChains(self._driver)
-            action.move_to_element_with_offset(element, offset['x'], offset['y']) \
-                .pause(uniform(1.0, 2.0)).click().perform()
+            yield CALL, self._driver.switch_to.default_content
+            element = yield CALL, self._driver.find_element, *submit
+            yield PAUSE, 'submit', element
+            yield from self._move_to_steps(element)
+            yield CALL, lambda: webdriver.ActionChains(self._driver).click().perform()
         except Exception as e:
-            print(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL +
-                  f' in WebDriver._submit_bt_click(self, submit): recaptcha submit not find, '
-                  f'\n{str(e)}')
+            echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL +
+                 f' in WebDriver._submit_bt_click(self, submit): recaptcha submit not find, '
+                 f'\n{str(e)}')
 
     def recaptcha_v2_solver(self, submit: tuple[webdriver.common.by.By, str] = None,
                             submit_check_element: list[tuple[webdriver.common.by.By, str], str] = None):
-        print(Fore.YELLOW + '[INFO]  recaptcha_v2_solver')
+        echo(Fore.YELLOW + '[INFO]  recaptcha_v2_solver')
         start_url = self._driver.current_url
         recaptcha_control_frame = None
         recaptcha_challenge_frame = None
         for i in range(2):
             # find recaptcha frames
-            sleep(uniform(1.0, 5.0))
+            self._timing.wait('recaptcha')
             frames = self._driver.find_elements_by_tag_name("iframe")
-            print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' iframes count: {len(frames)}')
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' iframes count: {len(frames)}')
             for index, frame in enumerate(frames):
                 if frame.get_attribute("title") == "reCAPTCHA":
                     recaptcha_control_frame = frame
                 if frame.get_attribute("title") == "проверка recaptcha":
                     recaptcha_challenge_frame = frame
             if not recaptcha_control_frame or not recaptcha_challenge_frame:
-                print(Fore.MAGENTA + '[ERR]', Style.RESET_ALL + " Unable to find recaptcha.")
+                echo(Fore.MAGENTA + '[ERR]', Style.RESET_ALL + " Unable to find recaptcha.")
                 if submit and i == 0:
                     self._submit_bt_click(submit)
                 else:
                     # form submit check
                     if not submit_check_element:
-                        print(Fore.YELLOW + '[INFO]', Fore.MAGENTA +
-                              'Form or recaptcha submission is determined by a change in the url, set the validation '
-                              'element if the url does not change as a result of the submission, \nor for better '
-                              'identification!')
-                    if (submit_check_element and self._check_element(submit_check_element)) \
-                            or self._driver.current_url != start_url:
-                        print(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" passed")
-                        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" data is submitted")
+                        echo(Fore.YELLOW + '[INFO]', Fore.MAGENTA +
+                             'Form or recaptcha submission is determined by a change in the url, set the validation '
+                             'element if the url does not change as a result of the submission, \nor for better '
+                             'identification!')
+                    if self._submit_check(submit_check_element, start_url):
+                        echo(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" passed")
+                        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" data is submitted")
                         return True
                     else:
-                        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" failed to confirm the data submission")
-                        print(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" not passed")
-                    print(Fore.YELLOW + '[INFO]', Fore.CYAN + " Abort solver.")
+                        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" failed to confirm the data submission")
+                        echo(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" not passed")
+                    echo(Fore.YELLOW + '[INFO]', Fore.CYAN + " Abort solver.")
                     raise ValueError('raise exception to reset driver.')
             else:
                 break
@@ -315,32 +975,32 @@ class WebDriver(Parser):
         self._driver.switch_to.frame(recaptcha_control_frame)
 
         # click on checkbox to activate recaptcha
-        sleep(uniform(1.0, 5.0))
+        self._timing.wait('recaptcha')
         element = self._driver.find_element_by_class_name("recaptcha-checkbox-border")
         offset = self._get_element_offset(element)
         action = webdriver.ActionChains(self._driver)
         action.move_to_element_with_offset(element, offset['x'], offset['y']) \
-            .pause(uniform(1.0, 2.0)).click().perform()
-        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' recaptcha-checkbox is clicked')
-        sleep(3)
+            .pause(self._timing.action_pause()).click().perform()
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' recaptcha-checkbox is clicked')
+        self._timing.wait('recaptcha_check', self._driver, timeout=3,
+                          until=lambda driver: 'display: none' in element.get_attribute('style'))
         if 'display: none' in element.get_attribute('style'):
-            print(Fore.YELLOW + '[INFO]  Recaptcha pass check: ' + Fore.CYAN + 'passed')
+            echo(Fore.YELLOW + '[INFO]  Recaptcha pass check: ' + Fore.CYAN + 'passed')
             if submit:
                 self._submit_bt_click(submit)
                 # form submit check
                 if not submit_check_element:
-                    print(Fore.YELLOW + '[INFO]', Fore.MAGENTA +
-                          'Form or recaptcha submission is determined by a change in the url, set the validation '
-                          'element if the url does not change as a result of the submission, \nor for better '
-                          'identification!')
-                if (submit_check_element and self._check_element(submit_check_element)) \
-                        or self._driver.current_url != start_url:
-                    print(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" passed")
-                    print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" data is submitted")
+                    echo(Fore.YELLOW + '[INFO]', Fore.MAGENTA +
+                         'Form or recaptcha submission is determined by a change in the url, set the validation '
+                         'element if the url does not change as a result of the submission, \nor for better '
+                         'identification!')
+                if self._submit_check(submit_check_element, start_url):
+                    echo(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" passed")
+                    echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" data is submitted")
                 else:
-                    print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" failed to confirm the data submission")
-                    print(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" not passed")
-            print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" Recaptcha is passed")
+                    echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" failed to confirm the data submission")
+                    echo(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" not passed")
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" Recaptcha is passed")
             return True
 
         # switch to recaptcha audio control frame
@@ -349,13 +1009,13 @@ class WebDriver(Parser):
         self._driver.switch_to.frame(recaptcha_challenge_frame)
 
         # click on audio challenge
-        sleep(uniform(1.0, 5.0))
+        self._timing.wait('recaptcha')
         element = self._driver.find_element_by_id("recaptcha-audio-button")
         offset = self._get_element_offset(element)
         action = webdriver.ActionChains(self._driver)
         action.move_to_element_with_offset(element, offset['x'], offset['y']). \
-            pause(uniform(1.0, 2.0)).click().perform()
-        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' recaptcha-audio-button is clicked')
+            pause(self._timing.action_pause()).click().perform()
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' recaptcha-audio-button is clicked')
 
         # switch to recaptcha audio challenge frame
         self._driver.switch_to.default_content()
@@ -364,9 +1024,9 @@ class WebDriver(Parser):
 
         for i in range(5):
             # get the mp3 audio file
-            sleep(uniform(1.0, 5.0))
+            self._timing.wait('recaptcha')
             src = self._driver.find_element_by_id("audio-source").get_attribute("src")
-            print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" Audio src: {src}")
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" Audio src: {src}")
 
             path_to_mp3 = os.path.normpath(os.path.join(os.getcwd(), "WebDriverPack/sample.mp3"))
             path_to_wav = os.path.normpath(os.path.join(os.getcwd(), "WebDriverPack/sample.wav"))
@@ -381,8 +1041,8 @@ class WebDriver(Parser):
                 sound.export(path_to_wav, format="wav")
                 sample_audio = sr.AudioFile(path_to_wav)
             except Exception as e:
-                print(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL +
-                      f' in WebDriver.recaptcha_v2_solver(): \n{str(e)}')
+                echo(Fore.MAGENTA + '[EXCEPT]', Style.RESET_ALL +
+                     f' in WebDriver.recaptcha_v2_solver(): \n{str(e)}')
                 sys.exit(
                     "[ERR] Please run program as administrator or download ffmpeg manually, "
                     "https://blog.gregzaal.com/how-to-install-ffmpeg-on-windows/"
@@ -393,47 +1053,49 @@ class WebDriver(Parser):
             with sample_audio as source:
                 audio = r.record(source)
             key = r.recognize_google(audio)
-            print(Fore.YELLOW + '[INFO]', f" Recaptcha Passcode:" + Fore.CYAN + f" {key}")
+            echo(Fore.YELLOW + '[INFO]', f" Recaptcha Passcode:" + Fore.CYAN + f" {key}")
 
             # key in results and submit
-            sleep(uniform(1.0, 5.0))
+            self._timing.wait('recaptcha')
             element = self._driver.find_element_by_id("audio-response")
             offset = self._get_element_offset(element)
             action = webdriver.ActionChains(self._driver)
-            action.move_to_element_with_offset(element, offset['x'], offset['y']).pause(uniform(1.0, 2.0)) \
+            action.move_to_element_with_offset(element, offset['x'], offset['y']).pause(self._timing.action_pause()) \
                 .send_keys_to_element(element, key.lower()).send_keys_to_element(element, Keys.ENTER).perform()
-            print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' Recaptcha Passcode is send')
+            echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f' Recaptcha Passcode is send')
 
             # check if recaptcha is passed
-            sleep(3)
+            self._timing.wait('recaptcha_check', self._driver, timeout=3,
+                              until=lambda driver: driver.find_element_by_class_name(
+                                  'rc-audiochallenge-error-message').text.strip() != ''
+                              or driver.find_element_by_id('audio-source').get_attribute('src') != src)
             src_ = self._driver.find_element_by_id("audio-source").get_attribute("src")
             err_ = self._driver.find_element_by_class_name('rc-audiochallenge-error-message')
             if err_.text.strip() == '' or src_ == src:
-                print(Fore.YELLOW + '[INFO]  Recaptcha pass check: ' + Fore.CYAN + 'passed')
+                echo(Fore.YELLOW + '[INFO]  Recaptcha pass check: ' + Fore.CYAN + 'passed')
 
                 # submit recaptcha result
                 if submit:
                     self._submit_bt_click(submit)
                     # form submit check
                     if not submit_check_element:
-                        print(Fore.YELLOW + '[INFO]', Fore.MAGENTA +
-                              'Form or recaptcha submission is determined by a change in the url, set the validation '
-                              'element if the url does not change as a result of the submission, \nor for better '
-                              'identification!')
-                    if (submit_check_element and self._check_element(submit_check_element)) \
-                            or self._driver.current_url != start_url:
-                        print(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" passed")
-                        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" data is submitted")
+                        echo(Fore.YELLOW + '[INFO]', Fore.MAGENTA +
+                             'Form or recaptcha submission is determined by a change in the url, set the validation '
+                             'element if the url does not change as a result of the submission, \nor for better '
+                             'identification!')
+                    if self._submit_check(submit_check_element, start_url):
+                        echo(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" passed")
+                        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" data is submitted")
                     else:
-                        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" failed to confirm the data submission")
-                        print(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" not passed")
-                print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" Recaptcha is passed")
+                        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" failed to confirm the data submission")
+                        echo(Fore.YELLOW + '[INFO]  Submit check:', Fore.CYAN + f" not passed")
+                echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" Recaptcha is passed")
                 return True
             else:
-                print(Fore.YELLOW + '[INFO]', Fore.MAGENTA +
-                      f' audio-error-message: {err_.text}\n' +
-                      Fore.YELLOW + '[INFO]  Pass check: ' + Fore.CYAN + 'not passed, re-listening')
-        print(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" Recaptcha is not passed")
+                echo(Fore.YELLOW + '[INFO]', Fore.MAGENTA +
+                     f' audio-error-message: {err_.text}\n' +
+                     Fore.YELLOW + '[INFO]  Pass check: ' + Fore.CYAN + 'not passed, re-listening')
+        echo(Fore.YELLOW + '[INFO]', Style.RESET_ALL + f" Recaptcha is not passed")
         return False
 
     def recaptcha_v3_solver(self):
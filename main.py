@@ -13,7 +13,7 @@ from WebDriverPack.webDriver import WebDriver, Parser
 # Press the green button in the gutter to run the script.
 
 if __name__ == '__main__':
-    driver = WebDriver('login to acc')
+    driver = WebDriver('login to acc', session_file='text_files/session.json')
 
     # form_data = [
     #     [(By.ID, 'mail-name'), 'Alex'],
@@ -0,0 +1,85 @@
+import asyncio
+import unittest
+
+from selenium.webdriver.common.by import By
+
+from BenchPack.fakeDriver import FakeDriver
+from BenchPack.site import BenchSite
+from MetricsPack import Metrics
+from WebDriverPack.asyncWebDriver import AsyncWebDriver
+from WebDriverPack.recovery import TIMEOUT, RecoveryPolicy
+from WebDriverPack.timing import ThroughputTiming
+from WebDriverPack.webDriver import WebDriver
+
+
+class AsyncGetPageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.site = BenchSite()
+        self.metrics = Metrics()
+
+    def tearDown(self):
+        self.site.stop()
+
+    def _run(self, wait_engine: str, recovery: RecoveryPolicy = None, **kwargs):
+        async def main():
+            web_driver = WebDriver(driver_factory=FakeDriver, timing=ThroughputTiming(), user_agent=False,
+                                   delay_time=0, metrics=self.metrics, wait_engine=wait_engine, recovery=recovery)
+            async with AsyncWebDriver(web_driver) as async_driver:
+                return await async_driver.get_page(**kwargs), await async_driver.current_url()
+        return asyncio.run(main())
+
+    def _counter(self, name: str, **labels):
+        return sum(counter['value'] for counter in self.metrics.snapshot()['counters']
+                   if counter['name'] == name and all(counter['labels'].get(k) == v for k, v in labels.items()))
+
+    def test_element_wait_engines(self):
+        for wait_engine in ('poll', 'observer'):
+            ok, _ = self._run(wait_engine, url=self.site.url('/delayed?ms=100'), element=(By.ID, 'late'))
+            self.assertTrue(ok, wait_engine)
+        self.assertEqual(self._counter('get_page_total', result='ok'), 2)
+
+    def test_form_submit(self):
+        for wait_engine in ('poll', 'observer'):
+            ok, current_url = self._run(wait_engine, url=self.site.url('/form'), element=(By.ID, 'form'),
+                                        form_data=[[(By.ID, 'name'), 'Ann']], submit_button=(By.ID, 'submit'),
+                                        submit_check_element=[(By.ID, 'result'), 'Thanks'], fill_mode='script')
+            self.assertTrue(ok, wait_engine)
+            self.assertIn('/done', current_url)
+        self.assertEqual(self._counter('form_submit_total', result='passed'), 2)
+
+    def test_keys_fill_mode(self):
+        ok, current_url = self._run('poll', url=self.site.url('/form'), element=(By.ID, 'form'),
+                                    form_data=[[(By.ID, 'name'), 'Bob']], submit_button=(By.ID, 'submit'),
+                                    submit_check_element=[(By.ID, 'result'), 'Thanks, Bob'], fill_mode='keys')
+        self.assertTrue(ok)
+        self.assertIn('/done?name=Bob', current_url)
+
+    def test_recovery(self):
+        policy = RecoveryPolicy(budgets={TIMEOUT: 2}, backoff=0)
+        ok, _ = self._run('poll', policy, url=self.site.url('/static'), element=(By.ID, 'missing'),
+                          el_max_wait_time=.1)
+        self.assertFalse(ok)
+        self.assertEqual(policy.counters, {'timeout.failures': 3, 'timeout.renavigate': 2, 'timeout.giveup': 1})
+
+    def test_redirect_is_not_a_submit(self):
+        # the form is reached through a redirect and the submit button is missing: nothing is submitted
+        for wait_engine in ('poll', 'observer'):
+            for check in (None, [(By.ID, 'result'), 'Thanks']):
+                _, current_url = self._run(wait_engine, url=self.site.url('/redirect?n=2&to=/form'),
+                                           element=(By.ID, 'form'), form_data=[[(By.ID, 'name'), 'Ann']],
+                                           submit_button=(By.ID, 'missing'), submit_check_element=check,
+                                           fill_mode='script', el_max_wait_time=.3)
+                self.assertIn('/form', current_url)
+        self.assertEqual(self._counter('form_submit_total', result='passed'), 0)
+        self.assertEqual(self._counter('form_submit_total', result='not_passed'), 4)
+
+    def test_failure_is_counted(self):
+        ok, _ = self._run('observer', url=self.site.url('/static'), element=(By.ID, 'missing'), el_max_wait_time=.2)
+        self.assertFalse(ok)
+        self.assertEqual(self._counter('get_page_total', result='failed'), 1)
+        self.assertGreater(self._counter('get_page_failures_total'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+
+from selenium.common.exceptions import WebDriverException
+
+from BenchPack.fakeDriver import FakeDriver
+from WebDriverPack import webDriver
+from WebDriverPack.loadProfile import LoadProfile
+from WebDriverPack.timing import ThroughputTiming
+from WebDriverPack.webDriver import WebDriver
+
+MISMATCH = 'session not created: This version of ChromeDriver only supports Chrome version 114\n' \
+           'Current browser version is 120.0.6099.109 with binary path /usr/bin/chrome'
+
+
+class _FailingProfile(LoadProfile):
+
+    def apply_driver(self, driver):
+        raise WebDriverException('DevTools command failed')
+
+
+class DriverStartTest(unittest.TestCase):
+
+    def _launch(self, *errors):
+        """WebDriver() on a local Chrome launch that raises the errors in turn, then starts a FakeDriver;
+        returns (WebDriver or the raised exception, launches, downloads)."""
+        launches = []
+
+        def chrome(path, options=None):
+            launches.append(path)
+            if len(launches) <= len(errors):
+                raise WebDriverException(errors[len(launches) - 1])
+            return FakeDriver(options)
+
+        with mock.patch.object(WebDriver, '_resolve_chrome', lambda cls: ('chrome', WebDriver._chromedriver_path)), \
+                mock.patch.object(WebDriver, '_chromedriver_path', 'chromedriver'), \
+                mock.patch.object(WebDriver, '_chrome_version', '114.0.5735.90'), \
+                mock.patch.object(webDriver.webdriver, 'Chrome', chrome), \
+                mock.patch.object(webDriver, 'download_latest_chromedriver', return_value=True) as download:
+            try:
+                result = WebDriver(timing=ThroughputTiming(), user_agent=False, delay_time=0)
+                result.quit()
+            except WebDriverException as e:
+                result = e
+            return result, len(launches), download.call_count
+
+    def test_version_mismatch_is_patched_once(self):
+        result, launches, downloads = self._launch(MISMATCH)
+        self.assertIsInstance(result, WebDriver)
+        self.assertEqual((launches, downloads), (2, 1))
+        result, launches, downloads = self._launch(MISMATCH, MISMATCH)
+        self.assertIsInstance(result, WebDriverException)
+        self.assertEqual((launches, downloads), (2, 1))
+
+    def test_other_launch_failure_is_raised(self):
+        result, launches, downloads = self._launch("unknown error: DevToolsActivePort file doesn't exist")
+        self.assertIsInstance(result, WebDriverException)
+        self.assertEqual((launches, downloads), (1, 0))
+
+    def test_started_session_is_quit_on_failure(self):
+        drivers = []
+
+        def factory(options):
+            drivers.append(FakeDriver(options))
+            return drivers[-1]
+
+        with self.assertRaises(WebDriverException):
+            WebDriver(driver_factory=factory, timing=ThroughputTiming(), user_agent=False, delay_time=0,
+                      load_profile=_FailingProfile())
+        self.assertEqual(len(drivers), 1)
+        self.assertTrue(drivers[0]._quit)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+
+from selenium.webdriver.common.by import By
+
+from BenchPack.fakeDriver import FakeDriver
+from BenchPack.site import BenchSite
+from HttpParserPack import HttpParser
+from WebDriverPack.pageCache import PageCache
+from WebDriverPack.patch import find_chrome_binary
+from WebDriverPack.timing import ThroughputTiming
+from WebDriverPack.webDriver import WebDriver
+
+FIELDS = {
+    'rows': {'locator': (By.CSS_SELECTOR, '#listing .row'), 'many': True, 'fields': {
+        'title': (By.CSS_SELECTOR, 'a.link'),
+        'link': {'locator': (By.CSS_SELECTOR, 'a.link'), 'properties': 'href'},
+        'thumb': {'locator': (By.CSS_SELECTOR, 'img.thumb'), 'properties': ['src', 'alt']},
+    }},
+    'top': {'locator': (By.ID, 'top'), 'properties': 'href'},
+}
+
+
+class ExtractionPathsTest(unittest.TestCase):
+    """The browser, cached page and static html paths read the same values from the same page."""
+
+    def setUp(self):
+        self.site = BenchSite()
+        self.url = self.site.url('/listing')
+
+    def tearDown(self):
+        self.site.stop()
+
+    def _expected(self):
+        return {
+            'rows': [{'title': f'Item {i}', 'link': self.site.url(f'/static?n={i}'),
+                      'thumb': {'src': self.site.url(f'/img/{i}.png'), 'alt': f'item {i}'}} for i in range(3)],
+            'top': self.url + '#wrapper',
+        }
+
+    def _browser_extract(self, **kwargs):
+        with WebDriver(timing=ThroughputTiming(), user_agent=False, delay_time=0, **kwargs) as web_driver:
+            self.assertTrue(web_driver.get_page(self.url, element=(By.ID, 'listing')))
+            return web_driver.extract(FIELDS)
+
+    def test_fake_browser(self):
+        self.assertEqual(self._browser_extract(driver_factory=FakeDriver), self._expected())
+
+    def test_cached_page(self):
+        with tempfile.TemporaryDirectory() as path, PageCache(path) as cache, \
+                WebDriver(driver_factory=FakeDriver, timing=ThroughputTiming(), user_agent=False, delay_time=0,
+                          cache=cache) as web_driver:
+            self.assertTrue(web_driver.get_page(self.url, element=(By.ID, 'listing')))
+            self.assertTrue(web_driver.get_page(self.url, element=(By.ID, 'listing')))
+            self.assertIsNotNone(web_driver._cached_page)
+            self.assertEqual(web_driver.extract(FIELDS), self._expected())
+
+    def test_http(self):
+        http_parser = HttpParser(user_agent=False)
+        self.assertTrue(http_parser.get_page(self.url, element=(By.ID, 'listing')))
+        self.assertEqual(http_parser.extract(FIELDS), self._expected())
+
+    @unittest.skipUnless(find_chrome_binary(), 'Chrome is not installed')
+    def test_chrome(self):
+        # EXTRACT_SCRIPT evaluated by the browser itself
+        self.assertEqual(self._browser_extract(headless=True), self._expected())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import socket
+import unittest
+
+import urllib3
+
+from BenchPack.site import BenchSite
+from WebDriverPack.forwardProxy import ForwardingProxy, _split_target
+
+
+def _raw(address: str, request: bytes):
+    """Send a raw request to the proxy, return the whole answer."""
+    host, port = address.rsplit(':', 1)
+    with socket.create_connection((host, int(port)), timeout=5) as s:
+        s.sendall(request)
+        answer = b''
+        while True:
+            chunk = s.recv(65536)
+            if not chunk:
+                return answer
+            answer += chunk
+
+
+class ForwardingProxyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.site = BenchSite()
+        self.seen = []
+        # the upstream records the hosts it is asked for and connects directly
+        self.upstream = ForwardingProxy(selector=lambda host: self.seen.append(host))
+        self.proxy = ForwardingProxy()
+
+    def tearDown(self):
+        self.proxy.stop()
+        self.upstream.stop()
+        self.site.stop()
+
+    def _get(self, path: str):
+        manager = urllib3.ProxyManager(f'http://{self.proxy.address}')
+        try:
+            return manager.request('GET', self.site.url(path), retries=False, timeout=5)
+        finally:
+            manager.clear()
+
+    def test_direct(self):
+        response = self._get('/static?n=7')
+        self.assertEqual(response.status, 200)
+        self.assertIn(b'page 7', response.data)
+        self.assertEqual(self.seen, [])
+
+    def test_through_upstream(self):
+        self.proxy.set_upstream(self.upstream.address)
+        response = self._get('/static?n=8')
+        self.assertEqual(response.status, 200)
+        self.assertIn(b'page 8', response.data)
+        self.assertEqual(self.seen, ['127.0.0.1'])
+        # switched back to direct
+        self.proxy.set_upstream(None)
+        self.assertEqual(self._get('/static?n=9').status, 200)
+        self.assertEqual(self.seen, ['127.0.0.1'])
+
+    def test_connect_tunnel(self):
+        for upstream in (None, self.upstream.address):
+            self.proxy.set_upstream(upstream)
+            target = self.site.url('/').split('://', 1)[1].rstrip('/')
+            answer = _raw(self.proxy.address, f'CONNECT {target} HTTP/1.1\r\nHost: {target}\r\n\r\n'
+                                              f'GET /static?n=3 HTTP/1.1\r\nHost: {target}\r\nConnection: close\r\n\r\n'
+                                              .encode())
+            self.assertTrue(answer.startswith(b'HTTP/1.1 200 Connection established'), answer[:100])
+            self.assertIn(b'page 3', answer)
+
+    def test_bad_requests(self):
+        for request in (b'NONSENSE\r\n\r\n', b'CONNECT example.com HTTP/1.1\r\n\r\n',
+                        b'CONNECT example.com:http HTTP/1.1\r\n\r\n', b'CONNECT example.com:70000 HTTP/1.1\r\n\r\n',
+                        b'GET /relative HTTP/1.1\r\nHost: example.com\r\n\r\n'):
+            self.assertTrue(_raw(self.proxy.address, request).startswith(b'HTTP/1.1 400 Bad Request'), request)
+        # still serving
+        self.assertEqual(self._get('/static').status, 200)
+
+    def test_unreachable(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        answer = _raw(self.proxy.address, f'GET http://127.0.0.1:{port}/ HTTP/1.1\r\n\r\n'.encode())
+        self.assertTrue(answer.startswith(b'HTTP/1.1 502 Bad Gateway'))
+
+    def test_split_target(self):
+        self.assertEqual(_split_target('CONNECT', 'example.com:443'), ('example.com', 443))
+        self.assertEqual(_split_target('CONNECT', '[::1]:8443'), ('::1', 8443))
+        self.assertEqual(_split_target('GET', 'http://[::1]:8080/a?b'), ('::1', 8080))
+        self.assertEqual(_split_target('GET', 'http://example.com/'), ('example.com', 80))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import threading
+import unittest
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, time
+
+from HttpParserPack import HttpParser
+from HttpParserPack.httpParser import retry_after
+from MetricsPack import Metrics
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """/refuse?n=K - 503 for the first K requests (Retry-After from the server settings), then 200;
+    /charset - a page with an unknown charset name."""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, headers: dict):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        server.times.append(monotonic())
+        if self.path.startswith('/charset'):
+            self._send(200, 'café'.encode('utf-8'), {'Content-Type': 'text/html; charset=x-unknown'})
+        elif len(server.times) <= server.refusals:
+            headers = {'Content-Type': 'text/html'}
+            if server.retry_after is not None:
+                headers['Retry-After'] = server.retry_after
+            self._send(503, b'busy', headers)
+        else:
+            self._send(200, b'<html><body><div id="ok">ok</div></body></html>', {'Content-Type': 'text/html'})
+
+
+class HttpParserTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.times = []
+        self.server.refusals = 0
+        self.server.retry_after = None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _parser(self, **kwargs):
+        return HttpParser(user_agent=False, metrics=Metrics(), **kwargs)
+
+    def _gaps(self):
+        times = self.server.times
+        return [b - a for a, b in zip(times, times[1:])]
+
+    def test_exponential_backoff(self):
+        self.server.refusals = 2
+        with self._parser(max_retry=3, backoff=.1) as http_parser:
+            page = http_parser.fetch(self.url + '/refuse')
+        self.assertEqual((page.status, page.attempts), (200, 3))
+        gaps = self._gaps()
+        self.assertGreaterEqual(gaps[0], .1)
+        self.assertGreaterEqual(gaps[1], .2)
+
+    def test_no_pause_after_last_attempt(self):
+        self.server.refusals = 5
+        start = monotonic()
+        with self._parser(max_retry=2, backoff=.3) as http_parser:
+            page = http_parser.fetch(self.url + '/refuse')
+        self.assertEqual((page.status, page.attempts), (503, 2))
+        self.assertLess(monotonic() - start, .6)
+
+    def test_retry_after(self):
+        self.server.refusals = 1
+        self.server.retry_after = '1'
+        with self._parser(max_retry=2, backoff=.01) as http_parser:
+            self.assertEqual(http_parser.fetch(self.url + '/refuse').status, 200)
+        self.assertGreaterEqual(self._gaps()[0], 1)
+
+    def test_retry_after_is_capped(self):
+        self.server.refusals = 1
+        self.server.retry_after = '3600'
+        with self._parser(max_retry=2, max_backoff=.2) as http_parser:
+            self.assertEqual(http_parser.fetch(self.url + '/refuse').status, 200)
+        self.assertLess(self._gaps()[0], 1)
+
+    def test_retry_after_values(self):
+        self.assertEqual(retry_after({'Retry-After': '7'}), 7)
+        self.assertAlmostEqual(retry_after({'Retry-After': formatdate(time() + 30, usegmt=True)}), 30, delta=2)
+        self.assertEqual(retry_after({'Retry-After': formatdate(time() - 30, usegmt=True)}), 0)
+        self.assertIsNone(retry_after({'Retry-After': 'soon'}))
+        self.assertIsNone(retry_after({}))
+
+    def test_unknown_charset(self):
+        with self._parser() as http_parser:
+            page = http_parser.fetch(self.url + '/charset')
+        self.assertEqual(page.text, 'café')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from BenchPack.site import BenchSite
+from WebDriverPack import runner
+from WebDriverPack.jobs import Checkpoint, open_results
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'checkpoint.txt')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _lines(self):
+        with open(self.path, encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def test_ranges_are_compacted(self):
+        with Checkpoint(self.path) as checkpoint:
+            for task_id in list(range(1000)) + [1002, 1005, 1006]:
+                checkpoint.add(task_id)
+            checkpoint.add(5)
+            self.assertEqual(len(checkpoint), 1003)
+        self.assertEqual(self._lines(), ['0-999', '1002', '1005-1006'])
+        checkpoint = Checkpoint(self.path, read_only=True)
+        self.assertEqual(len(checkpoint), 1003)
+        self.assertIn(999, checkpoint)
+        self.assertNotIn(1000, checkpoint)
+        self.assertIn(1006, checkpoint)
+
+    def test_other_ids(self):
+        timestamp = 1697000000000
+        with Checkpoint(self.path) as checkpoint:
+            for task_id in ('page-1', 'страница', timestamp, -3, 7):
+                checkpoint.add(task_id)
+            # a large id does not grow the bitmap
+            self.assertLess(len(checkpoint._bits), 64)
+        self.assertEqual(self._lines(), ['7', '"page-1"', '"страница"', str(timestamp), '"-3"'])
+        checkpoint = Checkpoint(self.path, read_only=True)
+        for task_id in ('page-1', 'страница', timestamp, '-3', 7):
+            self.assertIn(task_id, checkpoint)
+        self.assertNotIn('page-2', checkpoint)
+        self.assertNotIn(timestamp + 1, checkpoint)
+        self.assertEqual(len(checkpoint), 5)
+
+    def test_line_cut_by_crash(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('0-4\n"done"\nbad\n12')
+        checkpoint = Checkpoint(self.path, read_only=True)
+        self.assertEqual(len(checkpoint), 6)
+        self.assertNotIn(12, checkpoint)
+        self.assertIn('done', checkpoint)
+
+    def test_read_only(self):
+        checkpoint = Checkpoint(self.path, read_only=True)
+        with self.assertRaises(ValueError):
+            checkpoint.add(1)
+        self.assertFalse(os.path.exists(self.path))
+
+
+class OpenResultsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'results.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, data: str):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(data)
+
+    def _read(self):
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_cut_line_is_dropped(self):
+        self._write('{"a": 1}\n{"b": 2}\n{"c": ')
+        with open_results(self.path, resume=True) as f:
+            f.write('{"d": 4}\n')
+        self.assertEqual(self._read(), '{"a": 1}\n{"b": 2}\n{"d": 4}\n')
+
+    def test_long_cut_line(self):
+        # the cut line is longer than the read step
+        self._write('{"a": 1}\n' + 'x' * 200000)
+        with open_results(self.path, resume=True):
+            pass
+        self.assertEqual(self._read(), '{"a": 1}\n')
+
+    def test_complete_file_is_kept(self):
+        self._write('{"a": 1}\n')
+        with open_results(self.path, resume=True):
+            pass
+        self.assertEqual(self._read(), '{"a": 1}\n')
+        with open_results(self.path, resume=False):
+            pass
+        self.assertEqual(self._read(), '')
+
+
+class ResumeRunTest(unittest.TestCase):
+
+    def setUp(self):
+        self.site = BenchSite()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        self.site.stop()
+
+    def _path(self, name: str):
+        return os.path.join(self.tmp.name, name)
+
+    def test_resume_skips_completed_tasks(self):
+        tasks, output, checkpoint = self._path('tasks.txt'), self._path('results.jsonl'), self._path('done.txt')
+        with open(tasks, 'w', encoding='utf-8') as f:
+            for i in range(6):
+                url = self.site.url(f'/static?n={i}')
+                f.write(json.dumps({'url': url, 'id': f'page-{i}'}) + '\n' if i == 3 else url + '\n')
+            f.write('{"url": \n')
+        # a run stopped after three tasks, its last result cut
+        with Checkpoint(checkpoint) as completed:
+            for task_id in (0, 1, 'page-3'):
+                completed.add(task_id)
+        with open(output, 'w', encoding='utf-8') as f:
+            for task_id in (0, 1, 'page-3'):
+                f.write(json.dumps({'spec': {'id': task_id}, 'ok': True}) + '\n')
+            f.write('{"spec": {"id": 2}, ')
+
+        with open_results(output, resume=True) as f:
+            report = runner.run(tasks, f, workers=2, mode='http', checkpoint=checkpoint)
+        self.assertEqual(sum(worker['done'] for worker in report), 4)
+        with open(output, encoding='utf-8') as f:
+            results = [json.loads(line) for line in f]
+        self.assertEqual(sorted(str(result['spec']['id']) for result in results),
+                         ['0', '1', '2', '4', '5', '6', 'page-3'])
+        by_id = {result['spec']['id']: result for result in results}
+        self.assertTrue(all(by_id[task_id]['ok'] for task_id in (2, 4, 5)))
+        self.assertEqual(by_id[6]['via'], 'task')
+        completed = Checkpoint(checkpoint, read_only=True)
+        self.assertEqual(len(completed), 7)
+
+        # nothing is left to do
+        stream = io.StringIO()
+        report = runner.run(tasks, stream, workers=2, mode='http', checkpoint=checkpoint)
+        self.assertEqual(sum(worker['done'] for worker in report), 0)
+        self.assertEqual(stream.getvalue(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from BenchPack.fakeDriver import FakeDriver
+from BenchPack.site import BenchSite
+from WebDriverPack import lifecycle
+from WebDriverPack.lifecycle import LifecyclePolicy
+from WebDriverPack.timing import ThroughputTiming
+from WebDriverPack.webDriver import WebDriver
+
+
+class RecycleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.site = BenchSite()
+        self.web_driver = WebDriver(driver_factory=FakeDriver, timing=ThroughputTiming(), user_agent=False,
+                                    delay_time=0, lifecycle=LifecyclePolicy(max_pages=1))
+
+    def tearDown(self):
+        self.web_driver.quit()
+        self.site.stop()
+
+    def test_recycled_driver_stays_registered(self):
+        self.assertTrue(self.web_driver.get_page(self.site.url('/static')))
+        first = self.web_driver.driver
+        self.assertTrue(self.web_driver.get_page(self.site.url('/static')))
+        self.assertIsNot(self.web_driver.driver, first)
+        self.assertIn(self.web_driver, lifecycle._live)
+
+    def test_quit_unregisters(self):
+        self.web_driver.quit()
+        self.assertNotIn(self.web_driver, lifecycle._live)
+        self.assertIsNone(self.web_driver.driver)
+
+
+class _ProxiedWebDriver(WebDriver):
+    _proxies_list = ['127.0.0.1:9']
+
+    @classmethod
+    def _set_variables(cls):
+        # the proxy list of the test, not text_files/proxies.txt
+        pass
+
+
+class _UnproxiedWebDriver(_ProxiedWebDriver):
+    _proxies_list = []
+
+
+class LocalProxyTest(unittest.TestCase):
+
+    def _web_driver(self, cls):
+        return cls(driver_factory=FakeDriver, timing=ThroughputTiming(), user_agent=False, delay_time=0,
+                   proxy=True, local_proxy=True)
+
+    def test_quit_stops_local_proxy(self):
+        web_driver = self._web_driver(_ProxiedWebDriver)
+        forward_proxy = web_driver._forward_proxy
+        self.assertIsNotNone(forward_proxy)
+        web_driver.quit()
+        self.assertIsNone(web_driver._forward_proxy)
+        self.assertFalse(forward_proxy._thread.is_alive())
+
+    def test_no_local_proxy_without_proxies(self):
+        web_driver = self._web_driver(_UnproxiedWebDriver)
+        self.assertIsNone(web_driver._forward_proxy)
+        web_driver.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
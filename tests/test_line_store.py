@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+from ParserPack.lineStore import LineStore, SampleCursor
+
+
+class LineStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'lines.txt')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, data: bytes):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def test_blank_lines_and_crlf(self):
+        self._write(b'\r\na\r\n\r\n  \t\r\nb\n\n  c d  \n\x0c\nlast')
+        store = LineStore(self.path)
+        self.assertEqual(list(store), ['a', 'b', 'c d', 'last'])
+        self.assertEqual(len(store), 4)
+
+    def test_empty_file(self):
+        self._write(b'')
+        store = LineStore(self.path)
+        self.assertEqual(len(store), 0)
+        self.assertEqual(list(store.sampler()), [])
+        self._write(b'\n \n\r\n')
+        self.assertEqual(len(LineStore(self.path)), 0)
+
+    def test_indexes_and_slices(self):
+        self._write(''.join(f'line {i}\n' for i in range(10)).encode())
+        store = LineStore(self.path)
+        self.assertEqual(store[0], 'line 0')
+        self.assertEqual(store[-1], 'line 9')
+        self.assertEqual(store[-10], 'line 0')
+        with self.assertRaises(IndexError):
+            store[10]
+        with self.assertRaises(IndexError):
+            store[-11]
+        self.assertEqual(list(store[2:5]), ['line 2', 'line 3', 'line 4'])
+        self.assertEqual(list(store[::-3]), ['line 9', 'line 6', 'line 3', 'line 0'])
+        view = store[1:9]
+        self.assertEqual(len(view), 8)
+        self.assertEqual(view[-1], 'line 8')
+        self.assertEqual(list(view[1::3]), ['line 2', 'line 5', 'line 8'])
+        self.assertEqual(list(store[20:]), [])
+
+    def test_unicode(self):
+        self._write('прокси 1\n\n代理 2\n'.encode('utf-8'))
+        self.assertEqual(list(LineStore(self.path)), ['прокси 1', '代理 2'])
+
+    def test_sidecar_is_reused(self):
+        self._write(b'a\nb\n\nc\n')
+        self.assertEqual(len(LineStore(self.path)), 3)
+        self.assertTrue(os.path.exists(self.path + '.idx'))
+        with mock.patch.object(LineStore, '_build_index', side_effect=AssertionError('index rebuilt')):
+            store = LineStore(self.path)
+            self.assertEqual(list(store), ['a', 'b', 'c'])
+
+    def test_sidecar_is_rebuilt_after_change(self):
+        self._write(b'a\nb\n')
+        self.assertEqual(len(LineStore(self.path)), 2)
+        # another size
+        self._write(b'a\nb\nc\n')
+        self.assertEqual(list(LineStore(self.path)), ['a', 'b', 'c'])
+        # same size, another mtime
+        self._write(b'x\n\nyz\n')
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(list(LineStore(self.path)), ['x', 'yz'])
+        # a damaged sidecar
+        with open(self.path + '.idx', 'r+b') as f:
+            f.truncate(20)
+        self.assertEqual(list(LineStore(self.path)), ['x', 'yz'])
+
+    def test_open_shares_instances(self):
+        self._write(b'a\n')
+        self.assertIs(LineStore.open(self.path), LineStore.open(os.path.relpath(self.path)))
+
+
+class SampleCursorTest(unittest.TestCase):
+
+    def test_every_item_once_per_round(self):
+        items = list(range(50))
+        cursor = SampleCursor(items)
+        rounds = [[next(cursor) for _ in items] for _ in range(5)]
+        for drawn in rounds:
+            self.assertEqual(sorted(drawn), items)
+        # rounds are independent permutations
+        self.assertGreater(len({tuple(drawn) for drawn in rounds}), 1)
+
+    def test_store_sampler(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'lines.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(f'p{i}' for i in range(20)) + '\n\n')
+            store = LineStore(path)
+            cursor = store[5:15].sampler()
+            counts = Counter(next(cursor) for _ in range(30))
+            self.assertEqual(counts, Counter({f'p{i}': 3 for i in range(5, 15)}))
+
+    def test_empty(self):
+        self.assertEqual(list(SampleCursor([])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+
+from MetricsPack import BYTE_BUCKETS, COUNT_BUCKETS, Metrics
+
+
+class HistogramBucketsTest(unittest.TestCase):
+
+    def test_own_buckets(self):
+        metrics = Metrics()
+        metrics.observe('page_seconds', .3)
+        metrics.observe('rss_bytes', 300 * 2 ** 20, buckets=BYTE_BUCKETS)
+        metrics.observe('attempts', 1, buckets=COUNT_BUCKETS)
+        histograms = {h['name']: h for h in metrics.snapshot()['histograms']}
+        rss = histograms['rss_bytes']
+        self.assertEqual(rss['buckets'], list(BYTE_BUCKETS))
+        # 300 MB: above 256 MB, not in +Inf
+        self.assertEqual(rss['counts'][BYTE_BUCKETS.index(2 ** 29)], 1)
+        self.assertEqual(rss['counts'][-1], 0)
+        self.assertEqual(histograms['attempts']['counts'][COUNT_BUCKETS.index(1)], 1)
+        self.assertEqual(len(histograms['page_seconds']['counts']), len(histograms['page_seconds']['buckets']) + 1)
+
+    def test_prometheus_uses_histogram_buckets(self):
+        metrics = Metrics()
+        metrics.observe('rss_bytes', 300 * 2 ** 20, buckets=BYTE_BUCKETS)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'metrics.prom')
+            metrics.dump_prometheus(path)
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+        self.assertIn(f'rss_bytes_bucket{{le="{2 ** 29}"}} 1', text)
+        self.assertIn(f'rss_bytes_bucket{{le="{2 ** 28}"}} 0', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import unittest
+
+from WebDriverPack.networkCapture import CapturedResponse, NetworkCapture
+
+
+def _entry(method: str, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}}), 'level': 'INFO'}
+
+
+def _response(request_id: str, url: str, mime_type: str = 'application/json', resource_type: str = 'XHR'):
+    return _entry('Network.responseReceived', requestId=request_id, type=resource_type,
+                  response={'url': url, 'status': 200, 'mimeType': mime_type})
+
+
+def _finished(request_id: str):
+    return _entry('Network.loadingFinished', requestId=request_id)
+
+
+class _StubDriver:
+    """Canned performance log batches (one per get_log call) and Network.getResponseBody results."""
+
+    def __init__(self, batches: list, bodies: dict):
+        self.batches = list(batches)
+        self.bodies = bodies
+        self.body_requests = []
+
+    def get_log(self, log_type: str):
+        assert log_type == 'performance'
+        return self.batches.pop(0) if self.batches else []
+
+    def execute_cdp_cmd(self, cmd: str, params: dict):
+        assert cmd == 'Network.getResponseBody'
+        self.body_requests.append(params['requestId'])
+        return self.bodies[params['requestId']]
+
+
+class NetworkCaptureTest(unittest.TestCase):
+
+    def test_matching_json_response(self):
+        driver = _StubDriver([[_response('1', 'http://site/api/items?page=2'), {'message': 'not json'},
+                               _finished('1')]],
+                             {'1': {'body': '{"items": [1, 2]}', 'base64Encoded': False}})
+        capture = NetworkCapture('*/api/items*')
+        self.assertEqual(capture.collect(driver), [
+            CapturedResponse('http://site/api/items?page=2', 200, 'application/json', 'XHR', {'items': [1, 2]}, '1')
+        ])
+        self.assertTrue(capture.done)
+        self.assertEqual(len(capture.responses), 1)
+
+    def test_mismatch_is_ignored(self):
+        driver = _StubDriver([[_response('1', 'http://site/api/items', mime_type='text/html'), _finished('1'),
+                               _response('2', 'http://site/static/app.json'), _finished('2'),
+                               _response('3', 'http://site/api/items', resource_type='Document'), _finished('3')]],
+                             {})
+        capture = NetworkCapture('*/api/*', resource_types=('XHR', 'Fetch'))
+        self.assertEqual(capture.collect(driver), [])
+        self.assertEqual(driver.body_requests, [])
+        self.assertFalse(capture.done)
+
+    def test_pending_across_reads(self):
+        driver = _StubDriver([[_response('1', 'http://site/api/a')], [], [_finished('1')]],
+                             {'1': {'body': '[]', 'base64Encoded': False}})
+        capture = NetworkCapture('*/api/*')
+        self.assertFalse(capture.arrived(driver))
+        self.assertFalse(capture.arrived(driver))
+        self.assertTrue(capture.arrived(driver))
+        self.assertEqual(capture.responses[0].body, [])
+
+    def test_loading_failed_drops_pending(self):
+        driver = _StubDriver([[_response('1', 'http://site/api/a'), _entry('Network.loadingFailed', requestId='1'),
+                               _finished('1')]],
+                             {'1': {'body': '{}', 'base64Encoded': False}})
+        capture = NetworkCapture('*/api/*')
+        self.assertEqual(capture.collect(driver), [])
+        self.assertEqual(driver.body_requests, [])
+
+    def test_base64_body_is_none(self):
+        driver = _StubDriver([[_response('1', 'http://site/api/file', mime_type='application/octet-stream'),
+                               _finished('1')]],
+                             {'1': {'body': 'AAEC', 'base64Encoded': True}})
+        capture = NetworkCapture('*/api/*', mime_types=None)
+        [response] = capture.collect(driver)
+        self.assertIsNone(response.body)
+        self.assertEqual(response.mime_type, 'application/octet-stream')
+
+    def test_lost_body(self):
+        driver = _StubDriver([[_response('1', 'http://site/api/a'), _finished('1')]], {})
+        [response] = NetworkCapture().collect(driver)
+        self.assertIsNone(response.body)
+        self.assertEqual(response.request_id, '1')
+
+    def test_reset(self):
+        driver = _StubDriver([[_response('1', 'http://site/api/a'), _response('2', 'http://site/api/b'),
+                               _finished('1')]],
+                             {'1': {'body': '{}', 'base64Encoded': False}})
+        capture = NetworkCapture(min_count=2)
+        capture.collect(driver)
+        capture.reset()
+        self.assertEqual(capture.responses, [])
+        driver.batches = [[_finished('2')]]
+        self.assertEqual(capture.collect(driver), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from MetricsPack import Metrics
+from WebDriverPack.pageCache import PageCache
+
+
+def _page(i: int, size: int = 4000):
+    # random hex: about half of it is left after compression
+    return f'<html><body>{i}: {os.urandom(size // 2).hex()}</body></html>'
+
+
+class PageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cache(self, **kwargs):
+        return PageCache(self.tmp.name, metrics=Metrics(), **kwargs)
+
+    def _blobs(self):
+        return sorted(name for _, _, names in os.walk(os.path.join(self.tmp.name, 'blobs')) for name in names)
+
+    def _stored(self, cache):
+        with cache._lock:
+            return cache._stored_size()
+
+    def test_get_put(self):
+        with self._cache() as cache:
+            self.assertIsNone(cache.get('a'))
+            cache.put('a', 'http://site/a', 'http://site/a?final', '<html>a</html>')
+            self.assertEqual(cache.get('a'), ('http://site/a?final', '<html>a</html>'))
+            stats = cache.stats
+            self.assertEqual((stats['hits'], stats['misses'], stats['stores']), (1, 1, 1))
+
+    def test_expiry(self):
+        with self._cache(ttl=.05) as cache:
+            cache.put('a', 'http://site/a', 'http://site/a', _page(1))
+            self.assertIsNotNone(cache.get('a'))
+            time.sleep(.1)
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(cache.stats['expired'], 1)
+            self.assertEqual(self._blobs(), [])
+            self.assertEqual(cache._size, 0)
+
+    def test_expired_entries_are_dropped_by_evict(self):
+        with self._cache(ttl=.05) as cache:
+            cache.evict_every = 5
+            for i in range(4):
+                cache.put(f'old{i}', 'u', 'u', _page(i))
+            time.sleep(.1)
+            cache.put('new', 'u', 'u', _page(4))
+            self.assertEqual(len(self._blobs()), 1)
+            self.assertEqual(cache._size, self._stored(cache))
+
+    def test_eviction_to_bound(self):
+        max_bytes = 20000
+        with self._cache(max_bytes=max_bytes) as cache:
+            for i in range(30):
+                cache.put(f'k{i}', f'http://site/{i}', f'http://site/{i}', _page(i))
+                self.assertLessEqual(cache._size, max_bytes)
+                self.assertEqual(cache._size, self._stored(cache))
+            self.assertGreater(cache.stats['evictions'], 0)
+            # least recently used go first
+            self.assertIsNotNone(cache.get('k29'))
+            self.assertIsNone(cache.get('k0'))
+            self.assertEqual(len(self._blobs()), cache._db.execute('SELECT COUNT(*) FROM blobs').fetchone()[0])
+
+    def test_same_content_is_stored_once(self):
+        page = _page(1)
+        with self._cache() as cache:
+            cache.put('a', 'http://site/a', 'http://site/a', page)
+            cache.put('b', 'http://site/b', 'http://site/b', page)
+            self.assertEqual(len(self._blobs()), 1)
+            self.assertEqual(cache.get('b'), ('http://site/b', page))
+            cache.invalidate('a')
+            # still used by b
+            self.assertEqual(len(self._blobs()), 1)
+            self.assertEqual(cache.get('b'), ('http://site/b', page))
+            cache.invalidate('b')
+            self.assertEqual(self._blobs(), [])
+            self.assertEqual(cache._size, 0)
+
+    def test_replaced_page_drops_old_blob(self):
+        with self._cache() as cache:
+            cache.put('a', 'u', 'u', _page(1))
+            cache.put('a', 'u', 'u', _page(2))
+            self.assertEqual(len(self._blobs()), 1)
+            self.assertEqual(cache._size, self._stored(cache))
+
+    def test_clear(self):
+        with self._cache() as cache:
+            for i in range(5):
+                cache.put(f'k{i}', 'u', 'u', _page(i))
+            cache.clear()
+            self.assertEqual(self._blobs(), [])
+            self.assertIsNone(cache.get('k1'))
+            self.assertEqual(cache._size, 0)
+
+    def test_blob_dropped_by_another_instance(self):
+        page = _page(1)
+        with self._cache() as cache, self._cache() as other:
+            cache.put('a', 'u', 'u', page)
+            exists = os.path.exists
+            dropped = []
+
+            def drop_after_check(path):
+                # 'a' is invalidated by the other instance right after put('b') has seen the blob
+                result = exists(path)
+                if path.endswith('.z') and not dropped:
+                    dropped.append(path)
+                    other.invalidate('a')
+                return result
+
+            with mock.patch.object(os.path, 'exists', drop_after_check):
+                cache.put('b', 'u', 'u', page)
+            self.assertEqual(len(dropped), 1)
+            self.assertEqual(other.get('b'), ('u', page))
+
+    def test_missing_blob_is_a_miss(self):
+        with self._cache() as cache:
+            cache.put('a', 'u', 'u', _page(1))
+            os.remove(os.path.join(self.tmp.name, 'blobs', self._blobs()[0][:2], self._blobs()[0]))
+            self.assertIsNone(cache.get('a'))
+            self.assertIsNone(cache._db.execute("SELECT 1 FROM entries WHERE key = 'a'").fetchone())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import threading
+import unittest
+from time import monotonic, sleep
+
+from BenchPack.fakeDriver import FakeDriver
+from WebDriverPack.pool import WebDriverPool
+from WebDriverPack.timing import ThroughputTiming
+
+
+class _RecordingPool(WebDriverPool):
+    """Records the session numbers, starts take a while so that concurrent checkouts overlap."""
+
+    def __init__(self, *args, **kwargs):
+        self.numbers = []
+        super().__init__(*args, **kwargs)
+
+    def _new_driver(self, number: int):
+        self.numbers.append(number)
+        sleep(.02)
+        return super()._new_driver(number)
+
+
+class WebDriverPoolTest(unittest.TestCase):
+
+    def _pool(self, cls=WebDriverPool, **kwargs):
+        return cls(driver_factory=FakeDriver, timing=ThroughputTiming(), user_agent=False, delay_time=0, **kwargs)
+
+    def test_reuse(self):
+        with self._pool(min_size=1, max_size=2) as pool:
+            self.assertEqual((pool.size, pool.idle), (1, 1))
+            with pool.driver() as first:
+                pass
+            with pool.driver() as second:
+                self.assertIs(second, first)
+            self.assertEqual(pool.size, 1)
+
+    def test_max_size_blocks_until_checkin(self):
+        with self._pool(min_size=0, max_size=2) as pool:
+            busy = [pool.checkout(), pool.checkout()]
+            start = monotonic()
+            with self.assertRaises(TimeoutError):
+                pool.checkout(timeout=.2)
+            self.assertGreaterEqual(monotonic() - start, .2)
+            self.assertEqual(pool.size, 2)
+
+            threading.Timer(.1, pool.checkin, (busy[0],)).start()
+            self.assertIs(pool.checkout(timeout=5), busy[0])
+            self.assertEqual(pool.size, 2)
+
+    def test_failed_health_check_discards(self):
+        with self._pool(min_size=0, max_size=2) as pool:
+            web_driver = pool.checkout()
+            web_driver.driver.quit()
+            pool.checkin(web_driver)
+            self.assertEqual((pool.size, pool.idle), (0, 0))
+            self.assertIsNone(web_driver.driver)
+            self.assertIsNot(pool.checkout(), web_driver)
+
+    def test_discard(self):
+        with self._pool(min_size=0, max_size=1) as pool:
+            web_driver = pool.checkout()
+            pool.checkin(web_driver, discard=True)
+            self.assertEqual(pool.size, 0)
+            with self.assertRaises(ValueError):
+                pool.checkin(web_driver)
+
+    def test_evict_idle_keeps_min_size(self):
+        with self._pool(min_size=1, max_size=3, idle_timeout=60) as pool:
+            sessions = [pool.checkout() for _ in range(3)]
+            for web_driver in sessions:
+                pool.checkin(web_driver)
+            self.assertEqual(pool.idle, 3)
+            self.assertEqual(pool.evict_idle(), 0)
+            pool._idle_timeout = 0
+            self.assertEqual(pool.evict_idle(), 2)
+            self.assertEqual((pool.size, pool.idle), (1, 1))
+            self.assertEqual(pool.evict_idle(), 0)
+            # the most recently used one is kept
+            self.assertIs(pool.checkout(), sessions[-1])
+
+    def test_concurrent_checkouts_get_distinct_numbers(self):
+        with self._pool(_RecordingPool, min_size=1, max_size=6) as pool:
+            sessions = []
+            threads = [threading.Thread(target=lambda: sessions.append(pool.checkout())) for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(set(sessions)), 6)
+            self.assertEqual(sorted(pool.numbers), [1, 2, 3, 4, 5, 6])
+            for web_driver in sessions:
+                pool.checkin(web_driver)
+
+    def test_closed(self):
+        pool = self._pool(min_size=1, max_size=2)
+        web_driver = pool.checkout()
+        pool.close()
+        with self.assertRaises(RuntimeError):
+            pool.checkout()
+        pool.checkin(web_driver)
+        self.assertIsNone(web_driver.driver)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+
+from ParserPack.proxyPool import ProxyPool
+
+
+class SharedScoresTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'proxy_scores.json')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def _stored(self):
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_shards_do_not_overwrite_each_other(self):
+        # two runner shards loaded the file before either saved
+        first = ProxyPool(['a:1', 'b:1'], scores_path=self.path)
+        second = ProxyPool(['c:1', 'd:1'], scores_path=self.path)
+        first.report_success('a:1', .5)
+        second.report_failure('c:1')
+        first.save()
+        second.save()
+        first.report_success('b:1', .2)
+        first.save()
+        stored = self._stored()
+        self.assertEqual(set(stored), {'a:1', 'b:1', 'c:1'})
+        self.assertEqual(stored['c:1']['fail'], 1)
+        # the other shard's scores are picked up on save
+        self.assertEqual(first.stats('c:1')['fail'], 1)
+
+    def test_changed_score_replaces_stored_one(self):
+        first = ProxyPool(['a:1'], scores_path=self.path)
+        first.report_success('a:1', 1)
+        first.save()
+        second = ProxyPool(['a:1'], scores_path=self.path)
+        second.report_failure('a:1')
+        second.save()
+        first.save()
+        self.assertEqual(self._stored()['a:1']['fail'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException, ElementNotInteractableException, InvalidSessionIdException,
+    NoSuchElementException, NoSuchFrameException, NoSuchWindowException, StaleElementReferenceException,
+    TimeoutException, WebDriverException
+)
+from selenium.webdriver.common.by import By
+
+from BenchPack.fakeDriver import FakeDriver
+from BenchPack.site import BenchSite
+from MetricsPack import Metrics
+from WebDriverPack.recovery import (
+    NETWORK, REFRESH, RENAVIGATE, RESTART, ROTATE_PROXY, SESSION, STALE, TIMEOUT, RecoveryPolicy
+)
+from WebDriverPack.timing import ThroughputTiming
+from WebDriverPack.webDriver import WebDriver
+
+
+class ClassifyTest(unittest.TestCase):
+
+    def test_classes(self):
+        cases = [
+            (TimeoutException('wait'), TIMEOUT),
+            (NoSuchElementException('#missing'), TIMEOUT),
+            (StaleElementReferenceException('stale'), STALE),
+            (NoSuchFrameException('frame'), STALE),
+            (ElementNotInteractableException('hidden'), STALE),
+            (ElementClickInterceptedException('covered'), STALE),
+            (InvalidSessionIdException('gone'), SESSION),
+            (NoSuchWindowException('closed'), SESSION),
+            (WebDriverException('unknown error: net::ERR_PROXY_CONNECTION_FAILED'), NETWORK),
+            (WebDriverException('unknown error: net::ERR_NAME_NOT_RESOLVED'), NETWORK),
+            (WebDriverException('chrome not reachable'), SESSION),
+            (WebDriverException('unknown error: session deleted because of page crash'), SESSION),
+            (WebDriverException('something new'), SESSION),
+            (ConnectionRefusedError(111, 'refused'), SESSION),
+        ]
+        for error, failure_class in cases:
+            self.assertEqual(RecoveryPolicy.classify(error), failure_class, repr(error))
+
+    def test_actions(self):
+        self.assertEqual(RecoveryPolicy.actions,
+                         {TIMEOUT: RENAVIGATE, STALE: REFRESH, NETWORK: ROTATE_PROXY, SESSION: RESTART})
+
+
+class RecoveryStateTest(unittest.TestCase):
+
+    def test_budget_and_backoff(self):
+        policy = RecoveryPolicy(budgets={NETWORK: 5}, backoff=.5, max_backoff=3)
+        state = policy.start()
+        results = [state.failure(WebDriverException('net::ERR_TIMED_OUT')) for _ in range(6)]
+        self.assertEqual([backoff for _, _, backoff in results], [.5, 1, 2, 3, 3, 0])
+        self.assertEqual([action for _, action, _ in results], [ROTATE_PROXY] * 5 + [None])
+        self.assertEqual(policy.counters, {'network.failures': 6, 'network.rotate_proxy': 5, 'network.giveup': 1})
+
+    def test_budgets_are_per_class_and_per_call(self):
+        policy = RecoveryPolicy(budgets={TIMEOUT: 1, STALE: 1})
+        state = policy.start()
+        self.assertEqual(state.failure(TimeoutException())[1], RENAVIGATE)
+        self.assertEqual(state.failure(StaleElementReferenceException())[1], REFRESH)
+        self.assertIsNone(state.failure(TimeoutException())[1])
+        # a new call starts with the whole budget
+        self.assertEqual(policy.start().failure(TimeoutException())[1], RENAVIGATE)
+
+    def test_max_attempts(self):
+        state = RecoveryPolicy(budgets={NETWORK: 10}).start(max_attempts=3)
+        actions = [state.failure(WebDriverException('net::ERR_CONNECTION_RESET'))[1] for _ in range(3)]
+        self.assertEqual(actions, [ROTATE_PROXY, ROTATE_PROXY, None])
+
+
+class GetPageRecoveryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.site = BenchSite()
+        self.metrics = Metrics()
+
+    def tearDown(self):
+        self.site.stop()
+
+    def _phases(self, name: str):
+        return sum(h['count'] for h in self.metrics.snapshot()['histograms']
+                   if h['name'] == 'phase_seconds' and h['labels'].get('phase') == name)
+
+    def test_timeout_renavigates_without_restart(self):
+        policy = RecoveryPolicy(budgets={TIMEOUT: 2}, backoff=0)
+        with WebDriver(driver_factory=FakeDriver, timing=ThroughputTiming(), user_agent=False, delay_time=0,
+                       metrics=self.metrics, recovery=policy) as web_driver:
+            driver = web_driver.driver
+            self.assertFalse(web_driver.get_page(self.site.url('/static'), element=(By.ID, 'missing'),
+                                                 el_max_wait_time=.1))
+            self.assertEqual(web_driver.attempts, 3)
+            self.assertIs(web_driver.driver, driver)
+        self.assertEqual(self._phases('driver_start'), 1)
+        self.assertEqual(self._phases('navigate'), 3)
+        self.assertEqual(policy.counters, {'timeout.failures': 3, 'timeout.renavigate': 2, 'timeout.giveup': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
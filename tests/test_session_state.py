@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from selenium.webdriver.common.by import By
+
+from BenchPack.fakeDriver import FakeDriver
+from BenchPack.site import BenchSite
+from MetricsPack import Metrics
+from WebDriverPack.sessionState import SessionState
+from WebDriverPack.timing import ThroughputTiming
+from WebDriverPack.webDriver import WebDriver
+
+_FORM = dict(form_data=[[(By.ID, 'name'), 'Ann']], submit_button=(By.ID, 'submit'),
+             submit_check_element=[(By.ID, 'result'), 'Thanks'], fill_mode='script', el_max_wait_time=.3)
+
+
+class SessionRestoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.site = BenchSite()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'session.json')
+
+    def tearDown(self):
+        self.site.stop()
+        self.tmp.cleanup()
+
+    def _web_driver(self, metrics: Metrics):
+        return WebDriver(driver_factory=FakeDriver, timing=ThroughputTiming(), user_agent=False, delay_time=0,
+                         metrics=metrics, session_file=self.path)
+
+    @staticmethod
+    def _count(metrics: Metrics, name: str, **labels):
+        snapshot = metrics.snapshot()
+        if name == 'phase_seconds':
+            return sum(h['count'] for h in snapshot['histograms']
+                       if h['name'] == name and h['labels'].get('phase') == labels['phase'])
+        return sum(c['value'] for c in snapshot['counters'] if c['name'] == name and c['labels'] == labels)
+
+    def _submit_once(self):
+        metrics = Metrics()
+        with self._web_driver(metrics) as web_driver:
+            self.assertTrue(web_driver.get_page(self.site.url('/form'), **_FORM))
+        self.assertEqual(self._count(metrics, 'form_submit_total', result='passed'), 1)
+        self.assertEqual(len(self.site.sessions), 1)
+        return SessionState.load(self.path)
+
+    def test_saved_session_skips_the_form(self):
+        state = self._submit_once()
+        self.assertEqual([cookie['name'] for cookie in state.cookies], ['bench_session'])
+        self.assertEqual(state.cookies_origin, self.site.base_url)
+
+        metrics = Metrics()
+        with self._web_driver(metrics) as web_driver:
+            self.assertTrue(web_driver.get_page(self.site.url('/form'), **_FORM))
+            self.assertIn('Thanks, Ann', web_driver.driver.page_source)
+        self.assertEqual(self._count(metrics, 'session_state_total', result='restored'), 1)
+        self.assertEqual(self._count(metrics, 'session_state_total', result='valid'), 1)
+        self.assertEqual(self._count(metrics, 'phase_seconds', phase='form_input'), 0)
+        # no new submission on the site
+        self.assertEqual(len(self.site.sessions), 1)
+
+    def test_stale_session_is_deleted(self):
+        old = self._submit_once()
+        self.site.sessions.clear()
+
+        metrics = Metrics()
+        with mock.patch('WebDriverPack.webDriver.os.remove', wraps=os.remove) as remove:
+            with self._web_driver(metrics) as web_driver:
+                self.assertTrue(web_driver.get_page(self.site.url('/form'), **_FORM))
+        remove.assert_called_once_with(self.path)
+        self.assertEqual(self._count(metrics, 'session_state_total', result='stale'), 1)
+        # the form is filled again and the new session is saved in place of the stale one
+        self.assertEqual(self._count(metrics, 'phase_seconds', phase='form_input'), 1)
+        new = SessionState.load(self.path)
+        self.assertEqual(len(new.cookies), 1)
+        self.assertNotEqual(new.cookies[0]['value'], old.cookies[0]['value'])
+        self.assertIn(new.cookies[0]['value'], self.site.sessions)
+
+
+class SessionStateTest(unittest.TestCase):
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'nested', 'session.json')
+            state = SessionState([{'name': 'a', 'value': '1'}], {'http://x': {'local': {'k': 'v'}, 'session': {}}},
+                                 cookies_origin='http://x')
+            state.save(path)
+            loaded = SessionState.load(path)
+            self.assertEqual((loaded.cookies, loaded.storage, loaded.created, loaded.cookies_origin),
+                             (state.cookies, state.storage, state.created, state.cookies_origin))
+            with open(path, 'w') as f:
+                f.write('{broken')
+            self.assertIsNone(SessionState.load(path))
+            self.assertIsNone(SessionState.load(os.path.join(tmp, 'missing.json')))
+
+    def test_devtools_apply(self):
+        driver = mock.Mock()
+        driver.execute_cdp_cmd.return_value = {'identifier': '7'}
+        state = SessionState([{'name': 'a', 'value': '1', 'domain': 'x', 'expires': -1, 'session': True,
+                               'size': 2}], {'http://x': {'local': {'k': 'v'}, 'session': {}}})
+        self.assertEqual(state.apply(driver, previous_script='6'), '7')
+        calls = driver.execute_cdp_cmd.call_args_list
+        self.assertEqual(calls[0], mock.call('Network.setCookies',
+                                             {'cookies': [{'name': 'a', 'value': '1', 'domain': 'x'}]}))
+        self.assertEqual(calls[1], mock.call('Page.removeScriptToEvaluateOnNewDocument', {'identifier': '6'}))
+        self.assertEqual(calls[2][0][0], 'Page.addScriptToEvaluateOnNewDocument')
+        self.assertIn(json.dumps(state.storage), calls[2][0][1]['source'])
+
+    def test_apply_without_devtools_and_origin(self):
+        driver = mock.Mock(spec=['get', 'add_cookie'])
+        self.assertIsNone(SessionState([{'name': 'a', 'value': '1'}]).apply(driver))
+        driver.get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from selenium.webdriver.common.by import By
+
+from BenchPack.fakeDriver import FakeDriver
+from BenchPack.site import BenchSite
+from MetricsPack import Metrics
+from WebDriverPack.tabs import TabSet
+from WebDriverPack.timing import ThroughputTiming
+from WebDriverPack.webDriver import WebDriver
+
+
+class TabSetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.site = BenchSite()
+        self.metrics = Metrics()
+        self.web_driver = WebDriver(driver_factory=FakeDriver, timing=ThroughputTiming(), user_agent=False,
+                                    delay_time=0, metrics=self.metrics)
+
+    def tearDown(self):
+        self.web_driver.quit()
+        self.site.stop()
+
+    def _delayed(self, ms: int):
+        return {'url': self.site.url(f'/delayed?ms={ms}'), 'element': (By.ID, 'late'), 'ms': ms}
+
+    def test_completion_order(self):
+        pages = [self._delayed(400), self._delayed(200), self._delayed(0), self._delayed(100)]
+        results = list(self.web_driver.fetch_tabs(pages, tabs=3, timeout=5))
+        # the 100 ms page starts in the tab freed by the 0 ms one and still beats the 200 ms page
+        self.assertEqual([result['spec']['ms'] for result in results], [0, 100, 200, 400])
+        for result in results:
+            self.assertTrue(result['ok'])
+            self.assertEqual(result['via'], 'tab')
+            self.assertEqual(result['current_url'], result['url'])
+            self.assertIn('id="late"', result['page_source'])
+        self.assertEqual(len(self.web_driver.driver.window_handles), 1)
+
+    def test_timed_out_tab(self):
+        pages = [self._delayed(5000), self.site.url('/static?n=1'), self.site.url('/static?n=2')]
+        results = list(self.web_driver.fetch_tabs(pages, tabs=2, timeout=.3))
+        self.assertEqual([result['url'] for result in results[:2]], pages[1:])
+        self.assertTrue(all(result['ok'] for result in results[:2]))
+        timed_out = results[2]
+        self.assertEqual(timed_out['url'], pages[0]['url'])
+        self.assertFalse(timed_out['ok'])
+        self.assertIsNone(timed_out['page_source'])
+        self.assertIn('not matched in 0.3 s', timed_out['error'])
+        self.assertGreaterEqual(timed_out['elapsed'], .3)
+        counters = {c['labels']['result']: c['value'] for c in self.metrics.snapshot()['counters']
+                    if c['name'] == 'tab_pages_total'}
+        self.assertEqual(counters, {'ok': 2, 'failed': 1})
+
+    def test_tabs_closed_on_generator_close(self):
+        driver = self.web_driver.driver
+        main_handle = driver.current_window_handle
+        results = self.web_driver.fetch_tabs([self._delayed(0), self._delayed(300), self._delayed(300)], tabs=3)
+        first = next(results)
+        self.assertEqual(first['spec']['ms'], 0)
+        self.assertEqual(len(driver.window_handles), 3)
+        results.close()
+        self.assertEqual(driver.window_handles, [main_handle])
+        self.assertEqual(driver.current_window_handle, main_handle)
+
+    def test_interactive_spec_is_rejected(self):
+        with TabSet(self.web_driver, size=2) as tab_set:
+            with self.assertRaises(ValueError):
+                list(tab_set.fetch([{'url': self.site.url('/form'), 'form_data': [[(By.ID, 'name'), 'Ann']]}]))
+            self.assertEqual(len(tab_set.handles), 2)
+        self.assertEqual(len(self.web_driver.driver.window_handles), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()